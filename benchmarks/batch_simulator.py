@@ -0,0 +1,76 @@
+import argparse
+import time
+
+import numpy as np
+
+from src.batch_simulator import CONVERT, BatchActions, BatchState, advance_batch, per_game_agent
+from src.routing import FIRST_MOVES, NEIGHBOURS, STAY
+from src.simulator import HaliteConfig, load_agent
+
+BATCH_SIZES = [1, 4, 16, 64, 256]
+AGENT_BATCH_SIZES = [1, 4, 16]
+
+
+def greedy_agent(state: BatchState, player: int) -> BatchActions:
+    # vectorized baseline: convert once, keep five ships, collect on rich cells, otherwise
+    # move to the richest neighbour, and bring full cargo home
+    actions = state.idle_actions()
+    rows = np.flatnonzero(state.ship_owners == player)
+    games, cells = state.ship_games[rows], state.ship_cells[rows]
+    own_yards = np.flatnonzero(state.yard_owners == player)
+    yard_cells = np.full(state.games, -1)
+    yard_cells[state.yard_games[own_yards]] = state.yard_cells[own_yards]
+
+    halite = state.flat_halite
+    richest = np.argmax(halite[games[:, np.newaxis], NEIGHBOURS[cells, :STAY]], axis=1)
+    # ships leave the shipyard at once, or the next spawn would collide with them
+    moves = np.where((halite[games, cells] < 100) | (cells == yard_cells[games]), richest, STAY)
+    returning = (state.ship_cargo[rows] > 500) & (yard_cells[games] >= 0)
+    moves[returning] = FIRST_MOVES[cells[returning], yard_cells[games[returning]]]
+    # kaggle rules actions a player cannot pay for invalid, which ends its game
+    player_halite = state.player_halite[:, player]
+    first_of_game = np.r_[True, games[1:] != games[:-1]]
+    affordable = player_halite[games] + state.ship_cargo[rows] >= state.config.convert_cost
+    moves[first_of_game & (yard_cells[games] < 0) & affordable] = CONVERT
+    actions.ships[rows] = moves
+
+    ships_per_game = np.bincount(games, minlength=state.games)
+    yard_games = state.yard_games[own_yards]
+    actions.spawns[own_yards] = (ships_per_game[yard_games] < 5) & (
+        player_halite[yard_games] >= state.config.spawn_cost
+    )
+    return actions
+
+
+def steps_per_second(agents, games: int, config: HaliteConfig) -> float:
+    # counts the steps of running games only, games can end early
+    state = BatchState.initial(config, games, len(agents), seed=0)
+    game_steps = 0
+    start = time.perf_counter()
+    while state.running.any():
+        game_steps += int(state.running.sum())
+        advance_batch(state, [agent(state, player) for player, agent in enumerate(agents)])
+    return game_steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game steps per second of the batch simulator")
+    parser.add_argument("--steps", type=int, default=400, help="Steps per game")
+    args = parser.parse_args()
+    config = HaliteConfig(episode_steps=args.steps)
+
+    print(f"{'agents':<36} {'games':>6} {'game steps/s':>14}")
+    for games in BATCH_SIZES:
+        rate = steps_per_second([greedy_agent, greedy_agent], games, config)
+        print(f"{'vectorized greedy vs greedy':<36} {games:>6} {rate:>14.0f}")
+    for games in AGENT_BATCH_SIZES:
+        agents = [
+            per_game_agent(lambda: load_agent("src/agents/single_ship_agent.py")),
+            greedy_agent,
+        ]
+        rate = steps_per_second(agents, games, config)
+        print(f"{'single_ship_agent vs greedy':<36} {games:>6} {rate:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.cluster import ClusterSearch
+
+from .common import format_seconds, time_per_call
+
+BOARD_SIZES = [15, 21, 32, 64]
+CLUSTER_SIZES = [3, 5]
+
+
+def sliced_cluster_search(halite_matrix: np.ndarray, cluster_size: int):
+    # the former find_halite_cluster: python sums over every (non-wrapping) window
+    best_pos = (0, 0)
+    best_value = 0
+    for x_ind in range(halite_matrix.shape[0] - cluster_size + 1):
+        for y_ind in range(halite_matrix.shape[1] - cluster_size + 1):
+            submatrix = halite_matrix[
+                x_ind : (x_ind + cluster_size), y_ind : (y_ind + cluster_size)
+            ]
+            submatrix_value = sum(sum(submatrix))
+            if submatrix_value > best_value:
+                best_value = submatrix_value
+                best_pos = (x_ind, y_ind)
+    return best_pos
+
+
+def main():
+    rng = np.random.RandomState(0)
+    print(f"{'board':>6} {'cluster':>8} {'sliced':>12} {'summed-area':>12} {'speedup':>8}")
+    for board_size in BOARD_SIZES:
+        board = np.float32(rng.rand(board_size, board_size) * 500)
+        for cluster_size in CLUSTER_SIZES:
+            sliced = time_per_call(lambda: sliced_cluster_search(board, cluster_size))
+            summed = time_per_call(
+                lambda: ClusterSearch(board).top_centres(cluster_size)  # pylint: disable=W0640
+            )
+            print(
+                f"{board_size:>6} {cluster_size:>8} {format_seconds(sliced):>12} "
+                f"{format_seconds(summed):>12} {sliced / summed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
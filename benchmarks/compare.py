@@ -0,0 +1,37 @@
+import argparse
+import json
+
+METRICS = ["p50_us", "p95_us", "p99_us", "peak_alloc_kib"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite reports")
+    parser.add_argument("baseline", help="JSON report of the baseline revision")
+    parser.add_argument("candidate", help="JSON report of the candidate revision")
+    parser.add_argument(
+        "--threshold", type=float, default=1.1, help="Ratio above which a metric is flagged"
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.candidate) as candidate_file:
+        baseline = json.load(baseline_file)
+        candidate = json.load(candidate_file)
+
+    print(f"{baseline['revision'][:10]} -> {candidate['revision'][:10]}")
+    print(f"{'benchmark':<58}" + "".join(f"{metric:>16}" for metric in METRICS))
+    for name in sorted(set(baseline["results"]) | set(candidate["results"])):
+        if name not in baseline["results"] or name not in candidate["results"]:
+            print(f"{name:<58} only in one report")
+            continue
+        cells = []
+        for metric in METRICS:
+            before = baseline["results"][name][metric]
+            after = candidate["results"][name][metric]
+            ratio = after / before if before else float("inf") if after else 1.0
+            flag = "!" if ratio > args.threshold else " "
+            cells.append(f"{ratio:>14.2f}x{flag}")
+        print(f"{name:<58}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
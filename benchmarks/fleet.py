@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.agents.single_ship_agent import Task, fleet_step, get_best_move, position_to_grid_pos
+from src.plans import Plan
+
+from .common import format_seconds, time_per_call
+
+FLEET_SIZES = [1, 5, 10, 20, 40]
+SHIPYARD_POS = 7 * 15 + 7
+
+
+def random_fleet(rng: np.random.RandomState, fleet_size: int):
+    cells = rng.choice(15 * 15, size=fleet_size, replace=False)
+    return {f"{index}-1": [int(cell), int(rng.randint(0, 500))] for index, cell in enumerate(cells)}
+
+
+def replanning_states(ships):
+    # worst case turn: every ship needs a new plan
+    return {uid: [Task.COLLECT, Plan()] for uid in ships}
+
+
+def per_ship_turn(board, ships):
+    for pos, halite in ships.values():
+        get_best_move(position_to_grid_pos(pos), position_to_grid_pos(SHIPYARD_POS), halite, board)
+
+
+def fleet_turn(board, ships):
+    fleet_step(100, board, ships, SHIPYARD_POS, replanning_states(ships))
+
+
+def main():
+    rng = np.random.RandomState(0)
+    board = np.float32(rng.rand(15, 15) * 500)
+    print(f"{'ships':>6} {'ship plans':>12} {'fleet turn':>12} {'speedup':>8}")
+    for fleet_size in FLEET_SIZES:
+        ships = random_fleet(rng, fleet_size)
+        per_ship = time_per_call(lambda: per_ship_turn(board, ships))  # pylint: disable=W0640
+        fleet = time_per_call(lambda: fleet_turn(board, ships))  # pylint: disable=W0640
+        print(
+            f"{fleet_size:>6} {format_seconds(per_ship):>12} {format_seconds(fleet):>12} "
+            f"{per_ship / fleet:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
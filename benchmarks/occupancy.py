@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.occupancy import ADJACENT_CELLS, FALLBACK_MOVES, resolve_moves
+
+from .common import format_seconds, time_per_call
+
+FLEET_SIZES = [10, 25, 50, 100]
+
+
+def list_resolve_moves(cells, moves, priorities):
+    # the same resolution with the reserved cells in a list, as set_occupations used to keep
+    # occupied positions
+    reserved = []
+    resolved = list(moves)
+    for index in sorted(range(len(cells)), key=lambda index: -priorities[index]):
+        for move in [moves[index], *FALLBACK_MOVES]:
+            if ADJACENT_CELLS[cells[index]][move] not in reserved:
+                resolved[index] = move
+                break
+        reserved.append(ADJACENT_CELLS[cells[index]][resolved[index]])
+    return resolved
+
+
+def main():
+    rng = np.random.RandomState(0)
+    print(f"{'ships':>6} {'list':>12} {'grid':>12} {'speedup':>8} {'collisions left':>16}")
+    for fleet_size in FLEET_SIZES:
+        cells = rng.choice(15 * 15, size=fleet_size, replace=False).tolist()
+        moves = rng.randint(0, 5, size=fleet_size).tolist()
+        cargo = rng.randint(0, 500, size=fleet_size).tolist()
+
+        before = time_per_call(
+            lambda: list_resolve_moves(cells, moves, cargo)
+        )  # pylint: disable=W0640
+        after = time_per_call(lambda: resolve_moves(cells, moves, cargo))  # pylint: disable=W0640
+        resolved = resolve_moves(cells, moves, cargo)
+        targets = [ADJACENT_CELLS[cell][move] for cell, move in zip(cells, resolved)]
+        print(
+            f"{fleet_size:>6} {format_seconds(before):>12} {format_seconds(after):>12} "
+            f"{before / after:>7.1f}x {len(targets) - len(set(targets)):>16}"
+        )
+
+
+if __name__ == "__main__":
+    main()
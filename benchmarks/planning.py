@@ -0,0 +1,88 @@
+from copy import deepcopy
+from itertools import product
+
+import numpy as np
+
+from src.agents.single_ship_agent import BEAM_WIDTH, Move, get_grid_dist, get_next_position
+from src.planning import collection_bonus, plan_moves
+from src.projection import collect_gain
+
+from .common import format_seconds, time_per_call
+
+HORIZONS = [2, 3, 4, 5, 6]
+
+
+def copying_projected_halite(curr_pos, moves, dropoff_pos, board, halite):
+    # the former projected_halite, copying the board for every candidate sequence
+    board = deepcopy(board)
+    for index, move in enumerate(moves):
+        if move != Move.COLLECT:
+            halite = int(halite * 0.9)
+            curr_pos = get_next_position(curr_pos, move)
+        else:
+            collect_value = int(0.25 * (board[curr_pos[0]][curr_pos[1]] * 1.02 ** index))
+            halite += collect_value
+            board[curr_pos[0]][curr_pos[1]] -= collect_value
+
+    dropoff_dist = get_grid_dist(curr_pos, dropoff_pos)
+    return int((0.9 ** dropoff_dist * halite) / (1.05 ** len(moves)))
+
+
+def power_collect_gain(cell_halite, distance, turns):
+    # the former projected_collect_halite's gain, raising the rates to a power on every call
+    arrival = int(1.02 ** distance * cell_halite)
+    return int(sum([0.25 * arrival * 0.75 ** turn for turn in range(1, turns + 1)]))
+
+
+def cold_collection_bonus(board, turns):
+    # the bound of a board the memo has not seen
+    collect_gain.cache_clear()
+    return collection_bonus(board, turns)
+
+
+def copying_best_move(pos, dropoff_pos, halite, board):
+    best_value = 0
+    best_moves = []
+    for move1, move2 in product(list(Move), repeat=2):
+        moves = [move1, move2]
+        val = copying_projected_halite(pos, moves, dropoff_pos, board, halite)
+        if val > best_value:
+            best_value = val
+            best_moves = moves
+    return best_moves
+
+
+def main():
+    board = np.float32(np.random.RandomState(0).rand(15, 15) * 500)
+    pos, dropoff_pos, halite = (3, 4), (7, 7), 250
+
+    baseline = time_per_call(lambda: copying_best_move(pos, dropoff_pos, halite, board))
+    print(f"{'planner':>24} {'per ship':>12}")
+    print(f"{'copying, horizon 2':>24} {format_seconds(baseline):>12}")
+    for horizon in HORIZONS:
+        seconds = time_per_call(
+            lambda: plan_moves(  # pylint: disable=W0640
+                3 * 15 + 4, 7 * 15 + 7, halite, board, horizon, BEAM_WIDTH
+            )
+        )
+        print(f"{f'beam, horizon {horizon}':>24} {format_seconds(seconds):>12}")
+
+    print(f"{'collect projection':>24} {'per call':>12}")
+    for name, gain in [
+        ("powers", power_collect_gain),
+        ("tables", collect_gain.__wrapped__),
+        ("memo", collect_gain),
+    ]:
+        seconds = time_per_call(lambda: gain(263.0, 6, 4))  # pylint: disable=W0640
+        print(f"{name:>24} {format_seconds(seconds):>12}")
+
+    flat_board = board.ravel()
+    horizon = HORIZONS[-1]
+    print(f"{f'beam bound, horizon {horizon}':>24} {'per plan':>12}")
+    for name, bound in [("cold memo", cold_collection_bonus), ("warm memo", collection_bonus)]:
+        seconds = time_per_call(lambda: bound(flat_board, horizon - 1))  # pylint: disable=W0640
+        print(f"{name:>24} {format_seconds(seconds):>12}")
+
+
+if __name__ == "__main__":
+    main()
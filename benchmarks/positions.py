@@ -0,0 +1,90 @@
+import tracemalloc
+
+from src.agents.first_agent import SIZE, Move, Player, Position
+
+from .common import format_seconds, time_per_call
+
+FLEET_SIZE = 40
+
+
+class DictPosition:
+    # the former Position: a __dict__ per instance, no __hash__, a new instance per move
+    def __init__(self, x, y):
+        self.x = x  # pylint: disable=C0103
+        self.y = y  # pylint: disable=C0103
+
+    def __eq__(self, other):
+        return self.x == other.x and self.y == other.y
+
+    def get_adjacent_position(self, move):
+        if move == Move.NORTH:
+            return DictPosition((self.x - 1) % SIZE, self.y)
+        if move == Move.SOUTH:
+            return DictPosition((self.x + 1) % SIZE, self.y)
+        if move == Move.EAST:
+            return DictPosition(self.x, (self.y + 1) % SIZE)
+        if move == Move.WEST:
+            return DictPosition(self.x, (self.y - 1) % SIZE)
+        return self
+
+
+def list_occupations(ship_positions, shipyard_positions):
+    # the former Player.set_occupations: list membership per shipyard
+    occupied_positions = list(ship_positions)
+    return [pos in occupied_positions for pos in shipyard_positions]
+
+
+def allocated_bytes(func) -> int:
+    tracemalloc.start()
+    func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    cells = [(cell * 7) % SIZE ** 2 for cell in range(FLEET_SIZE)]
+    dict_positions = [DictPosition(*divmod(cell, SIZE)) for cell in cells]
+    slot_positions = [Position(*divmod(cell, SIZE)) for cell in cells]
+
+    player = Player()
+    for index, pos in enumerate(slot_positions):
+        player.add_ship(str(index), pos)
+        player.add_shipyard(str(index), slot_positions[-index - 1])
+
+    rows = [
+        (
+            "move all ships",
+            lambda: [pos.get_adjacent_position(Move.EAST) for pos in dict_positions],
+            lambda: [pos.get_adjacent_position(Move.EAST) for pos in slot_positions],
+        ),
+        (
+            "occupations",
+            lambda: list_occupations(dict_positions, dict_positions[::-1]),
+            player.set_occupations,
+        ),
+    ]
+    print(f"{'benchmark':>16} {'before':>12} {'after':>12} {'speedup':>8}")
+    for name, before, after in rows:
+        before_time = time_per_call(before)
+        after_time = time_per_call(after)
+        print(
+            f"{name:>16} {format_seconds(before_time):>12} {format_seconds(after_time):>12} "
+            f"{before_time / after_time:>7.1f}x"
+        )
+
+    kept = []
+    before_bytes = allocated_bytes(
+        lambda: kept.append([DictPosition(*divmod(cell, SIZE)) for cell in range(SIZE ** 2)])
+    )
+    after_bytes = allocated_bytes(
+        lambda: kept.append([Position(*divmod(cell, SIZE)) for cell in range(SIZE ** 2)])
+    )
+    print(
+        f"{SIZE ** 2} positions: {before_bytes / 1024:.1f} KiB with __dict__, "
+        f"{after_bytes / 1024:.1f} KiB with __slots__"
+    )
+
+
+if __name__ == "__main__":
+    main()
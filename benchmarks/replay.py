@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from src.replay import ReplayReader, ReplayRecorder
+from src.simulator import load_agent, play_game
+
+AGENT_FILES = ["src/agents/single_ship_agent.py", "src/agents/first_agent.py"]
+
+
+def directory_size(root: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for path, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size and load time of recorded replays")
+    parser.add_argument("--games", type=int, default=10, help="Games to record")
+    parser.add_argument("--lookups", type=int, default=1000, help="Random turns to read")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        json_bytes = 0
+        with ReplayRecorder(root, episodes_per_shard=max(args.games // 2, 1)) as recorder:
+            for seed in range(args.games):
+                random.seed(seed)
+                np.random.seed(seed)
+
+                def on_turn(obs, actions):
+                    nonlocal json_bytes
+                    json_bytes += len(json.dumps([obs, actions]))
+                    recorder.record_turn(obs, actions)
+
+                agents = [load_agent(path) for path in AGENT_FILES]
+                rewards = play_game(agents, seed=seed, on_turn=on_turn)
+                recorder.end_episode(rewards, seed=seed, agents=AGENT_FILES)
+
+        start = time.perf_counter()
+        reader = ReplayReader(root)
+        open_time = time.perf_counter() - start
+
+        rng = np.random.default_rng(0)
+        episodes = rng.integers(len(reader), size=args.lookups)
+        start = time.perf_counter()
+        for episode in episodes:
+            reader.observation(episode, int(rng.integers(reader.episode(episode)["turns"])))
+        lookup_time = (time.perf_counter() - start) / args.lookups
+
+        size = directory_size(root) / args.games
+        print(f"{'replay size per game':<28} {size / 1024:10.1f} KiB")
+        print(f"{'json size per game':<28} {json_bytes / args.games / 1024:10.1f} KiB")
+        print(f"{'open ' + str(len(reader)) + ' games':<28} {open_time * 1e3:10.2f} ms")
+        print(f"{'random turn observation':<28} {lookup_time * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.simulator import HaliteConfig, load_agent, play_game
+
+AGENT_FILES = ["src/agents/single_ship_agent.py", "src/agents/first_agent.py"]
+
+
+def games_per_second(play, games: int) -> float:
+    start = time.perf_counter()
+    for game in range(games):
+        random.seed(game)
+        np.random.seed(game)
+        play(game)
+    return games / (time.perf_counter() - start)
+
+
+def headless(agent_files):
+    return lambda seed: play_game([load_agent(path) for path in agent_files], seed=seed)
+
+
+def kaggle(agent_files):
+    from kaggle_environments import make  # pylint: disable=C0415
+
+    return lambda seed: make("halite").run(agent_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Games per second of the headless simulator")
+    parser.add_argument("--games", type=int, default=5, help="Games per measurement")
+    args = parser.parse_args()
+
+    idle = [None, None]
+    rules = games_per_second(lambda seed: play_game(idle, HaliteConfig(), seed), args.games)
+    print(f"{'rules only, idle agents':<40} {rules:8.2f} games/s")
+    for agent_files in [AGENT_FILES[:1] * 2, AGENT_FILES]:
+        name = " vs ".join(path.rsplit("/", 1)[-1][:-3] for path in agent_files)
+        print(
+            f"{'headless ' + name:<40} {games_per_second(headless(agent_files), args.games):8.2f} games/s"
+        )
+        try:
+            rate = games_per_second(kaggle(agent_files), args.games)
+        except ImportError:
+            continue
+        print(f"{'kaggle ' + name:<40} {rate:8.2f} games/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+AGENTS = ["src/agents/single_ship_agent.py", "src/agents/first_agent.py"]
+
+# a fresh interpreter loads the agent file like kaggle does, executing it and taking its last
+# callable, and plays one turn
+FIRST_ACTION = """
+import json, time
+started = time.perf_counter()
+namespace = {"__name__": "agent"}
+with open(PATH) as source:
+    exec(compile(source.read(), PATH, "exec"), namespace)
+agent = [value for value in namespace.values() if callable(value)][-1]
+loaded = time.perf_counter()
+from src.utils import EXAMPLE_OBS, Observation
+agent(Observation(EXAMPLE_OBS), {"actTimeout": 2})
+print(json.dumps([loaded - started, time.perf_counter() - started]))
+"""
+
+
+# the floor of any agent: an interpreter importing numpy
+NUMPY_ONLY = """
+import json, time
+started = time.perf_counter()
+import numpy
+print(json.dumps([time.perf_counter() - started] * 2))
+"""
+
+
+def cold_start(code: str, cache: str):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "HALITE_TABLE_CACHE": cache},
+    ).stdout
+    load, first_action = json.loads(output.splitlines()[-1])
+    return time.perf_counter() - start, load, first_action
+
+
+def median_start(code: str, runs: int, cold_cache: bool):
+    # a cold cache is a new empty table cache every run, a warm one is filled by a first run
+    with tempfile.TemporaryDirectory() as directory:
+        caches = [
+            os.path.join(directory, str(run) if cold_cache else "warm") for run in range(runs + 1)
+        ]
+        times = [cold_start(code, cache) for cache in caches]
+    return [statistics.median(column) for column in zip(*times[1:])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start time of the agents to first action")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes per agent")
+    args = parser.parse_args()
+
+    print(f"{'agent':<34} {'cache':>6} {'process':>10} {'load':>10} {'first action':>14}")
+    rows = [("numpy import", NUMPY_ONLY, False)] + [
+        (path, FIRST_ACTION.replace("PATH", repr(path)), cold_cache)
+        for path in AGENTS
+        for cold_cache in (True, False)
+    ]
+    for name, code, cold_cache in rows:
+        process, load, first_action = median_start(code, args.runs, cold_cache)
+        print(
+            f"{name:<34} {('cold' if cold_cache else 'warm') if name in AGENTS else '-':>6} {process * 1e3:>8.1f}ms "
+            f"{load * 1e3:>8.1f}ms {first_action * 1e3:>12.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
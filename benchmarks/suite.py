@@ -0,0 +1,171 @@
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.agents import first_agent as first_agent_module
+from src.agents import single_ship_agent
+from src.agents.first_agent import Move as FirstMove
+from src.agents.first_agent import Player, Position, Ship
+from src.agents.single_ship_agent import Move, Task
+from src.cluster import ClusterSearch
+from src.planning import collection_bonus, plan_fleet_moves
+from src.plans import Plan
+from src.projection import collect_gain
+from src.tracing import Tracer
+from src.value_map import ValueMap
+
+from .synthetic import synthetic_observation
+
+Benchmark = Callable[[], object]
+FLEET_SIZES = [1, 10, 40]
+
+
+def latency_stats(latencies: List[float], allocations: List[int]) -> Dict[str, float]:
+    samples = np.array(latencies) * 1e6
+    return {
+        "calls": len(latencies),
+        "mean_us": float(samples.mean()),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p95_us": float(np.percentile(samples, 95)),
+        "p99_us": float(np.percentile(samples, 99)),
+        "max_us": float(samples.max()),
+        "peak_alloc_kib": float(np.mean(allocations)) / 1024,
+    }
+
+
+def measure(benchmark: Benchmark, calls: int) -> Dict[str, float]:
+    benchmark()
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        benchmark()
+        latencies.append(time.perf_counter() - start)
+
+    # allocations are traced in a separate pass, tracing slows every allocation down; tracing
+    # starts afresh for every call, which resets the peak on python 3.7 too
+    allocations = []
+    for _ in range(max(calls // 10, 1)):
+        tracemalloc.start()
+        try:
+            benchmark()
+            allocations.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return latency_stats(latencies, allocations)
+
+
+def micro_benchmarks() -> Dict[str, Benchmark]:
+    obs = synthetic_observation(fleet_size=10)
+    board = np.reshape(np.float32(obs["halite"]), (15, 15))
+    ships = obs.players[0][2]
+    cells = [pos for pos, _ in ships.values()]
+    cargo = [halite for _, halite in ships.values()]
+    search = ClusterSearch(board)
+    position = Position(3, 4)
+    tracer = Tracer("bench")
+
+    def navigate_ship():
+        ship = Ship("bench", Position(14, 5))
+        ship.navigate_to_pos(Position(3, 14))
+
+    return {
+        "cluster_search.scores": lambda: ClusterSearch(board).scores(3),
+        "first_agent.find_halite_cluster": lambda: first_agent_module.find_halite_cluster(board, 5),
+        "value_map.ValueMap": lambda: ValueMap(search.scores(3), [112]),
+        "single_ship_agent.projected_halite": lambda: single_ship_agent.projected_halite(
+            (3, 4), [Move.COLLECT, Move.EAST, Move.COLLECT], (7, 7), board, 250
+        ),
+        "single_ship_agent.get_best_move": lambda: single_ship_agent.get_best_move(
+            (3, 4), (7, 7), 250, board
+        ),
+        "projection.collect_gain": lambda: collect_gain(263.0, 6, 4),
+        "planning.collection_bonus": lambda: collection_bonus(
+            board.ravel(), single_ship_agent.PLANNING_HORIZON - 1
+        ),
+        "planning.plan_fleet_moves[10]": lambda: plan_fleet_moves(
+            cells, [112] * len(cells), cargo, board, single_ship_agent.PLANNING_HORIZON, 10
+        ),
+        "single_ship_agent.navigate_to": lambda: single_ship_agent.navigate_to(3, 200),
+        "single_ship_agent.get_dist": lambda: single_ship_agent.get_dist(3, 200),
+        "first_agent.Ship.navigate_to_pos": navigate_ship,
+        "first_agent.Position.get_adjacent_position": lambda: position.get_adjacent_position(
+            FirstMove.NORTH
+        ),
+        "tracing.disabled_trace_point": lambda: tracer.debug(3, "ship", name="bench", cell=112),
+    }
+
+
+def single_ship_turn(obs) -> Benchmark:
+    agent = single_ship_agent.make_agent()
+
+    def turn():
+        # every ship replans, the most expensive kind of turn
+        for uid in obs.players[obs.player][2]:
+            agent.states[uid] = [Task.COLLECT, Plan()]
+        agent(obs)
+
+    return turn
+
+
+def first_agent_turn(obs) -> Benchmark:
+    def turn():
+        first_agent_module.PLAYER = Player()
+        first_agent_module.first_agent(obs)
+
+    return turn
+
+
+def macro_benchmarks() -> Dict[str, Benchmark]:
+    benchmarks = {}
+    for fleet_size in FLEET_SIZES:
+        obs = synthetic_observation(fleet_size=fleet_size, step=200)
+        benchmarks[f"single_ship_agent.agent[{fleet_size} ships]"] = single_ship_turn(obs)
+        benchmarks[f"first_agent[{fleet_size} ships]"] = first_agent_turn(obs)
+    return benchmarks
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-turn latency benchmarks of the agents")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per benchmark")
+    args = parser.parse_args()
+
+    results = {}
+    for group, benchmarks in [("micro", micro_benchmarks()), ("macro", macro_benchmarks())]:
+        for name, benchmark in benchmarks.items():
+            stats = measure(benchmark, args.calls)
+            results[f"{group}/{name}"] = stats
+            print(
+                f"{group}/{name:<48} p50 {stats['p50_us']:9.1f} us  p95 {stats['p95_us']:9.1f} us  "
+                f"p99 {stats['p99_us']:9.1f} us  max {stats['max_us']:9.1f} us  "
+                f"alloc {stats['peak_alloc_kib']:8.1f} KiB"
+            )
+
+    if args.output:
+        report = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "calls": args.calls,
+            "results": results,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
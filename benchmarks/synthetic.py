@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.utils import Observation
+
+HALITE_DISTRIBUTIONS = ("uniform", "clustered", "sparse")
+
+
+def synthetic_board(rng: np.random.RandomState, size: int, distribution: str) -> np.ndarray:
+    if distribution == "uniform":
+        return rng.rand(size, size) * 500
+    if distribution == "sparse":
+        return np.where(rng.rand(size, size) < 0.1, rng.rand(size, size) * 1000, 0)
+    if distribution == "clustered":
+        # a few gaussian blobs, mirrored like the generated halite boards
+        rows, cols = np.mgrid[0:size, 0:size]
+        board = np.zeros((size, size))
+        for _ in range(3):
+            center = rng.rand(2) * size
+            board += (
+                600 * rng.rand() * np.exp(-((rows - center[0]) ** 2 + (cols - center[1]) ** 2) / 8)
+            )
+        return (board + board[::-1] + board[:, ::-1] + board[::-1, ::-1]) / 4
+    raise ValueError(f"unknown halite distribution {distribution}")
+
+
+def synthetic_observation(
+    size: int = 15,
+    distribution: str = "clustered",
+    fleet_size: int = 5,
+    step: int = 100,
+    player_count: int = 2,
+    seed: int = 0,
+) -> Observation:
+    # fleet_size ships and one shipyard for every player, all on distinct cells
+    rng = np.random.RandomState(seed)
+    board = synthetic_board(rng, size, distribution)
+    cells = rng.choice(size**2, size=player_count * (fleet_size + 1), replace=False)
+
+    players = []
+    for player in range(player_count):
+        player_cells = cells[player * (fleet_size + 1) : (player + 1) * (fleet_size + 1)]
+        shipyards = {f"{player}-yard": int(player_cells[0])}
+        ships = {
+            f"{player}-{index}": [int(cell), float(rng.randint(0, 1000))]
+            for index, cell in enumerate(player_cells[1:])
+        }
+        players.append([float(rng.randint(0, 10000)), shipyards, ships])
+
+    return Observation(
+        player=0, step=step, halite=[float(value) for value in board.ravel()], players=players
+    )
@@ -0,0 +1,76 @@
+import argparse
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Tuple
+
+from src.batch_simulator import per_game_agent, play_batch
+from src.simulator import HaliteConfig, agent_factory, load_agent, play_game
+
+AGENTS = ["src/agents/single_ship_agent.py", "src/agents/first_agent.py"]
+
+
+def play_one(steps: int, seed: int):
+    return play_game([load_agent(path) for path in AGENTS], HaliteConfig(episode_steps=steps), seed)
+
+
+def process_per_game(games: int, steps: int) -> float:
+    # every game in a fresh worker process, paying its start up and imports
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        list(pool.map(play_one, [steps] * games, range(games)))
+    return games / (time.perf_counter() - start)
+
+
+def sequential(games: int, steps: int) -> float:
+    start = time.perf_counter()
+    for seed in range(games):
+        play_one(steps, seed)
+    return games / (time.perf_counter() - start)
+
+
+def interleaved(games: int, steps: int) -> float:
+    # all games at once in this process, one agent instance per game and player
+    agents = [per_game_agent(agent_factory(path)) for path in AGENTS]
+    start = time.perf_counter()
+    play_batch(agents, games, HaliteConfig(episode_steps=steps), seed=0)
+    return games / (time.perf_counter() - start)
+
+
+def interleaved_memory(games: int, steps: int) -> Tuple[int, int]:
+    # => the peak of memory allocated while playing, and the most ship tasks an agent keeps
+    made = []
+
+    def make(factory):
+        made.append(factory())
+        return made[-1]
+
+    agents = [per_game_agent(partial(make, agent_factory(path))) for path in AGENTS]
+    tracemalloc.start()
+    play_batch(agents, games, HaliteConfig(episode_steps=steps), seed=0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, max(len(agent.states) for agent in made if hasattr(agent, "states"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Games one worker process plays per second")
+    parser.add_argument("--games", type=int, default=8, help="Games per measurement")
+    parser.add_argument("--steps", type=int, default=100, help="Steps per game")
+    args = parser.parse_args()
+
+    print(f"{'one worker':<32} {'games/s':>10}")
+    print(f"{'a process per game':<32} {process_per_game(args.games, args.steps):>10.2f}")
+    print(f"{'games one after another':<32} {sequential(args.games, args.steps):>10.2f}")
+    for games in (args.games, 4 * args.games):
+        rate = interleaved(games, args.steps)
+        peak, tasks = interleaved_memory(games, args.steps)
+        print(
+            f"{f'{games} games interleaved':<32} {rate:>10.2f}   peak {peak / 2 ** 20:.1f} MiB, "
+            f"at most {tasks} ship tasks kept per agent"
+        )
+
+
+if __name__ == "__main__":
+    main()
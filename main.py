@@ -1,6 +1,16 @@
 import argparse
 
-from src.run import run_evaluate, run_example_obs, run_test, run_single
+from src.run import (
+    run_evaluate,
+    run_example_obs,
+    run_profile,
+    run_regress,
+    run_single,
+    run_sweep,
+    run_test,
+    run_tournament,
+)
+from src.tracing import JsonLinesSink, configure, parse_levels
 from src.utils import RunCommand
 
 
@@ -8,22 +18,106 @@ def main(args):
     if args.cmd not in list(map(lambda x: x.value, RunCommand)):
         raise KeyError
 
+    if args.trace:
+        configure(parse_levels(args.trace_levels), args.trace_every, JsonLinesSink.open(args.trace))
+
     if args.cmd == "test":
-        run_test()
+        run_test(args.record)
 
     if args.cmd == "single":
-        run_single()
+        run_single(args.record)
 
     if args.cmd == "eval":
-        run_evaluate()
+        run_evaluate(args.agents, args.episodes, args.workers, args.seed, args.headless, args.sprt)
 
     if args.cmd == "example":
         run_example_obs()
 
+    if args.cmd == "profile":
+        run_profile(args.agents, args.episodes, args.seed, args.output)
+
+    if args.cmd == "regress":
+        agent = args.agents[0] if args.agents else "src/agents/single_ship_agent.py"
+        if not run_regress(agent, args.baseline, args.replays, args.workers, update=args.update):
+            raise SystemExit(1)
+
+    if args.cmd == "tournament":
+        run_tournament(
+            args.agents,
+            args.schedule,
+            args.players,
+            args.episodes,
+            args.rounds,
+            args.workers,
+            args.seed,
+            args.headless,
+        )
+
+    if args.cmd == "sweep":
+        run_sweep(
+            args.agents,
+            args.space,
+            args.search,
+            args.episodes,
+            args.samples,
+            args.workers,
+            args.seed,
+            args.cache,
+        )
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Enter run command")
     parser.add_argument("cmd", help="Keyword for run command")
+    parser.add_argument(
+        "--episodes",
+        type=int,
+        default=10,
+        help="Number of episodes to play, per tournament match or sweep candidate",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first episode")
+    parser.add_argument("--agents", nargs="+", help="Agent file paths, one per player")
+    parser.add_argument(
+        "--headless", action="store_true", help="Play with the in-repo simulator, not kaggle"
+    )
+    parser.add_argument(
+        "--schedule", default="round-robin", help="Tournament pairings: round-robin or swiss"
+    )
+    parser.add_argument("--players", type=int, default=2, help="Players per tournament game")
+    parser.add_argument("--rounds", type=int, default=1, help="Tournament rounds")
+    parser.add_argument(
+        "--sprt",
+        nargs=2,
+        type=float,
+        metavar=("ELO0", "ELO1"),
+        help="Stop the evaluation once the first agent is shown to be ELO0 or ELO1 stronger",
+    )
+    parser.add_argument(
+        "--space",
+        nargs="+",
+        default=[],
+        help="Sweep params, as name=1,2,3 for choices or name=0.5:0.9 for a range",
+    )
+    parser.add_argument("--search", default="grid", help="Sweep search: grid, random or halving")
+    parser.add_argument("--samples", type=int, help="Candidates a random sweep samples")
+    parser.add_argument(
+        "--cache", default="sweep_cache.jsonl", help="Sweep results file, reused across sweeps"
+    )
+    parser.add_argument("--output", help="Write the profile report as JSON to this file")
+    parser.add_argument("--record", help="Record the games as replays into this directory")
+    parser.add_argument("--replays", help="Replay directory the regress command plays")
+    parser.add_argument(
+        "--baseline", default="baseline.json", help="Decisions the regress command compares to"
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="Overwrite the baseline of the regress command"
+    )
+    parser.add_argument("--trace", help="Append trace records as JSON lines to this file")
+    parser.add_argument(
+        "--trace-levels", default="info", help="Trace levels, e.g. info,first_agent=debug"
+    )
+    parser.add_argument("--trace-every", type=int, default=1, help="Trace every Nth turn only")
     args = parser.parse_args()
 
     main(args)
@@ -1,19 +1,39 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+from typing import FrozenSet, List, NamedTuple, Tuple
 
-import logging
 from enum import Enum
 from random import choice, random
 
 import numpy as np
 
-logger = logging.getLogger()  # pylint: disable = C0103
+from src.budget import BudgetLog, TurnBudget, get_budget_log
+from src.cluster import ClusterSearch
+from src.occupancy import Occupancy
+from src.plans import Plan
+from src.profiling import get_phase_timer
+from src.routing import AXIS_OFFSETS, NEIGHBOURS
+from src.tracing import DEBUG, get_tracer
+
+TRACER = get_tracer("first_agent")
+PHASES = get_phase_timer("first_agent")
 
 SIZE = 15
 MOVE_PROB = 0.66
 
 
+class Params(NamedTuple):
+    # the constants a sweep tunes, see src/sweep.py
+    move_prob: float = MOVE_PROB
+    cluster_size: int = 5
+    # ships with less cargo collect around them, ships with more than return_above return it
+    collect_below: int = 500
+    return_above: int = 2000
+
+
+DEFAULT_PARAMS = Params()
+
+
 class Move(Enum):
     NORTH = "NORTH"
     SOUTH = "SOUTH"
@@ -22,7 +42,14 @@ class Move(Enum):
     COLLECT = None
 
 
+MOVES = list(Move)
+MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+ADJACENT_CELLS = NEIGHBOURS.tolist()
+
+
 class Position:
+    __slots__ = ("x", "y")
+
     def __init__(self, x: int, y: int):
         self.x = x  # pylint: disable=C0103
         self.y = y  # pylint: disable=C0103
@@ -34,20 +61,21 @@ class Position:
         return f"({self.x},{self.y})"
 
     def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
+        return isinstance(other, Position) and self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return self.cell
+
+    @property
+    def cell(self) -> int:
+        return self.x * SIZE + self.y
 
     def get_adjacent_position(self, move: Move) -> Position:
-        if move == Move.NORTH:
-            return Position((self.x - 1) % SIZE, self.y)
-        if move == Move.SOUTH:
-            return Position((self.x + 1) % SIZE, self.y)
-        if move == Move.EAST:
-            return Position(self.x, (self.y + 1) % SIZE)
-        if move == Move.WEST:
-            return Position(self.x, (self.y - 1) % SIZE)
         if move == Move.COLLECT:
             return self
-        raise TypeError
+        if move not in MOVE_CODES:
+            raise TypeError
+        return POSITIONS[ADJACENT_CELLS[self.cell][MOVE_CODES[move]]]
 
     def get_all_adjacent_positions(self) -> List[Position]:
         return list(
@@ -55,15 +83,33 @@ class Position:
         )
 
 
+# one shared, immutable instance per board cell
+POSITIONS = [Position(*divmod(cell, SIZE)) for cell in range(SIZE ** 2)]
+
+
 def board_pos_to_position(pos) -> Position:
-    return Position(pos // SIZE, pos % SIZE)
+    return POSITIONS[pos]
+
+
+class FleetView(NamedTuple):
+    # struct-of-arrays view of a player's ships
+    names: List[str]
+    cells: np.ndarray
+    halite: np.ndarray
+
+
+def random_local_task() -> Move:
+    move = choice(list(Move))
+    return choice([move, Move.COLLECT])
 
 
 class Ship:
+    __slots__ = ("pos", "name", "tasks", "halite")
+
     def __init__(self, name: str, pos: Position):
         self.pos = pos
         self.name = name
-        self.tasks: List[Move] = []
+        self.tasks = Plan()
         self.halite = 0
 
     def move(self, move: Move) -> None:
@@ -74,14 +120,13 @@ class Ship:
         self.halite += int(0.25 * board[self.pos.x][self.pos.y])
 
     def add_task(self, task: Move) -> None:
-        self.tasks.append(task)
+        self.tasks.add(task)
 
     def continue_task(
         self, board: List[float]
     ) -> Move:  # for now assume tasks are only of type Move
         if self.tasks:
-            task = self.tasks[0]
-            self.tasks = self.tasks[1:]
+            task = self.tasks.pop()
             if task.value is None:
                 self.collect(board)
                 return Move.COLLECT
@@ -92,39 +137,16 @@ class Ship:
         raise ValueError
 
     def navigate_to_pos(self, pos: Position) -> None:
-        direct_x = self.pos.x - pos.x
-        border_x = (
-            (self.pos.x + SIZE - pos.x) if self.pos.x < pos.x else (self.pos.x - (pos.x + SIZE))
-        )
-        direct_y = self.pos.y - pos.y
-        border_y = (
-            (self.pos.y + SIZE - pos.y) if self.pos.y < pos.y else (self.pos.y - (pos.y + SIZE))
-        )
+        delta_x = int(AXIS_OFFSETS[self.pos.x, pos.x])
+        delta_y = int(AXIS_OFFSETS[self.pos.y, pos.y])
 
-        delta_x = direct_x if abs(direct_x) < abs(border_x) else border_x
-        delta_y = direct_y if abs(direct_y) < abs(border_y) else border_y
-
-        if delta_x > 0:
-            for _ in range(abs(delta_x)):
-                self.tasks.append(Move.NORTH)
-        else:
-            for _ in range(abs(delta_x)):
-                self.tasks.append(Move.SOUTH)
-
-        if delta_y < 0:
-            for _ in range(abs(delta_y)):
-                self.tasks.append(Move.EAST)
-        else:
-            for _ in range(abs(delta_y)):
-                self.tasks.append(Move.WEST)
+        self.tasks.add(Move.NORTH if delta_x < 0 else Move.SOUTH, abs(delta_x))
+        self.tasks.add(Move.EAST if delta_y > 0 else Move.WEST, abs(delta_y))
 
     def collect_in_local_cluster(
         self, halite_matrix: List[float], cluster_size: int
     ) -> bool:  # should later be a good collection algorithm.
-        for _ in range(cluster_size ** 2):
-            move = choice(list(Move))
-            task = choice([move, Move.COLLECT])
-            self.add_task(task)
+        self.tasks.add_generated(random_local_task, cluster_size ** 2)
         return True
 
     def __str__(self):
@@ -138,6 +160,8 @@ class Ship:
 
 
 class Shipyard:
+    __slots__ = ("pos", "name", "occupied")
+
     def __init__(self, name: str, pos: Position):
         self.pos = pos
         self.name = name
@@ -159,6 +183,19 @@ class Shipyard:
         self.occupied = False
 
 
+class Changes(NamedTuple):
+    new_ships: FrozenSet[str]
+    lost_ships: FrozenSet[str]
+    moved_ships: FrozenSet[str]  # not where our own bookkeeping expected them
+    cargo_changed: FrozenSet[str]
+    new_shipyards: FrozenSet[str]
+    lost_shipyards: FrozenSet[str]
+
+    @property
+    def replan_ships(self) -> FrozenSet[str]:
+        return self.new_ships | self.moved_ships
+
+
 class Player:
     def __init__(self):
         self.step = 0
@@ -195,140 +232,223 @@ class Player:
         else:
             raise KeyError
 
-    def set_occupations(self) -> None:
-        occupied_positions = list(map(lambda x: x.pos, self.ships.values()))
+    def occupancy(self) -> Occupancy:
+        occupancy = Occupancy()
+        occupancy.place(ship.pos.cell for ship in self.ships.values())
+        return occupancy
 
+    def set_occupations(self) -> None:
+        occupancy = self.occupancy()
         for shipyard in self.shipyards.values():
-            if shipyard.pos not in occupied_positions:
-                shipyard.occupied = False
-            else:
-                shipyard.occupied = True
+            shipyard.occupied = occupancy.occupied(shipyard.pos.cell)
 
     def all_ship_positions(self) -> List[Tuple[str, Position]]:
         return list(map(lambda x: (x.name, x.pos), self.ships.values()))
 
     def crash_test(self) -> bool:
-        occupied = self.all_ship_positions()
-        if len(set(occupied)) < len(occupied):
-            return True
-        return False
+        return not Occupancy().place(ship.pos.cell for ship in self.ships.values())
+
+    def sync(self, obs) -> Changes:
+        # apply the differences between the observation and our bookkeeping, the ships' plans
+        # are left to the turn
+        halite, shipyards, ships = obs["players"][obs["player"]]
+        self.step = obs["step"]
+        self.halite = halite
+
+        new_shipyards = frozenset(shipyards.keys() - self.shipyards.keys())
+        lost_shipyards = frozenset(self.shipyards.keys() - shipyards.keys())
+        for name in lost_shipyards:
+            del self.shipyards[name]
+        for name in new_shipyards:
+            self.shipyards[name] = Shipyard(name, board_pos_to_position(shipyards[name]))
+
+        new_ships = frozenset(ships.keys() - self.ships.keys())
+        lost_ships = frozenset(self.ships.keys() - ships.keys())
+        for name in lost_ships:
+            del self.ships[name]
+
+        moved_ships = set()
+        cargo_changed = set()
+        for name, (board_pos, cargo) in ships.items():
+            if name in new_ships:
+                self.ships[name] = Ship(name, board_pos_to_position(board_pos))
+                self.ships[name].halite = cargo
+                continue
+            ship = self.ships[name]
+            if ship.pos.cell != board_pos:
+                ship.pos = board_pos_to_position(board_pos)
+                moved_ships.add(name)
+            if ship.halite != cargo:
+                ship.halite = cargo
+                cargo_changed.add(name)
+
+        return Changes(
+            new_ships,
+            lost_ships,
+            frozenset(moved_ships),
+            frozenset(cargo_changed),
+            new_shipyards,
+            lost_shipyards,
+        )
+
+    def fleet_view(self) -> FleetView:
+        ships = list(self.ships.values())
+        return FleetView(
+            [ship.name for ship in ships],
+            np.array([ship.pos.cell for ship in ships], dtype=np.int16),
+            np.array([ship.halite for ship in ships], dtype=np.int32),
+        )
 
 
 PLAYER = Player()
+BUDGET_LOG = get_budget_log("first_agent")
 
 
 def find_halite_cluster(halite_matrix: np.ndarray, cluster_size: int) -> Position:
-    best_top_left_pos = Position(0, 0)
-    best_value = 0
-    for x_ind in range(halite_matrix.shape[0] - cluster_size + 1):
-        for y_ind in range(halite_matrix.shape[1] - cluster_size + 1):
-            submatrix = halite_matrix[
-                x_ind : (x_ind + cluster_size), y_ind : (y_ind + cluster_size)
-            ]
-            submatrix_value = sum(sum(submatrix))  # type: ignore
-            if submatrix_value > best_value:
-                best_value = submatrix_value
-                best_top_left_pos = Position(x_ind, y_ind)
-
-    return Position(
-        best_top_left_pos.x + cluster_size // 2, best_top_left_pos.y + cluster_size // 2
-    )
-
-
-def initialize(obs) -> None:
-    shipyards = obs["players"][obs["player"]][1]
-    for name, board_pos in shipyards.items():
-        PLAYER.add_shipyard(name, board_pos_to_position(board_pos))
-
-    ships = obs["players"][obs["player"]][2]
-    for name, props in ships.items():
-        PLAYER.add_ship(name, board_pos_to_position(props[0]))
-    logger.warning("Initialize finished")
-
-
-def first_agent(obs):
-    logger.warning(f"step {obs['step']}, player {obs['players'][0]}")
+    with PHASES.phase("cluster_search"):
+        center_x, center_y = ClusterSearch(halite_matrix).top_centres(cluster_size)[0]
+    return Position(center_x, center_y)
+
+
+def play_turn(
+    player: Player, budget_log: BudgetLog, obs, config=None, params: Params = DEFAULT_PARAMS
+):
+    budget = TurnBudget.from_configuration(config)
     action_dict = {}
-    owned_halite = obs["players"][0][0]
-    board = np.reshape(np.float32(obs["halite"]), (15, 15))
+    with PHASES.phase("sync"):
+        changes = player.sync(obs)
+    owned_halite = player.halite
+    TRACER.info(player.step, "turn", halite=owned_halite, ships=len(player.ships))
+    with PHASES.phase("board"):
+        board = np.reshape(np.float32(obs["halite"]), (15, 15))
     action_counter = 1
     new_ship_names = set()
     new_shipyard_names = set()
 
-    if PLAYER.step == 0:
-        initialize(obs)
-
-    for shipyard in PLAYER.shipyards.values():
-        logger.warning(shipyard)
-    for ship in PLAYER.ships.values():
-        logger.warning(ship)
+    if TRACER.enabled(DEBUG, player.step):
+        for shipyard in player.shipyards.values():
+            TRACER.debug(player.step, "shipyard", name=shipyard.name, cell=shipyard.pos.cell)
+        for ship in player.ships.values():
+            TRACER.debug(
+                player.step,
+                "ship",
+                name=ship.name,
+                cell=ship.pos.cell,
+                halite=ship.halite,
+                tasks=len(ship.tasks),
+            )
 
     # convert random ship to shipyard
-    if PLAYER.ships and owned_halite > 4000 and not PLAYER.shipyards:
-        converted_ship_name = choice(list(PLAYER.ships))
-        shipyard_name = f"{PLAYER.step+1}-{action_counter}"
-        new_shipyard_names.add(shipyard_name)
-        PLAYER.convert_ship(converted_ship_name, shipyard_name)
-        action_dict[converted_ship_name] = "CONVERT"
-        owned_halite -= 2000
-        action_counter += 1
-
-    # choose action for each ship
-    for ship_name, ship in PLAYER.ships.items():
-        if ship_name in new_ship_names:
-            continue
-
-        if ship.tasks:
-            task = ship.continue_task(board)
-
-        elif ship.halite < 500:
-            collects_locally = ship.collect_in_local_cluster(halite_matrix=board, cluster_size=5)
-            if collects_locally:
-                logger.warning("HERE HE COLLECTS\n\n")
+    with PHASES.phase("convert"):
+        if player.ships and owned_halite > 4000 and not player.shipyards:
+            converted_ship_name = choice(list(player.ships))
+            shipyard_name = f"{player.step+1}-{action_counter}"
+            new_shipyard_names.add(shipyard_name)
+            player.convert_ship(converted_ship_name, shipyard_name)
+            action_dict[converted_ship_name] = "CONVERT"
+            owned_halite -= 2000
+            action_counter += 1
+
+    # choose action for each ship, ships reserve the cell they move to in turn
+    occupancy = Occupancy()
+    with PHASES.phase("ships"):
+        for ship_name, ship in player.ships.items():
+            if ship_name in new_ship_names:
+                continue
+            cell = ship.pos.cell
+            if ship_name in changes.replan_ships:
+                # new, or not where its plan put it: plans again from its cell
+                ship.tasks.cancel()
+
+            if ship.tasks:
                 task = ship.continue_task(board)
-            else:
-                cluster_center = find_halite_cluster(halite_matrix=board, cluster_size=5)
-                ship.navigate_to_pos(cluster_center)
-                if not ship.tasks:
-                    task = Move.COLLECT
-                else:
+
+            elif budget.expired():  # no time left to plan, collect in place
+                task = Move.COLLECT
+                ship.collect(board)
+
+            elif ship.halite < params.collect_below:
+                collects_locally = ship.collect_in_local_cluster(
+                    halite_matrix=board, cluster_size=params.cluster_size
+                )
+                if collects_locally:
+                    TRACER.debug(player.step, "collect_locally", name=ship_name)
                     task = ship.continue_task(board)
+                else:
+                    cluster_center = find_halite_cluster(
+                        halite_matrix=board, cluster_size=params.cluster_size
+                    )
+                    ship.navigate_to_pos(cluster_center)
+                    if not ship.tasks:
+                        task = Move.COLLECT
+                    else:
+                        task = ship.continue_task(board)
+
+            elif ship.halite > params.return_above:
+                ship.navigate_to_pos(list(player.shipyards.values())[0].pos)
+                task = ship.continue_task(board)
 
-        elif ship.halite > 2000:
-            ship.navigate_to_pos(list(PLAYER.shipyards.values())[0].pos)
-            task = ship.continue_task(board)
-
-        elif random() < MOVE_PROB:  # move ship
-            task = choice(list(Move))
-            ship.move(task)
-        else:  # collect
-            task = Move.COLLECT
-            ship.collect(board)
-
-        if task != Move.COLLECT:
-            action_dict[ship_name] = task.value
-
-    PLAYER.set_occupations()
-    # spawn ship in random shipyard when no ship in shipyard and no ship available
-    spawnable_shipyards = list(
-        map(
-            lambda x: x.name,
-            filter(
-                lambda x: x.name not in new_shipyard_names and not x.occupied,
-                PLAYER.shipyards.values(),
-            ),
+            elif random() < params.move_prob:  # move ship
+                task = choice(list(Move))
+                ship.move(task)
+            else:  # collect
+                task = Move.COLLECT
+                ship.collect(board)
+
+            move = occupancy.claim(cell, MOVE_CODES[task])
+            if move != MOVE_CODES[task]:
+                # another ship took the cell, the rest of the plan starts from the wrong cell
+                task = MOVES[move]
+                ship.pos = board_pos_to_position(ADJACENT_CELLS[cell][move])
+                ship.tasks.cancel()
+            if task != Move.COLLECT:
+                action_dict[ship_name] = task.value
+
+    with PHASES.phase("spawn"):
+        player.set_occupations()
+        # spawn ship in random shipyard when no ship in shipyard and no ship available
+        spawnable_shipyards = list(
+            map(
+                lambda x: x.name,
+                filter(
+                    lambda x: x.name not in new_shipyard_names and not x.occupied,
+                    player.shipyards.values(),
+                ),
+            )
         )
-    )
-    if spawnable_shipyards and owned_halite >= 500 and len(PLAYER.ships) == 0:
-        spawning_shipyard_name = choice(list(spawnable_shipyards))
-        # only spawn when no ship in shipyard
-        ship_name = f"{PLAYER.step+1}-{action_counter}"
-        new_ship_names.add(ship_name)
-        PLAYER.spawn_ship(spawning_shipyard_name, ship_name)
-        action_dict[spawning_shipyard_name] = "SPAWN"
-        owned_halite -= 500
-        action_counter += 1
-
-    logger.warning(f"Actions:\t {action_dict}")  # pylint: disable = W1202
-    PLAYER.step += 1
+        if spawnable_shipyards and owned_halite >= 500 and len(player.ships) == 0:
+            spawning_shipyard_name = choice(list(spawnable_shipyards))
+            # only spawn when no ship in shipyard
+            ship_name = f"{player.step+1}-{action_counter}"
+            new_ship_names.add(ship_name)
+            player.spawn_ship(spawning_shipyard_name, ship_name)
+            action_dict[spawning_shipyard_name] = "SPAWN"
+            owned_halite -= 500
+            action_counter += 1
+
+    TRACER.info(player.step, "actions", actions=action_dict)
+    budget_log.record(budget.usage(obs["step"]))
+    PHASES.end_turn()
     return action_dict
+
+
+class FirstAgent:
+    # one game's Player, for playing several games in one process
+
+    def __init__(self, params: Params = DEFAULT_PARAMS):
+        self.player = Player()
+        self.budget_log = BudgetLog()
+        self.params = params
+
+    def __call__(self, obs, config=None):
+        return play_turn(self.player, self.budget_log, obs, config, self.params)
+
+
+def make_agent(**params) -> FirstAgent:
+    # params override fields of Params
+    return FirstAgent(Params(**params))
+
+
+# the game kaggle plays, on the module's PLAYER; first_agent must stay the last callable here
+def first_agent(obs, config=None):
+    return play_turn(PLAYER, BUDGET_LOG, obs, config)
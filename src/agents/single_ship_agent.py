@@ -1,7 +1,23 @@
 import numpy as np
 from enum import Enum
-from copy import deepcopy
-from itertools import product
+from typing import NamedTuple, Optional
+
+from src.budget import BudgetLog, TurnBudget, get_budget_log
+from src.cluster import ClusterSearch
+from src.forecast import Forecast, planned_collections
+from src.occupancy import resolve_moves
+from src.planning import plan_fleet_moves
+from src.plans import Plan
+from src.profiling import get_phase_timer
+from src.projection import (
+    DISCOUNT,
+    MOVE_DECAY,
+    REGENERATION,
+    TURN_DISCOUNT,
+    discount_table,
+)
+from src.routing import DISTANCES, FIRST_MOVES, STAY
+from src.value_map import ValueMap
 
 
 class Move(Enum):
@@ -12,13 +28,35 @@ class Move(Enum):
     COLLECT = "COLLECT"
 
 
+MOVES = list(Move)
+MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+PLANNING_HORIZON = 4
+MIN_PLANNING_HORIZON = 2
+MAX_PLANNING_HORIZON = 6
+BEAM_WIDTH = 10
+
+
 class Task(Enum):
     COLLECT = "collect"
     EXPLORE = "explore"
     RETURN = "return"
 
 
+class Params(NamedTuple):
+    # the constants a sweep tunes, see src/sweep.py
+    cluster_size: int = 3
+    # ships return once the shipyard is more than return_step - step turns away
+    return_step: int = 396
+    # the planner discounts a turn's worth of halite by this factor
+    turn_discount: float = TURN_DISCOUNT
+
+
+DEFAULT_PARAMS = Params()
+
+
 states = {}
+budget_log = get_budget_log("single_ship_agent")
+phase_timer = get_phase_timer("single_ship_agent")
 
 
 def get_next_position(pos, move: Move):
@@ -39,62 +77,73 @@ def get_all_next_positions(pos):
 
 
 def get_dist(pos1, pos2):
-    return get_grid_dist(position_to_grid_pos(pos1), position_to_grid_pos(pos2))
+    return int(DISTANCES[pos1, pos2])
 
 
 def get_grid_dist(pos1, pos2):
-    return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-
-
-def projected_collect_halite(curr_pos, collect_pos, dropoff_pos, board, halite, collect_turns):
-
-    halite_value_at_arrival = int(
-        1.02 ** (get_grid_dist(curr_pos, collect_pos)) * board[collect_pos[0]][collect_pos[1]]
-    )
-
-    collect_gain = int(
-        sum([0.25 * halite_value_at_arrival * 0.75 ** turn for turn in range(1, collect_turns + 1)])
-    )
-    projected_halite = int(
-        (0.9 ** (get_grid_dist(curr_pos, collect_pos)) * halite + collect_gain)
-        * 0.9 ** (get_grid_dist(collect_pos, dropoff_pos))
-    )
-    return projected_halite
+    return get_dist(grid_pos_to_position(pos1), grid_pos_to_position(pos2))
 
 
 def projected_halite(curr_pos, moves, dropoff_pos, board, halite):
-    board = deepcopy(board)
+    collected = {}
     for index, move in enumerate(moves):
         if move != Move.COLLECT:
             halite = int(halite * 0.9)
             curr_pos = get_next_position(curr_pos, move)
         else:
-            collect_value = int(0.25 * (board[curr_pos[0]][curr_pos[1]] * 1.02 ** index))
+            cell_halite = board[curr_pos[0]][curr_pos[1]] - collected.get(curr_pos, 0)
+            collect_value = int(0.25 * (cell_halite * REGENERATION[index]))
             halite += collect_value
-            board[curr_pos[0]][curr_pos[1]] -= collect_value
+            collected[curr_pos] = collected.get(curr_pos, 0) + collect_value
 
     dropoff_dist = get_grid_dist(curr_pos, dropoff_pos)
-    return int((0.9 ** dropoff_dist * halite) / (1.05 ** len(moves)))
+    return int((MOVE_DECAY[dropoff_dist] * halite) / DISCOUNT[len(moves)])
 
 
-def get_best_move(pos, dropoff_pos, halite, board):
-    best_value = 0
+def get_best_moves(
+    positions, dropoff_pos, cargo, board, horizon=PLANNING_HORIZON, discount=DISCOUNT, forecast=None
+):
+    # get_best_move for a whole fleet, with the candidate sequences of all ships in one batch
+    cells = [grid_pos_to_position(pos) for pos in positions]
+    dropoff = grid_pos_to_position(dropoff_pos)
+    plans = plan_fleet_moves(
+        cells, [dropoff] * len(cells), cargo, board, horizon, BEAM_WIDTH, discount, forecast
+    )
+
     best_moves = []
+    for cell, halite, (move_codes, best_value) in zip(cells, cargo, plans):
+        if not move_codes:
+            best_moves.append([Move.NORTH])
+        elif int(MOVE_DECAY[DISTANCES[cell, dropoff]] * halite) > best_value:
+            best_moves.append([navigate_to(cell, dropoff)])
+        else:
+            best_moves.append([MOVES[code] for code in move_codes])
+    return best_moves
 
-    for move1, move2 in product(list(Move), repeat=2):
-        moves = [move1, move2]
-        val = projected_halite(pos, moves, dropoff_pos, board, halite)
 
-        if val > best_value:
-            best_value = val
-            best_moves = moves
+def get_best_move(pos, dropoff_pos, halite, board, horizon=PLANNING_HORIZON):
+    return get_best_moves([pos], dropoff_pos, [halite], board, horizon)[0]
 
-    if not best_moves:
-        return [Move.NORTH]
 
-    if projected_halite(pos, [], dropoff_pos, board, halite) > best_value:
-        best_moves = [grid_navigate_to(pos, dropoff_pos)]
+def get_best_moves_within(
+    positions, dropoff_pos, cargo, board, budget: TurnBudget, discount=DISCOUNT, forecast=None
+):
+    # iterative deepening: plan deeper while the budget allows another, at least twice as
+    # expensive, search and keep the deepest finished plans
+    horizon = MIN_PLANNING_HORIZON
+    started = budget.elapsed()
+    best_moves = get_best_moves(positions, dropoff_pos, cargo, board, horizon, discount, forecast)
+    duration = budget.elapsed() - started
 
+    while horizon < MAX_PLANNING_HORIZON and budget.allows(2 * duration):
+        started = budget.elapsed()
+        best_moves = get_best_moves(
+            positions, dropoff_pos, cargo, board, horizon + 1, discount, forecast
+        )
+        duration = budget.elapsed() - started
+        horizon += 1
+
+    budget.horizon = horizon
     return best_moves
 
 
@@ -103,44 +152,8 @@ def grid_navigate_to(from_pos, to_pos):
 
 
 def navigate_to(fromPos, toPos):
-    fromY, fromX = divmod(fromPos, 15)
-    toY, toX = divmod(toPos, 15)
-
-    if fromY < toY:
-        return Move.SOUTH
-    if fromY > toY:
-        return Move.NORTH
-    if fromX < toX:
-        return Move.EAST
-    if fromX > toX:
-        return Move.WEST
-    # => already there
-    return Move.COLLECT
-
-
-def evaluate_cluster(cluster_matrix, cluster_center, curr_pos):
-    travel_dist = 2 * get_grid_dist(cluster_center, curr_pos)
-    evaluation = sum(sum(cluster_matrix)) * 0.9 ** travel_dist  # type: ignore
-    return evaluation
-
-
-def find_halite_cluster(halite_matrix: np.ndarray, cluster_size: int, ship_pos: int):
-    grid_pos = position_to_grid_pos(ship_pos)
-    best_center_pos = (7, 7)
-    best_value = 0
-
-    for x_ind in range(halite_matrix.shape[0] - cluster_size + 1):
-        for y_ind in range(halite_matrix.shape[1] - cluster_size + 1):
-            submatrix = halite_matrix[
-                x_ind : (x_ind + cluster_size), y_ind : (y_ind + cluster_size)
-            ]
-            curr_center_pos = (x_ind + cluster_size // 2, y_ind + cluster_size // 2)
-            submatrix_value = evaluate_cluster(submatrix, curr_center_pos, grid_pos)
-            if submatrix_value > best_value:
-                best_value = submatrix_value
-                best_center_pos = curr_center_pos
-
-    return grid_pos_to_position(best_center_pos)
+    # => Move.COLLECT when already there
+    return MOVES[FIRST_MOVES[fromPos, toPos]]
 
 
 def grid_pos_to_position(pos):
@@ -151,72 +164,188 @@ def position_to_grid_pos(pos):
     return (pos // 15, pos % 15)
 
 
-def agent(obs):
+def fleet_step(
+    step,
+    board,
+    ships,
+    shipyard_pos,
+    states,
+    budget: Optional[TurnBudget] = None,
+    params: Params = DEFAULT_PARAMS,
+    opponent_cells=(),
+):
     action = {}
-    player_halite, shipyards, ships = obs.players[obs.player]
-    board = np.reshape(np.float32(obs["halite"]), (15, 15))
-    # print(player_halite, ships)
-
-    for uid, shipyard in shipyards.items():
-        if len(ships) == 0:
-            action[uid] = "SPAWN"
-
-    if shipyards:
-        shipyard_pos = list(shipyards.values())[0]
-
-    for uid, ship in ships.items():
-        if len(shipyards) == 0:
-            action[uid] = "CONVERT"
-            continue
-
+    uids = list(ships)
+    cells = np.array([ships[uid][0] for uid in uids], dtype=np.intp)
+    cargo = [ships[uid][1] for uid in uids]
+    returning = DISTANCES[cells, shipyard_pos] > params.return_step - step
+    discount = discount_table(params.turn_discount)
+    # ships explore towards the best cluster seen from their own cell
+    with phase_timer.phase("cluster_search"):
+        value_map = ValueMap(ClusterSearch(board).scores(params.cluster_size), [shipyard_pos])
+
+    replan = []
+    for index, uid in enumerate(uids):
         # Add new ships to states
         if uid not in states:
-            states[uid] = [Task.EXPLORE, find_halite_cluster(board, 3, shipyard_pos)]
-
-        pos, halite = ship
-        grid_pos = position_to_grid_pos(pos)
-
-        if get_dist(ship[0], shipyard_pos) > 396 - obs["step"]:
+            states[uid] = [Task.EXPLORE, value_map.target(cells[index])]
+        if returning[index]:
             states[uid] = [Task.RETURN, None]
-
+        if states[uid][0] == Task.COLLECT and not states[uid][1]:
+            replan.append(index)
+
+    # the replanning ships expect the board to regenerate, minus what the other ships planned
+    # to collect and what the opponents are expected to
+    with phase_timer.phase("forecast"):
+        collections = [
+            collection
+            for index, uid in enumerate(uids)
+            if states[uid][0] == Task.COLLECT and states[uid][1]
+            for collection in planned_collections(
+                int(cells[index]),
+                [MOVE_CODES[move] for move in states[uid][1].upcoming(MAX_PLANNING_HORIZON)],
+            )
+        ]
+        forecast = Forecast(board, MAX_PLANNING_HORIZON - 1, collections, opponent_cells)
+
+    replan_positions = [position_to_grid_pos(cells[index]) for index in replan]
+    replan_cargo = [cargo[index] for index in replan]
+    with phase_timer.phase("planning"):
+        if budget is None:
+            best_moves = get_best_moves(
+                replan_positions,
+                position_to_grid_pos(shipyard_pos),
+                replan_cargo,
+                board,
+                discount=discount,
+                forecast=forecast,
+            )
+        else:
+            best_moves = get_best_moves_within(
+                replan_positions,
+                position_to_grid_pos(shipyard_pos),
+                replan_cargo,
+                board,
+                budget,
+                discount,
+                forecast,
+            )
+    task_lists = dict(zip(replan, best_moves))
+
+    # ships with a navigation target other than their own cell move towards it, the others
+    # follow next_moves
+    targets = cells.copy()
+    next_moves = {}
+    for index, uid in enumerate(uids):
         if states[uid][0] == Task.COLLECT:
-            if states[uid][1]:
-                # print("continue!")
-                next_move = states[uid][1][0]
-                states[uid][1] = states[uid][1][1:]
-                if next_move != Move.COLLECT:
-                    action[uid] = next_move.value
+            if index not in task_lists:
+                next_moves[index] = states[uid][1].pop()
             else:
-                task_list = get_best_move(
-                    grid_pos, position_to_grid_pos(shipyard_pos), ship[1], board
-                )
-                states[uid] = [Task.COLLECT, task_list[1:]]
-                if task_list[0] != Move.COLLECT:
-                    action[uid] = task_list[0].value
-                if ship[0] == shipyard_pos:
-                    if ship[1] > 0:
-                        # print("DROP!")
+                task_list = task_lists[index]
+                states[uid] = [Task.COLLECT, Plan(task_list[1:])]
+                next_moves[index] = task_list[0]
+                if cells[index] == shipyard_pos:
+                    if cargo[index] > 0:
                         continue
-                    else:
-                        # print("explore!")
-                        states[uid] = [
-                            Task.EXPLORE,
-                            find_halite_cluster(board, 3, shipyard_pos),
-                        ]
+                    states[uid] = [Task.EXPLORE, value_map.target(cells[index])]
 
         if states[uid][0] == Task.EXPLORE:
-            if get_dist(ship[0], states[uid][1]) > 0:
-                next_move = navigate_to(ship[0], states[uid][1])
-                action[uid] = next_move.value
+            if cells[index] != states[uid][1]:
+                targets[index] = states[uid][1]
             else:
-                # print("collect!")
-                states[uid] = [Task.COLLECT, []]
+                states[uid] = [Task.COLLECT, Plan()]
 
         if states[uid][0] == Task.RETURN:
-            if get_dist(ship[0], shipyard_pos) > 0:
-                next_move = navigate_to(ship[0], shipyard_pos)
-                action[uid] = next_move.value
-            else:
-                continue
+            targets[index] = shipyard_pos
+
+    with phase_timer.phase("navigation"):
+        navigation = FIRST_MOVES[cells, targets]
+    moves = [
+        (
+            int(navigation[index])
+            if targets[index] != cells[index]
+            else MOVE_CODES[next_moves.get(index, Move.COLLECT)]
+        )
+        for index in range(len(uids))
+    ]
+    # the ships with the most cargo to lose choose their next cell first
+    with phase_timer.phase("collisions"):
+        resolved = resolve_moves(cells.tolist(), moves, cargo)
+    for index, uid in enumerate(uids):
+        if resolved[index] != moves[index] and states[uid][0] == Task.COLLECT:
+            # the plan counted on the blocked move
+            states[uid] = [Task.COLLECT, Plan()]
+        if resolved[index] != STAY:
+            action[uid] = MOVES[resolved[index]].value
 
     return action
+
+
+class SingleShipAgent:
+    # One game's state: the task of every ship. Tasks of ships that are gone are dropped every
+    # turn, so the state stays as small as the fleet.
+
+    def __init__(self, states=None, budget_log=None, params: Params = DEFAULT_PARAMS):
+        self.states = {} if states is None else states
+        self.budget_log = BudgetLog() if budget_log is None else budget_log
+        self.params = params
+
+    def __call__(self, obs, config=None):
+        budget = TurnBudget.from_configuration(config)
+        action = {}
+        with phase_timer.phase("parse"):
+            player_halite, shipyards, ships = obs.players[obs.player]
+        with phase_timer.phase("board"):
+            board = np.reshape(np.float32(obs["halite"]), (15, 15))
+        # print(player_halite, ships)
+
+        for uid in self.states.keys() - ships.keys():
+            del self.states[uid]
+        opponent_cells = [
+            cell
+            for player, (_, _, opponent_ships) in enumerate(obs.players)
+            if player != obs.player
+            for cell, _ in opponent_ships.values()
+        ]
+
+        with phase_timer.phase("spawn_convert"):
+            for uid, shipyard in shipyards.items():
+                if len(ships) == 0:
+                    action[uid] = "SPAWN"
+
+            if not shipyards:
+                for uid in ships:
+                    action[uid] = "CONVERT"
+        if shipyards and ships:
+            shipyard_pos = list(shipyards.values())[0]
+            with phase_timer.phase("fleet_step"):
+                action.update(
+                    fleet_step(
+                        obs["step"],
+                        board,
+                        ships,
+                        shipyard_pos,
+                        self.states,
+                        budget,
+                        self.params,
+                        opponent_cells,
+                    )
+                )
+
+        self.budget_log.record(budget.usage(obs["step"]))
+        phase_timer.end_turn()
+        return action
+
+
+def make_agent(**params) -> SingleShipAgent:
+    # a fresh agent per game, for playing several games in one process; params override
+    # fields of Params
+    return SingleShipAgent(params=Params(**params))
+
+
+# the game kaggle plays, on the module's states; agent must stay the last callable here
+default_agent = SingleShipAgent(states, budget_log)
+
+
+def agent(obs, config=None):
+    return default_agent(obs, config)
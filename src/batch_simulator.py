@@ -0,0 +1,439 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from src.routing import STAY
+from src.simulator import (
+    PLAYER_STARTING_HALITE,
+    SHIP_MOVES,
+    Agent,
+    HaliteConfig,
+    initial_board,
+    neighbour_table,
+    starting_cells,
+)
+from src.utils import Observation
+
+# ship action codes: the move codes of src.routing, then conversion, then an action that does
+# nothing but keeps the ship from depositing or collecting, like the actions kaggle drops
+CONVERT = STAY + 1
+HOLD = CONVERT + 1
+
+
+class BatchActions(NamedTuple):
+    # One player's actions in every game, aligned with the state's ship and shipyard tables;
+    # entries of entities the player does not own are ignored. Like kaggle plays only the
+    # first SPAWN or CONVERT of a player, a player converts its first converting ship of a
+    # game or else spawns from its first spawning shipyard, the other ones hold. invalid
+    # flags the games in which the player sent an action kaggle would reject.
+    ships: np.ndarray  # action code per ship
+    spawns: np.ndarray  # spawn flag per shipyard
+    invalid: Optional[np.ndarray] = None  # flag per game
+
+
+BatchAgent = Callable[["BatchState", int], BatchActions]
+
+
+class BatchState:
+    # B games played in lock step. The boards are one (B, N, N) array, the ships and shipyards
+    # of all games are columns of one table each, sorted by game. Entities are identified by
+    # ids unique within the batch.
+
+    def __init__(self, config: HaliteConfig, games: int, players: int):
+        self.config = config
+        self.games = games
+        self.step = 0
+        self.next_id = 0
+        self.halite = np.zeros((games, config.size, config.size))
+        self.player_halite = np.full((games, players), float(PLAYER_STARTING_HALITE))
+        self.active = np.ones((games, players), dtype=bool)
+        self.running = np.ones(games, dtype=bool)
+        self.rewards = np.zeros((games, players))
+        self.ship_ids = np.zeros(0, dtype=np.int64)
+        self.ship_games = np.zeros(0, dtype=np.intp)
+        self.ship_owners = np.zeros(0, dtype=np.intp)
+        self.ship_cells = np.zeros(0, dtype=np.intp)
+        self.ship_cargo = np.zeros(0)
+        self.yard_ids = np.zeros(0, dtype=np.int64)
+        self.yard_games = np.zeros(0, dtype=np.intp)
+        self.yard_owners = np.zeros(0, dtype=np.intp)
+        self.yard_cells = np.zeros(0, dtype=np.intp)
+
+    @classmethod
+    def initial(
+        cls, config: HaliteConfig, games: int, players: int, seed: Optional[int] = None
+    ) -> "BatchState":
+        state = cls(config, games, players)
+        rng = np.random.default_rng(seed)
+        for game in range(games):
+            state.halite[game] = initial_board(config, rng).reshape(config.size, config.size)
+        cells = starting_cells(config.size, players)
+        state.add_ships(
+            np.repeat(np.arange(games), players),
+            np.tile(np.arange(players), games),
+            np.tile(cells, games),
+        )
+        return state
+
+    @classmethod
+    def from_observations(cls, observations: Sequence[Dict], config: HaliteConfig) -> "BatchState":
+        # one game per observation, all at the step of the first; the entities get new ids in
+        # the order of the observations
+        state = cls(config, len(observations), len(observations[0]["players"]))
+        state.step = observations[0]["step"]
+        for game, obs in enumerate(observations):
+            state.halite[game] = np.reshape(obs["halite"], (config.size, config.size))
+            for player, (halite, shipyards, ships) in enumerate(obs["players"]):
+                state.player_halite[game, player] = halite
+                yard_cells = np.array(list(shipyards.values()), dtype=np.intp)
+                state.add_shipyards(
+                    np.full(len(yard_cells), game), np.full(len(yard_cells), player), yard_cells
+                )
+                cells, cargo = np.array(list(ships.values()), dtype=np.intp).reshape(-1, 2).T
+                state.add_ships(
+                    np.full(len(cells), game), np.full(len(cells), player), cells, cargo
+                )
+        return state
+
+    @property
+    def players(self) -> int:
+        return self.player_halite.shape[1]
+
+    @property
+    def flat_halite(self) -> np.ndarray:
+        return self.halite.reshape(self.games, -1)
+
+    def new_ids(self, count: int) -> np.ndarray:
+        ids = np.arange(self.next_id, self.next_id + count)
+        self.next_id += count
+        return ids
+
+    def add_ships(self, games, owners, cells, cargo=None) -> np.ndarray:
+        # returns the rows of the old ships followed by the new ones in the sorted table
+        count = len(games)
+        cargo = np.zeros(count) if cargo is None else cargo
+        order = np.argsort(np.r_[self.ship_games, games], kind="stable")
+        self.ship_ids = np.r_[self.ship_ids, self.new_ids(count)][order]
+        self.ship_games = np.r_[self.ship_games, games][order]
+        self.ship_owners = np.r_[self.ship_owners, owners][order]
+        self.ship_cells = np.r_[self.ship_cells, cells][order]
+        self.ship_cargo = np.r_[self.ship_cargo, cargo][order]
+        return np.argsort(order)
+
+    def add_shipyards(self, games, owners, cells) -> None:
+        order = np.argsort(np.r_[self.yard_games, games], kind="stable")
+        self.yard_ids = np.r_[self.yard_ids, self.new_ids(len(games))][order]
+        self.yard_games = np.r_[self.yard_games, games][order]
+        self.yard_owners = np.r_[self.yard_owners, owners][order]
+        self.yard_cells = np.r_[self.yard_cells, cells][order]
+
+    def keep_ships(self, keep: np.ndarray) -> None:
+        self.ship_ids = self.ship_ids[keep]
+        self.ship_games = self.ship_games[keep]
+        self.ship_owners = self.ship_owners[keep]
+        self.ship_cells = self.ship_cells[keep]
+        self.ship_cargo = self.ship_cargo[keep]
+
+    def keep_shipyards(self, keep: np.ndarray) -> None:
+        self.yard_ids = self.yard_ids[keep]
+        self.yard_games = self.yard_games[keep]
+        self.yard_owners = self.yard_owners[keep]
+        self.yard_cells = self.yard_cells[keep]
+
+    def ship_slice(self, game: int) -> slice:
+        return slice(*np.searchsorted(self.ship_games, [game, game + 1]))
+
+    def yard_slice(self, game: int) -> slice:
+        return slice(*np.searchsorted(self.yard_games, [game, game + 1]))
+
+    def eliminate(self, players: np.ndarray) -> None:
+        # the (games, players) flagged lose their halite, ships and shipyards
+        self.active &= ~players
+        self.player_halite[players] = 0
+        self.keep_ships(~players[self.ship_games, self.ship_owners])
+        self.keep_shipyards(~players[self.yard_games, self.yard_owners])
+
+    def observation(self, game: int, player: int) -> Observation:
+        # what the single game simulator would show the player, with the ids as uids
+        players: List[List] = [[int(halite), {}, {}] for halite in self.player_halite[game]]
+        yards = self.yard_slice(game)
+        for uid, owner, cell in zip(
+            self.yard_ids[yards], self.yard_owners[yards], self.yard_cells[yards]
+        ):
+            players[owner][1][str(uid)] = int(cell)
+        ships = self.ship_slice(game)
+        for uid, owner, cell, cargo in zip(
+            self.ship_ids[ships],
+            self.ship_owners[ships],
+            self.ship_cells[ships],
+            self.ship_cargo[ships],
+        ):
+            players[owner][2][str(uid)] = [int(cell), int(cargo)]
+        return Observation(
+            player=player,
+            step=max(self.step, 1),
+            halite=self.flat_halite[game].tolist(),
+            players=players,
+        )
+
+    def idle_actions(self) -> BatchActions:
+        return BatchActions(
+            np.full(len(self.ship_ids), STAY, dtype=np.intp),
+            np.zeros(len(self.yard_ids), dtype=bool),
+            np.zeros(self.games, dtype=bool),
+        )
+
+
+def group_ranks(keys: np.ndarray) -> np.ndarray:
+    # rank of every element among the elements with the same key, in index order
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ranks = np.empty(len(keys), dtype=np.intp)
+    ranks[order] = np.arange(len(keys)) - np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+    return ranks
+
+
+def advance_batch(state: BatchState, actions: Sequence[Optional[BatchActions]]) -> None:
+    # One turn of every running game, with the rules of src.simulator.advance. Finished games
+    # are left as they ended.
+    config = state.config
+    players = state.players
+    cells_per_board = config.size ** 2
+    live_ships = state.running[state.ship_games] & state.active[state.ship_games, state.ship_owners]
+    live_yards = state.running[state.yard_games] & state.active[state.yard_games, state.yard_owners]
+
+    codes = np.full(len(state.ship_ids), STAY, dtype=np.intp)
+    spawning = np.zeros(len(state.yard_ids), dtype=bool)
+    invalid = np.zeros_like(state.active)
+    for player, player_actions in enumerate(actions):
+        if player_actions is None:
+            continue
+        own_ships = live_ships & (state.ship_owners == player)
+        codes[own_ships] = player_actions.ships[own_ships]
+        spawning |= live_yards & (state.yard_owners == player) & player_actions.spawns
+        if player_actions.invalid is not None:
+            invalid[:, player] = state.running & state.active[:, player] & player_actions.invalid
+
+    # one conversion or else one spawn per game and player, the others hold
+    flat_player_halite = state.player_halite.reshape(-1)
+    converting = np.flatnonzero(codes == CONVERT)
+    converting_keys = state.ship_games[converting] * players + state.ship_owners[converting]
+    first = group_ranks(converting_keys) == 0
+    codes[converting[~first]] = HOLD
+    converting, converting_keys = converting[first], converting_keys[first]
+    spawns = np.flatnonzero(spawning)
+    spawn_keys = state.yard_games[spawns] * players + state.yard_owners[spawns]
+    first = (group_ranks(spawn_keys) == 0) & ~np.isin(spawn_keys, converting_keys)
+    spawns, spawn_keys = spawns[first], spawn_keys[first]
+
+    # what the players cannot pay for, or a conversion on their own shipyard, is invalid
+    flat_invalid = invalid.reshape(-1)
+    cargo = state.ship_cargo[converting]
+    yard_owner_at = np.full(state.games * cells_per_board, -1, dtype=np.intp)
+    yard_owner_at[state.yard_games * cells_per_board + state.yard_cells] = state.yard_owners
+    on_own_yard = (
+        yard_owner_at[state.ship_games[converting] * cells_per_board + state.ship_cells[converting]]
+        == state.ship_owners[converting]
+    )
+    rejected = (flat_player_halite[converting_keys] < config.convert_cost - cargo) | on_own_yard
+    flat_invalid[converting_keys[rejected]] = True
+    converting, converting_keys, cargo = (
+        converting[~rejected],
+        converting_keys[~rejected],
+        cargo[~rejected],
+    )
+    rejected = flat_player_halite[spawn_keys] < config.spawn_cost
+    flat_invalid[spawn_keys[rejected]] = True
+    spawns, spawn_keys = spawns[~rejected], spawn_keys[~rejected]
+
+    flat_player_halite[converting_keys] += cargo - config.convert_cost
+    flat_player_halite[spawn_keys] -= config.spawn_cost
+    converted_games, converted_cells = state.ship_games[converting], state.ship_cells[converting]
+    state.add_shipyards(converted_games, state.ship_owners[converting], converted_cells)
+    state.halite.reshape(-1)[converted_games * cells_per_board + converted_cells] = 0
+    converted = np.zeros(len(codes), dtype=bool)
+    converted[converting] = True
+    rows = state.add_ships(
+        state.yard_games[spawns], state.yard_owners[spawns], state.yard_cells[spawns]
+    )
+    # new ships have no action
+    realigned = np.full(len(rows), STAY, dtype=np.intp)
+    realigned[rows[: len(codes)]] = codes
+    codes = realigned
+    realigned = np.zeros(len(rows), dtype=bool)
+    realigned[rows[: len(converted)]] = converted
+    keep = ~realigned & ~invalid[state.ship_games, state.ship_owners]
+    state.keep_ships(keep)
+    codes = codes[keep]
+    state.eliminate(invalid)
+
+    # moves
+    acted = codes != STAY
+    moving = codes < STAY
+    state.ship_cells = neighbour_table(config.size)[state.ship_cells, np.where(moving, codes, STAY)]
+    state.ship_cargo[moving] = np.floor(state.ship_cargo[moving] * (1 - config.move_cost))
+
+    # ships on foreign shipyards are destroyed, the shipyards stay
+    flat_halite = state.halite.reshape(-1)
+    yard_owner_at[:] = -1
+    yard_owner_at[state.yard_games * cells_per_board + state.yard_cells] = state.yard_owners
+    owners = yard_owner_at[state.ship_games * cells_per_board + state.ship_cells]
+    keep = (owners < 0) | (owners == state.ship_owners)
+    state.keep_ships(keep)
+    acted = acted[keep]
+
+    # ship collisions, per game and cell
+    keys = state.ship_games * cells_per_board + state.ship_cells
+    order = np.lexsort((-state.ship_cargo, keys))
+    sorted_keys = keys[order]
+    if len(order) and (sorted_keys[1:] == sorted_keys[:-1]).any():
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        first = order[starts]
+        collided = sizes > 1
+        second_cargo = state.ship_cargo[order[np.minimum(starts + 1, len(order) - 1)]]
+        won = collided & (state.ship_cargo[first] > second_cargo)
+
+        keep = np.zeros(len(order), dtype=bool)
+        keep[first[~collided | won]] = True
+        state.ship_cargo[first[won]] -= second_cargo[won]
+        flat_halite[sorted_keys[starts[collided]]] = 0
+        state.keep_ships(keep)
+        acted = acted[keep]
+
+    state.eliminate(state.running[:, np.newaxis] & state.active & eliminated(state))
+
+    # ships without an action deposit on their shipyards and collect elsewhere
+    ship_keys = state.ship_games * cells_per_board + state.ship_cells
+    on_yard = yard_owner_at[ship_keys] >= 0
+    idle = ~acted & state.running[state.ship_games]
+    depositing = idle & on_yard
+    np.add.at(
+        flat_player_halite,
+        state.ship_games[depositing] * players + state.ship_owners[depositing],
+        state.ship_cargo[depositing],
+    )
+    state.ship_cargo[depositing] = 0
+    collecting = idle & ~on_yard
+    collecting[collecting] = flat_halite[ship_keys[collecting]] > 0
+    cells = ship_keys[collecting]
+    collected = np.maximum(1, np.floor(flat_halite[cells] * config.collect_rate))
+    state.ship_cargo[collecting] += collected
+    flat_halite[cells] -= collected
+
+    # cells of running games without a ship or shipyard regenerate
+    regenerating = np.repeat(state.running, cells_per_board)
+    regenerating[ship_keys] = False
+    regenerating[state.yard_games * cells_per_board + state.yard_cells] = False
+    flat_halite[regenerating] *= 1 + config.regen_rate
+
+    state.step += 1
+    finish(state)
+
+
+def eliminated(state: BatchState) -> np.ndarray:
+    # (games, players) without ships and without the shipyards or halite to get one
+    keys_shape = state.games * state.players
+    ships = np.bincount(
+        state.ship_games * state.players + state.ship_owners, minlength=keys_shape
+    ).reshape(state.games, state.players)
+    yards = np.bincount(
+        state.yard_games * state.players + state.yard_owners, minlength=keys_shape
+    ).reshape(state.games, state.players)
+    return (ships == 0) & ((yards == 0) | (state.player_halite < state.config.spawn_cost))
+
+
+def finish(state: BatchState) -> None:
+    # records the rewards of games that are over, like src.simulator.rewards does for a
+    # single game
+    config = state.config
+    over = state.running & (
+        (state.step >= config.episode_steps - 1)
+        | (state.active.sum(axis=1) < min(2, state.players))
+    )
+    state.rewards[over] = np.where(state.active[over], state.player_halite[over], 0)
+    state.running &= ~over
+
+
+def play_batch(
+    agents: Sequence[Optional[BatchAgent]],
+    games: int,
+    config: HaliteConfig = HaliteConfig(),
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    # Plays games games in lock step and returns their (games, players) rewards. None plays
+    # no actions.
+    state = BatchState.initial(config, games, len(agents), seed)
+    while state.running.any():
+        actions = [
+            None if agent is None else agent(state, player) for player, agent in enumerate(agents)
+        ]
+        advance_batch(state, actions)
+    return state.rewards
+
+
+def add_game_actions(
+    state: BatchState,
+    actions: BatchActions,
+    game: int,
+    player: int,
+    game_actions: Dict[str, str],
+) -> None:
+    # Sets the actions of an ordinary agent in one game, uids being the ids of the
+    # observation, the way kaggle plays them: in order up to the first SPAWN or CONVERT, an
+    # action for an entity the player does not own makes the game's actions invalid, and
+    # every ship named keeps from depositing or collecting.
+    assert actions.invalid is not None
+    ships, yards = state.ship_slice(game), state.yard_slice(game)
+    ship_rows = {
+        str(uid): row
+        for row, uid, owner in zip(
+            range(ships.start, ships.stop), state.ship_ids[ships], state.ship_owners[ships]
+        )
+        if owner == player
+    }
+    yard_rows = {
+        str(uid): row
+        for row, uid, owner in zip(
+            range(yards.start, yards.stop), state.yard_ids[yards], state.yard_owners[yards]
+        )
+        if owner == player
+    }
+    for uid, action in game_actions.items():
+        if action == "SPAWN":
+            if uid in yard_rows:
+                actions.spawns[yard_rows[uid]] = True
+            else:
+                actions.invalid[game] = True
+            break
+        if uid not in ship_rows or (action != "CONVERT" and action not in SHIP_MOVES):
+            actions.invalid[game] = True
+            break
+        if action == "CONVERT":
+            actions.ships[ship_rows[uid]] = CONVERT
+            break
+        actions.ships[ship_rows[uid]] = SHIP_MOVES[action]
+    for uid in game_actions:
+        if uid in ship_rows and actions.ships[ship_rows[uid]] == STAY:
+            actions.ships[ship_rows[uid]] = HOLD
+
+
+def per_game_agent(make_agent: Callable[[], Agent]) -> BatchAgent:
+    # Plays an ordinary agent, one instance per game made by make_agent, through the batch
+    # interface by building every game's observation. The batch stays lock step, but the
+    # agents' time is not vectorized.
+    instances: Dict[int, Agent] = {}
+
+    def batch_agent(state: BatchState, player: int) -> BatchActions:
+        actions = state.idle_actions()
+        configuration = state.config.configuration()
+        for game in np.flatnonzero(state.running & state.active[:, player]).tolist():
+            if game not in instances:
+                instances[game] = make_agent()
+            game_actions = instances[game](state.observation(game, player), configuration)
+            if game_actions:
+                add_game_actions(state, actions, game, player, game_actions)
+        return actions
+
+    return batch_agent
@@ -0,0 +1,118 @@
+import time
+from collections import deque
+from typing import Callable, Dict, NamedTuple, Optional
+
+from src.utils import Observation
+
+DEFAULT_ACT_TIMEOUT = 2.0
+# share of actTimeout the agents plan in, the rest is headroom for the environment
+TURN_BUDGET_FRACTION = 0.5
+# a configuration key of ours, not kaggle's: the budget never runs out, so the agents plan as
+# deep as they can and their moves do not depend on the speed of the machine
+UNLIMITED_BUDGET = "unlimitedBudget"
+
+
+class TurnUsage(NamedTuple):
+    step: int
+    budget: float
+    used: float
+    horizon: int
+
+    @property
+    def used_fraction(self) -> float:
+        return self.used / self.budget if self.budget else 0.0
+
+
+class TurnBudget:
+    def __init__(
+        self,
+        seconds: float,
+        clock: Callable[[], float] = time.perf_counter,
+        unlimited: bool = False,
+    ):
+        self.seconds = seconds
+        self.clock = clock
+        self.unlimited = unlimited
+        self.start = clock()
+        self.horizon = 0
+
+    @classmethod
+    def from_configuration(
+        cls,
+        configuration: Optional[Dict] = None,
+        fraction: float = TURN_BUDGET_FRACTION,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> "TurnBudget":
+        act_timeout = DEFAULT_ACT_TIMEOUT
+        unlimited = False
+        if configuration is not None:
+            act_timeout = configuration.get("actTimeout", DEFAULT_ACT_TIMEOUT)
+            unlimited = bool(configuration.get(UNLIMITED_BUDGET, False))
+        return cls(act_timeout * fraction, clock, unlimited)
+
+    def elapsed(self) -> float:
+        return self.clock() - self.start
+
+    def remaining(self) -> float:
+        return self.seconds - self.elapsed()
+
+    def allows(self, seconds: float) -> bool:
+        return self.unlimited or self.remaining() > seconds
+
+    def expired(self) -> bool:
+        return not self.unlimited and self.remaining() <= 0
+
+    def usage(self, step: int) -> TurnUsage:
+        return TurnUsage(step, self.seconds, self.elapsed(), self.horizon)
+
+
+def unlimited_configuration(configuration: Dict) -> Observation:
+    # configuration with a budget that never runs out, for replays and sweeps whose results
+    # must not depend on the machine
+    return Observation(configuration, **{UNLIMITED_BUDGET: True})
+
+
+class BudgetLog:
+    def __init__(self, maxlen: int = 1000):
+        self.turns: deque = deque(maxlen=maxlen)
+
+    def record(self, usage: TurnUsage) -> None:
+        self.turns.append(usage)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.turns:
+            return {"turns": 0}
+        fractions = [usage.used_fraction for usage in self.turns]
+        return {
+            "turns": len(self.turns),
+            "mean_used_fraction": sum(fractions) / len(fractions),
+            "max_used_fraction": max(fractions),
+            "mean_horizon": sum(usage.horizon for usage in self.turns) / len(self.turns),
+        }
+
+
+class BudgetLogs:
+    # One log per agent, shared by every copy of the agent's module like the phase timers of
+    # src.profiling, so a profile run sees the budget use of all its games
+
+    def __init__(self):
+        self.logs: Dict[str, BudgetLog] = {}
+
+    def log(self, agent: str) -> BudgetLog:
+        if agent not in self.logs:
+            self.logs[agent] = BudgetLog()
+        return self.logs[agent]
+
+    def reset(self) -> None:
+        for log in self.logs.values():
+            log.turns.clear()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {agent: log.summary() for agent, log in self.logs.items() if log.turns}
+
+
+BUDGET_LOGS = BudgetLogs()
+
+
+def get_budget_log(agent: str) -> BudgetLog:
+    return BUDGET_LOGS.log(agent)
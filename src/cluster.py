@@ -0,0 +1,57 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ClusterSearch:
+    # The board is tiled 2 x 2 and turned into a summed-area table once, so the score map
+    # of any cluster size up to the board size costs four gathers.
+
+    def __init__(self, halite_matrix: np.ndarray):
+        rows, cols = halite_matrix.shape
+        tiled = np.tile(np.asarray(halite_matrix, dtype=np.float64), (2, 2))
+        self.shape = (rows, cols)
+        self.integral = np.zeros((2 * rows + 1, 2 * cols + 1))
+        self.integral[1:, 1:] = tiled.cumsum(axis=0).cumsum(axis=1)
+        self._scores: Dict[int, np.ndarray] = {}
+
+    def scores(self, cluster_size: int) -> np.ndarray:
+        if cluster_size in self._scores:
+            return self._scores[cluster_size]
+
+        rows, cols = self.shape
+        if not 0 < cluster_size <= min(rows, cols):
+            raise ValueError(f"cluster_size must be in [1, {min(rows, cols)}]")
+
+        half = cluster_size // 2
+        top = (np.arange(rows) - half) % rows
+        left = (np.arange(cols) - half) % cols
+        bottom = top + cluster_size
+        right = left + cluster_size
+
+        integral = self.integral
+        score_map = (
+            integral[np.ix_(bottom, right)]
+            - integral[np.ix_(top, right)]
+            - integral[np.ix_(bottom, left)]
+            + integral[np.ix_(top, left)]
+        )
+        self._scores[cluster_size] = score_map
+        return score_map
+
+    def top_centres(
+        self, cluster_size: int, k: int = 1, weights: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, int]]:
+        score_map = self.scores(cluster_size)
+        if weights is not None:
+            score_map = score_map * weights
+
+        flat = score_map.ravel()
+        if k >= flat.size:
+            order = np.argsort(-flat, kind="stable")
+        else:
+            candidates = np.argpartition(-flat, k - 1)[:k]
+            order = candidates[np.argsort(-flat[candidates], kind="stable")]
+
+        cols = self.shape[1]
+        return [divmod(int(index), cols) for index in order]
@@ -0,0 +1,74 @@
+import random
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+Rewards = List[Optional[float]]
+PlayEpisode = Callable[[List[str], int], Rewards]
+
+
+class EpisodeResult(NamedTuple):
+    episode: int
+    seed: int
+    rewards: Rewards
+
+
+def episode_seed(base_seed: int, episode: int) -> int:
+    return base_seed + episode
+
+
+def play_seeded_episode(
+    play_episode: PlayEpisode, agents: List[str], episode: int, seed: int
+) -> EpisodeResult:
+    # agents and the environment draw from the global generators, so seeding them here
+    # makes the episode reproducible whichever worker plays it
+    random.seed(seed)
+    np.random.seed(seed)
+    return EpisodeResult(episode, seed, play_episode(agents, seed))
+
+
+def run_episodes(
+    play_episode: PlayEpisode,
+    agents: List[str],
+    episodes: int,
+    workers: int = 1,
+    base_seed: int = 0,
+) -> Iterator[EpisodeResult]:
+    return run_lineups(play_episode, [agents] * episodes, workers, base_seed)
+
+
+def run_lineups(
+    play_episode: PlayEpisode,
+    lineups: Sequence[List[str]],
+    workers: int = 1,
+    base_seed: int = 0,
+    first_episode: int = 0,
+) -> Iterator[EpisodeResult]:
+    # Plays one episode per lineup of agents, numbered from first_episode. Yields the result of
+    # every episode as soon as it is finished, so in completion order rather than episode order
+    # when workers > 1. play_episode must be picklable.
+    episodes = range(first_episode, first_episode + len(lineups))
+    if workers <= 1:
+        for episode, agents in zip(episodes, lineups):
+            yield play_seeded_episode(
+                play_episode, agents, episode, episode_seed(base_seed, episode)
+            )
+        return
+
+    # imported here, the agents import this module through src.profiling and would pay for
+    # multiprocessing at startup
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                play_seeded_episode, play_episode, agents, episode, episode_seed(base_seed, episode)
+            )
+            for episode, agents in zip(episodes, lineups)
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,61 @@
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from src.projection import COLLECT_RATE, REGENERATION_RATE
+from src.routing import NEIGHBOURS, STAY
+
+# cells regenerate only below this
+MAX_CELL_HALITE = 500.0
+# chance an opponent ship collects where it stands in a turn rather than moving on
+OPPONENT_COLLECT_PROBABILITY = 0.5
+
+# (cell, turn) of a collection, turn 0 being the current one
+Collection = Tuple[int, int]
+
+
+class Forecast:
+    # The board turns turns ahead, all in one array: halite[t, c] is the halite expected in
+    # cell c at the start of turn t from now, halite[0] is the board. Cells regenerate up to
+    # MAX_CELL_HALITE, a planned collection of ours takes COLLECT_RATE of its cell and stops
+    # its regeneration that turn, and the cell of an opponent ship loses the expected share
+    # the ship collects there every turn. The planners read the board of a turn as a whole,
+    # halite[t].
+    __slots__ = ("halite", "turns")
+
+    def __init__(
+        self,
+        board: np.ndarray,
+        turns: int,
+        collections: Iterable[Collection] = (),
+        opponent_cells: Iterable[int] = (),
+    ):
+        board = np.asarray(board, dtype=np.float64).ravel()
+        growth = np.full(board.size, 1 + REGENERATION_RATE)
+        growth[list(opponent_cells)] = OPPONENT_COLLECT_PROBABILITY * (1 - COLLECT_RATE) + (
+            1 - OPPONENT_COLLECT_PROBABILITY
+        ) * (1 + REGENERATION_RATE)
+        halite = board * growth ** np.arange(turns + 1)[:, np.newaxis]
+
+        # a collection in turn t swaps the cell's growth of that turn for what it leaves
+        collections = [(cell, turn) for cell, turn in collections if turn < turns]
+        if collections:
+            cells, collect_turns = np.array(collections, dtype=np.intp).T
+            factors = np.ones_like(halite)
+            np.multiply.at(factors, (collect_turns + 1, cells), (1 - COLLECT_RATE) / growth[cells])
+            halite *= np.cumprod(factors, axis=0)
+
+        # cells richer than MAX_CELL_HALITE do not regenerate at all
+        self.halite = np.minimum(halite, np.maximum(board, MAX_CELL_HALITE))
+        self.turns = turns
+
+
+def planned_collections(cell: int, moves: Sequence[int]) -> List[Collection]:
+    # the collections of a ship on cell playing the move codes, STAY collecting
+    collections = []
+    for turn, move in enumerate(moves):
+        if move == STAY:
+            collections.append((cell, turn))
+        else:
+            cell = int(NEIGHBOURS[cell, move])
+    return collections
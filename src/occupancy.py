@@ -0,0 +1,84 @@
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.routing import NEIGHBOURS, STAY
+from src.utils import SIZE
+
+ADJACENT_CELLS = NEIGHBOURS.tolist()
+# what a ship falls back to when the cell of its move is taken: staying, then the moves
+FALLBACK_MOVES = [STAY, *range(STAY)]
+
+
+class Occupancy:
+    # One turn of a fleet on a grid over cell indices: the cells its ships are on and the
+    # cells reserved for the next turn. The grids are bytearrays, checking or reserving a
+    # cell costs one index; grid() views them as numpy arrays without copying.
+    __slots__ = ("ships", "reserved")
+
+    def __init__(self, cells: int = SIZE ** 2):
+        self.ships = bytearray(cells)
+        self.reserved = bytearray(cells)
+
+    def reset(self) -> None:
+        cells = len(self.ships)
+        self.ships[:] = bytes(cells)
+        self.reserved[:] = bytes(cells)
+
+    def place(self, cells: Iterable[int]) -> bool:
+        # => False if two ships share a cell
+        alone = True
+        for cell in cells:
+            alone = alone and not self.ships[cell]
+            self.ships[cell] = 1
+        return alone
+
+    def occupied(self, cell: int) -> bool:
+        return bool(self.ships[cell])
+
+    def free(self, cell: int) -> bool:
+        return not self.reserved[cell]
+
+    def reserve(self, cell: int) -> bool:
+        # => False if the cell is reserved already
+        if self.reserved[cell]:
+            return False
+        self.reserved[cell] = 1
+        return True
+
+    def release(self, cell: int) -> None:
+        self.reserved[cell] = 0
+
+    def claim(self, cell: int, move: int) -> int:
+        # reserves the cell move leads to from cell, or the first free fallback. => the move
+        # taken, move itself when every cell around is reserved and a collision is unavoidable
+        adjacent = ADJACENT_CELLS[cell]
+        if self.reserve(adjacent[move]):
+            return move
+        for fallback in FALLBACK_MOVES:
+            if self.reserve(adjacent[fallback]):
+                return fallback
+        return move
+
+    def grid(self, reserved: bool = True) -> np.ndarray:
+        return np.frombuffer(self.reserved if reserved else self.ships, dtype=np.uint8)
+
+
+def resolve_moves(
+    cells: Sequence[int],
+    moves: Sequence[int],
+    priorities: Optional[Sequence[float]] = None,
+    occupancy: Optional[Occupancy] = None,
+) -> List[int]:
+    # Moves of a fleet such that no two ships end the turn in the same cell. Ships claim their
+    # next cell by descending priority, ties in fleet order; a ship whose cell is taken stays
+    # or moves elsewhere instead. Cells reserved in occupancy beforehand are avoided.
+    if occupancy is None:
+        occupancy = Occupancy()
+    order: Sequence[int] = range(len(cells))
+    if priorities is not None:
+        order = sorted(order, key=lambda index: -priorities[index])
+    resolved = list(moves)
+    for index in order:
+        resolved[index] = occupancy.claim(cells[index], moves[index])
+    return resolved
@@ -0,0 +1,191 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.forecast import Forecast
+from src.projection import DISCOUNT, MAX_EXPONENT, MOVE_DECAY_ARRAY, REGENERATION, collect_gain
+from src.routing import DISTANCES, NEIGHBOURS, STAY
+
+MOVE_COUNT = NEIGHBOURS.shape[1]
+
+
+def reachable_maxima(board: np.ndarray, max_dist: int) -> np.ndarray:
+    # maxima[d, c] is the richest cell at most d steps away from cell c
+    neighbours = NEIGHBOURS.T
+    maxima = np.empty((max_dist + 1, board.size))
+    maxima[0] = board
+    for dist in range(1, max_dist + 1):
+        maxima[dist] = maxima[dist - 1][neighbours].max(axis=0)
+    return maxima
+
+
+def collection_bonus(board: np.ndarray, max_turns: int) -> np.ndarray:
+    # bonus[n - 1, c] is the most n more turns of a sequence on c collect, travelling k of them
+    # to the richest cell at most k moves away and collecting there for the rest. The maxima
+    # are cells of the board, so collect_gain runs once per distinct halite and turn count,
+    # from its memo when the deepening planners ask for the same board again.
+    maxima = reachable_maxima(board, max(max_turns - 1, 0))
+    halite, cells = np.unique(maxima, return_inverse=True)
+    cells = cells.reshape(maxima.shape)
+    gains = np.array(
+        [
+            [collect_gain(float(cell_halite), 0, turns) for cell_halite in halite]
+            for turns in range(1, max_turns + 1)
+        ]
+    )
+    bonus = np.zeros((max_turns, board.size))
+    for turns in range(1, max_turns + 1):
+        for moves in range(turns):
+            np.maximum(
+                bonus[turns - 1], gains[turns - moves - 1, cells[moves]], out=bonus[turns - 1]
+            )
+    return bonus
+
+
+@lru_cache(maxsize=None)
+def expansion(count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    parents = np.repeat(np.arange(count), MOVE_COUNT)
+    moves = np.tile(np.arange(MOVE_COUNT), count)
+    return parents, moves, moves != STAY
+
+
+def first_per_group(groups: np.ndarray, priorities: np.ndarray, count: int) -> np.ndarray:
+    # indices of the count highest priorities of every group, in index order; ties keep the
+    # earlier index. groups must be sorted.
+    if groups[0] == groups[-1]:
+        return np.sort(np.argsort(-priorities, kind="stable")[:count])
+    order = np.lexsort((-priorities, groups))
+    sorted_groups = groups[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(order)])
+    ranks = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+    return np.sort(order[ranks < count])
+
+
+class Rollouts:
+    # Candidate move sequences of a fleet, one group per ship. Collections are kept as a
+    # per-candidate log of (cell, amount) deltas against the shared board instead of copying
+    # the board, and each sequence is packed into one integer, MOVE_COUNT moves per digit.
+
+    def __init__(self, positions: Sequence[int], halite: Sequence[float], horizon: int):
+        self.depth = 0
+        self.ships = np.arange(len(positions))
+        self.sequences = np.zeros(len(positions), dtype=np.int64)
+        self.cells = np.array(positions, dtype=np.intp)
+        self.cargo = np.array(halite, dtype=np.float64)
+        self.path = np.zeros((horizon, len(positions)), dtype=np.intp)
+        self.collected = np.zeros((horizon, len(positions)), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def expand(self, halite: np.ndarray) -> None:
+        # halite is the forecast board of the turn the sequences have reached
+        depth = self.depth
+        parents, moves, travels = expansion(len(self))
+        cells = self.cells[parents]
+        self.path = self.path[:, parents]
+        self.collected = self.collected[:, parents]
+
+        already_collected = (self.collected[:depth] * (self.path[:depth] == cells)).sum(axis=0)
+        gain = np.floor(0.25 * (halite[cells] - already_collected * REGENERATION[depth]))
+        gain[travels] = 0
+        cargo = self.cargo[parents] + gain
+        cargo[travels] = np.floor(cargo[travels] * 0.9)
+
+        self.ships = self.ships[parents]
+        self.sequences = self.sequences[parents] * MOVE_COUNT + moves
+        self.cargo = cargo
+        self.cells = NEIGHBOURS[cells, moves]
+        self.path[depth] = cells
+        self.collected[depth] = gain
+        self.depth += 1
+
+    def moves(self, index: int) -> List[int]:
+        sequence = int(self.sequences[index])
+        moves = []
+        for _ in range(self.depth):
+            sequence, move = divmod(sequence, MOVE_COUNT)
+            moves.append(move)
+        return moves[::-1]
+
+    def values(
+        self, dropoff_positions: np.ndarray, discount: Sequence[float] = DISCOUNT
+    ) -> np.ndarray:
+        dropoff_dist = DISTANCES[self.cells, dropoff_positions[self.ships]]
+        return np.floor(MOVE_DECAY_ARRAY[dropoff_dist] * self.cargo / discount[self.depth])
+
+    def prune(self, priorities: np.ndarray, beam_width: int) -> None:
+        # keep the best candidates of every ship, still in enumeration order so ties resolve
+        # as before
+        keep = first_per_group(self.ships, priorities, beam_width)
+        self.ships = self.ships[keep]
+        self.sequences = self.sequences[keep]
+        self.cells = self.cells[keep]
+        self.cargo = self.cargo[keep]
+        self.path = self.path[:, keep]
+        self.collected = self.collected[:, keep]
+
+
+def plan_fleet_moves(
+    positions: Sequence[int],
+    dropoff_positions: Sequence[int],
+    halite: Sequence[float],
+    board: np.ndarray,
+    horizon: int,
+    beam_width: int,
+    discount: Sequence[float] = DISCOUNT,
+    forecast: Optional[Forecast] = None,
+) -> List[Tuple[List[int], float]]:
+    # Beam search over move sequences of length horizon for every ship at once. Returns the
+    # best sequence of each ship as move codes with its projected value, or an empty plan if
+    # no sequence is worth anything. discount[n] divides the value of a sequence of n moves.
+    # The sequences collect the halite forecast for their turn, by default the board's
+    # regeneration only.
+    if not 1 <= horizon <= MAX_EXPONENT:
+        raise ValueError(f"horizon must be from 1 to {MAX_EXPONENT}")
+    if forecast is not None and forecast.turns < horizon - 1:
+        raise ValueError(f"a forecast of {forecast.turns} turns is too short for {horizon}")
+    if not len(positions):  # pylint: disable=C1801
+        return []
+
+    flat_board = np.asarray(board, dtype=np.float64).ravel()
+    dropoffs = np.asarray(dropoff_positions, dtype=np.intp)
+    # optimistic bound for a partial sequence: its remaining turns collect from the richest
+    # cell they reach
+    bonus = collection_bonus(flat_board, horizon - 1)
+    if forecast is None:
+        forecast = Forecast(flat_board, horizon - 1)
+    rollouts = Rollouts(positions, halite, horizon)
+
+    for depth in range(horizon):
+        rollouts.expand(forecast.halite[depth])
+        turns_left = horizon - depth - 1
+        if turns_left and len(rollouts) > beam_width * len(positions):
+            priorities = rollouts.values(dropoffs, discount) + bonus[turns_left - 1, rollouts.cells]
+            rollouts.prune(priorities, beam_width)
+
+    values = rollouts.values(dropoffs, discount)
+    plans: List[Tuple[List[int], float]] = []
+    for best in first_per_group(rollouts.ships, values, 1):
+        if values[best] <= 0:
+            plans.append(([], 0.0))
+        else:
+            plans.append((rollouts.moves(best), float(values[best])))
+    return plans
+
+
+def plan_moves(
+    pos: int,
+    dropoff_pos: int,
+    halite: float,
+    board: np.ndarray,
+    horizon: int,
+    beam_width: int,
+    discount: Sequence[float] = DISCOUNT,
+    forecast: Optional[Forecast] = None,
+) -> Tuple[List[int], float]:
+    return plan_fleet_moves(
+        [pos], [dropoff_pos], [halite], board, horizon, beam_width, discount, forecast
+    )[0]
@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, List, Tuple
+
+
+class Plan:
+    # A queue of moves kept as run-length segments: a run repeats one move, a generated
+    # segment draws each move from a function only when it is popped. Popping is O(1).
+
+    __slots__ = ("segments", "remaining")
+
+    def __init__(self, moves: Iterable[Any] = ()):
+        self.segments: Deque[List[Any]] = deque()
+        self.remaining = 0
+        for move in moves:
+            self.add(move)
+
+    def __len__(self):
+        return self.remaining
+
+    def __bool__(self):
+        return self.remaining > 0
+
+    def __repr__(self):
+        return f"Plan({', '.join(f'{count}x{name}' for name, count in self.runs())})"
+
+    def add(self, move: Any, count: int = 1) -> None:
+        if count <= 0:
+            return
+        if self.segments and not self.segments[-1][0] and self.segments[-1][1] == move:
+            self.segments[-1][2] += count
+        else:
+            self.segments.append([False, move, count])
+        self.remaining += count
+
+    def add_generated(self, generate: Callable[[], Any], count: int) -> None:
+        if count > 0:
+            self.segments.append([True, generate, count])
+            self.remaining += count
+
+    def peek(self) -> Any:
+        if not self.segments:
+            raise IndexError("peek into an empty plan")
+        generated, move, _ = self.segments[0]
+        if generated:
+            # draw the move now and keep it as a run of one in front of the segment
+            self.segments[0][2] -= 1
+            if not self.segments[0][2]:
+                self.segments.popleft()
+            move = move()
+            self.segments.appendleft([False, move, 1])
+        return move
+
+    def pop(self) -> Any:
+        if not self.segments:
+            raise IndexError("pop from an empty plan")
+        segment = self.segments[0]
+        generated, move, _ = segment
+        segment[2] -= 1
+        if not segment[2]:
+            self.segments.popleft()
+        self.remaining -= 1
+        return move() if generated else move
+
+    def upcoming(self, limit: int) -> List[Any]:
+        # the next limit moves without popping them, up to the first generated segment
+        moves: List[Any] = []
+        for generated, move, count in self.segments:
+            if generated or len(moves) >= limit:
+                break
+            moves.extend([move] * min(count, limit - len(moves)))
+        return moves
+
+    def cancel(self) -> None:
+        self.segments.clear()
+        self.remaining = 0
+
+    def runs(self) -> List[Tuple[Any, int]]:
+        # generated segments are reported under the name of their function
+        return [
+            (getattr(move, "__name__", "generated") if generated else move, count)
+            for generated, move, count in self.segments
+        ]
@@ -0,0 +1,239 @@
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from src.budget import BUDGET_LOGS
+from src.evaluation import EpisodeResult, PlayEpisode, episode_seed, play_seeded_episode
+
+# the agents import the phase timers from here, the profiler is only imported when profiling
+if TYPE_CHECKING:
+    import cProfile
+
+# histogram bucket b counts turns whose phase took less than 2 ** b microseconds
+HISTOGRAM_BUCKETS = 24
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.buckets[min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        # upper bound of the bucket holding the percentile, in microseconds
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return float(2 ** bucket)
+        return 0.0
+
+
+class Phase:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer: "PhaseTimer", name: str):
+        self.timer = timer
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = self.timer.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, self.timer.clock() - self.started)
+
+
+class NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_PHASE = NullPhase()
+
+
+class PhaseTimer:
+    # Times the phases of an agent's turns. Phases may nest, an outer phase includes the time
+    # of the inner ones. The time of every phase is summed over the turn and goes into the
+    # phase's histogram at end_turn. Disabled timers hand out a phase that does nothing.
+
+    def __init__(self, enabled: bool = False, clock: Callable[[], float] = time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.current: Dict[str, float] = {}
+        self.calls: Counter = Counter()
+        self.histograms: Dict[str, Histogram] = {}
+        self.turns = 0
+
+    def phase(self, name: str):
+        return Phase(self, name) if self.enabled else NULL_PHASE
+
+    def add(self, name: str, seconds: float) -> None:
+        self.current[name] = self.current.get(name, 0.0) + seconds
+        self.calls[name] += 1
+
+    def end_turn(self) -> None:
+        if not self.enabled:
+            return
+        for name, seconds in self.current.items():
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].add(seconds)
+        self.current = {}
+        self.turns += 1
+
+    def reset(self) -> None:
+        self.current = {}
+        self.calls.clear()
+        self.histograms.clear()
+        self.turns = 0
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "turns": histogram.count,
+                "calls": self.calls[name],
+                "total_s": histogram.total,
+                "mean_us": histogram.total / histogram.count * 1e6,
+                "p50_us": histogram.percentile(50),
+                "p95_us": histogram.percentile(95),
+                "max_us": histogram.max * 1e6,
+                "buckets": list(histogram.buckets),
+            }
+            for name, histogram in self.histograms.items()
+        }
+
+
+class PhaseTimers:
+    # One timer per agent, shared by every copy of the agent's module: kaggle executes agent
+    # files afresh instead of importing them
+
+    def __init__(self):
+        self.timers: Dict[str, PhaseTimer] = {}
+        self.enabled = False
+
+    def timer(self, agent: str) -> PhaseTimer:
+        if agent not in self.timers:
+            self.timers[agent] = PhaseTimer(self.enabled)
+        return self.timers[agent]
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        for timer in self.timers.values():
+            timer.enabled = enabled
+
+    def reset(self) -> None:
+        for timer in self.timers.values():
+            timer.reset()
+
+    def report(self) -> Dict[str, Dict]:
+        return {agent: timer.report() for agent, timer in self.timers.items() if timer.turns}
+
+
+PHASE_TIMERS = PhaseTimers()
+
+
+def get_phase_timer(agent: str) -> PhaseTimer:
+    return PHASE_TIMERS.timer(agent)
+
+
+def function_name(function: Tuple[str, int, str]) -> str:
+    # file:line(name) like pstats prints them, built-in functions have no file
+    filename, line, name = function
+    if filename == "~" and line == 0:
+        return name
+    return f"{filename}:{line}({name})"
+
+
+def function_stats(profile: "cProfile.Profile", limit: int) -> List[Dict]:
+    import pstats
+
+    stats = pstats.Stats(profile).stats  # type: ignore
+    rows = [
+        {
+            "function": function_name(function),
+            "calls": calls,
+            "total_s": total,
+            "cumulative_s": cumulative,
+        }
+        for function, (_, calls, total, cumulative, _) in stats.items()
+    ]
+    rows.sort(key=lambda row: row["cumulative_s"], reverse=True)
+    return rows[:limit]
+
+
+def profile_games(
+    play_episode: PlayEpisode, agents: List[str], games: int, base_seed: int = 0, limit: int = 40
+) -> Tuple[Dict, List[EpisodeResult]]:
+    # plays the games in this process under cProfile with the phase timers enabled; returns a
+    # JSON-serialisable report and the results of the games
+    import cProfile
+
+    PHASE_TIMERS.enable()
+    PHASE_TIMERS.reset()
+    BUDGET_LOGS.reset()
+    profile = cProfile.Profile()
+    results = []
+    try:
+        for game in range(games):
+            seed = episode_seed(base_seed, game)
+            profile.enable()
+            try:
+                results.append(play_seeded_episode(play_episode, agents, game, seed))
+            finally:
+                profile.disable()
+        report = {
+            "games": games,
+            "agents": agents,
+            "seed": base_seed,
+            "phases": PHASE_TIMERS.report(),
+            "budgets": BUDGET_LOGS.report(),
+            "functions": function_stats(profile, limit),
+        }
+    finally:
+        PHASE_TIMERS.enable(False)
+    return report, results
+
+
+def format_report(report: Dict) -> str:
+    lines = []
+    for agent, phases in report["phases"].items():
+        lines.append(f"{agent}")
+        lines.append(
+            f"  {'phase':<24}{'turns':>8}{'total s':>10}{'mean us':>11}{'p95 us':>11}{'max us':>11}"
+        )
+        for name, phase in sorted(phases.items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(
+                f"  {name:<24}{phase['turns']:>8}{phase['total_s']:>10.3f}"
+                f"{phase['mean_us']:>11.1f}{phase['p95_us']:>11.0f}{phase['max_us']:>11.1f}"
+            )
+    if report.get("budgets"):
+        lines.append(f"{'budget':<26}{'turns':>8}{'mean used':>11}{'max used':>11}{'horizon':>9}")
+        for agent, budget in sorted(report["budgets"].items()):
+            lines.append(
+                f"  {agent:<24}{budget['turns']:>8}{budget['mean_used_fraction']:>11.1%}"
+                f"{budget['max_used_fraction']:>11.1%}{budget['mean_horizon']:>9.1f}"
+            )
+    lines.append(f"{'cumulative s':>12}{'total s':>10}{'calls':>10}  function")
+    for row in report["functions"]:
+        lines.append(
+            f"{row['cumulative_s']:>12.3f}{row['total_s']:>10.3f}{row['calls']:>10}  "
+            f"{row['function']}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from src.routing import DISTANCES
+
+# the longest exponent the agents raise a rate to: a round trip between the farthest cells
+MAX_EXPONENT = 2 * int(DISTANCES.max())
+
+MOVE_COST = 0.1
+COLLECT_RATE = 0.25
+REGENERATION_RATE = 0.02
+# the planners discount a turn's worth of halite by this factor
+TURN_DISCOUNT = 1.05
+COLLECT_CACHE_SIZE = 4096
+
+
+def power_table(base: float, size: int = MAX_EXPONENT + 1) -> List[float]:
+    # table[n] == base ** n exactly. Lists, indexing them with an int is faster than with
+    # numpy and gives python floats.
+    return [base ** exponent for exponent in range(size)]
+
+
+# cargo left after n moves, also as an array to look up arrays of distances
+MOVE_DECAY = power_table(1 - MOVE_COST)
+MOVE_DECAY_ARRAY = np.array(MOVE_DECAY)
+# a cell's halite after n turns of regeneration
+REGENERATION = power_table(1 + REGENERATION_RATE)
+DISCOUNT = power_table(TURN_DISCOUNT)
+# share of a cell's halite left after n collections
+REMAINING = power_table(1 - COLLECT_RATE)
+# share of a cell's halite n collections gather as the agents count it: the sum of
+# COLLECT_RATE * REMAINING[t] for t from 1 to n, in closed form
+COLLECTED = [(1 - COLLECT_RATE) * (1 - remaining) for remaining in REMAINING]
+
+
+@lru_cache(maxsize=None)
+def discount_table(turn_discount: float) -> List[float]:
+    # DISCOUNT of another turn discount, for agents tuning it
+    return DISCOUNT if turn_discount == TURN_DISCOUNT else power_table(turn_discount)
+
+
+def collected_share(turns: int) -> float:
+    if turns <= MAX_EXPONENT:
+        return COLLECTED[turns]
+    return (1 - COLLECT_RATE) * (1 - (1 - COLLECT_RATE) ** turns)
+
+
+@lru_cache(maxsize=COLLECT_CACHE_SIZE)
+def collect_gain(cell_halite: float, distance: int, turns: int) -> int:
+    # halite collected in turns turns from a cell reached in distance turns
+    arrival_halite = int(REGENERATION[distance] * cell_halite)
+    return int(collected_share(turns) * arrival_halite)
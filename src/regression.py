@@ -0,0 +1,200 @@
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.budget import unlimited_configuration
+from src.replay import ReplayReader
+from src.simulator import HaliteConfig, load_agent
+from src.utils import EXAMPLE_OBS, Observation
+
+CHUNK_TURNS = 50
+# turns an agent plays untimed before its chunk, to rebuild the state it keeps across turns
+WARMUP_TURNS = 20
+SLOWEST_TURNS = 5
+
+
+class Chunk(NamedTuple):
+    episode: int
+    # observations of consecutive turns, the ones before first_timed only warm the agent up
+    observations: List[Observation]
+    first_timed: int
+    # the turn of the first observation; kaggle gives the first two turns the same step
+    first_turn: int = 0
+
+
+class Decision(NamedTuple):
+    episode: int
+    step: int  # the turn of the episode
+    actions: Dict[str, str]
+    latency: float
+
+
+class Divergence(NamedTuple):
+    episode: int
+    step: int
+    baseline: Dict[str, str]
+    actions: Dict[str, str]
+
+    def uids(self) -> List[str]:
+        return sorted(
+            uid
+            for uid in set(self.baseline) | set(self.actions)
+            if self.baseline.get(uid) != self.actions.get(uid)
+        )
+
+
+def turn_seed(episode: int, step: int) -> int:
+    return episode * 1000 + step
+
+
+def replay_chunk(agent_path: str, chunk: Chunk, configuration: Optional[Dict] = None):
+    # A fresh agent per chunk, so a chunk's decisions do not depend on the worker that plays
+    # it or the chunks it played before. The global generators are seeded every turn.
+    agent = load_agent(agent_path)
+    decisions = []
+    for index, obs in enumerate(chunk.observations):
+        turn = chunk.first_turn + index
+        random.seed(turn_seed(chunk.episode, turn))
+        np.random.seed(turn_seed(chunk.episode, turn))
+        started = time.perf_counter()
+        actions = agent(obs, configuration)
+        latency = time.perf_counter() - started
+        if index >= chunk.first_timed:
+            decisions.append(Decision(chunk.episode, turn, dict(actions or {}), latency))
+    return decisions
+
+
+def example_chunks(player: int = 0) -> List[Chunk]:
+    obs = Observation(EXAMPLE_OBS, player=player)
+    return [Chunk(0, [obs], 0, obs.step)]
+
+
+def replay_chunks(
+    reader: ReplayReader,
+    player: int = 0,
+    chunk_turns: int = CHUNK_TURNS,
+    warmup: int = WARMUP_TURNS,
+    episodes: Optional[Sequence[int]] = None,
+) -> List[Chunk]:
+    chunks = []
+    for episode in range(len(reader)) if episodes is None else episodes:
+        turns = reader.episode(episode)["turns"]
+        for first in range(0, turns, chunk_turns):
+            start = max(first - warmup, 0)
+            observations = [
+                Observation(reader.observation(episode, step), player=player)
+                for step in range(start, min(first + chunk_turns, turns))
+            ]
+            chunks.append(Chunk(episode, observations, first - start, start))
+    return chunks
+
+
+def replay_decisions(
+    agent_path: str,
+    chunks: List[Chunk],
+    workers: int = 1,
+    configuration: Optional[Dict] = None,
+) -> List[Decision]:
+    # by default the agent's budget never runs out, so the decisions do not depend on the
+    # machine replaying them
+    if configuration is None:
+        configuration = unlimited_configuration(HaliteConfig().configuration())
+    if workers <= 1:
+        results = [replay_chunk(agent_path, chunk, configuration) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(
+                    replay_chunk, [agent_path] * len(chunks), chunks, [configuration] * len(chunks)
+                )
+            )
+    return sorted(
+        (decision for decisions in results for decision in decisions),
+        key=lambda decision: (decision.episode, decision.step),
+    )
+
+
+def save_decisions(path: str, decisions: List[Decision], **info) -> None:
+    with open(path, "w") as baseline_file:
+        json.dump(
+            {**info, "decisions": [decision._asdict() for decision in decisions]}, baseline_file
+        )
+
+
+def load_decisions(path: str) -> Tuple[List[Decision], Dict]:
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)
+    decisions = [Decision(**decision) for decision in baseline.pop("decisions")]
+    return decisions, baseline
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"mean_us": 0.0, "p50_us": 0.0, "p95_us": 0.0, "max_us": 0.0}
+    micros = np.array(latencies) * 1e6
+    return {
+        "mean_us": float(micros.mean()),
+        "p50_us": float(np.percentile(micros, 50)),
+        "p95_us": float(np.percentile(micros, 95)),
+        "max_us": float(micros.max()),
+    }
+
+
+def compare_decisions(
+    baseline: List[Decision], decisions: List[Decision], slowest: int = SLOWEST_TURNS
+) -> Dict:
+    expected = {(decision.episode, decision.step): decision for decision in baseline}
+    divergences = []
+    deltas = []
+    for decision in decisions:
+        before = expected.pop((decision.episode, decision.step), None)
+        if before is None:
+            continue
+        if before.actions != decision.actions:
+            divergences.append(
+                Divergence(decision.episode, decision.step, before.actions, decision.actions)
+            )
+        deltas.append((decision.latency - before.latency, decision.episode, decision.step))
+    deltas.sort(reverse=True)
+    return {
+        "turns": len(deltas),
+        "missing": sorted(expected),
+        "divergences": divergences,
+        "baseline_latency": latency_summary([decision.latency for decision in baseline]),
+        "latency": latency_summary([decision.latency for decision in decisions]),
+        "latency_delta": latency_summary([delta for delta, _, _ in deltas]),
+        "slowest": [
+            {"episode": episode, "step": step, "delta_us": delta * 1e6}
+            for delta, episode, step in deltas[:slowest]
+        ],
+    }
+
+
+def format_comparison(comparison: Dict, limit: int = 10) -> str:
+    lines = [
+        f"{comparison['turns']} turns compared, {len(comparison['divergences'])} diverged, "
+        f"{len(comparison['missing'])} baseline turns not replayed"
+    ]
+    for divergence in comparison["divergences"][:limit]:
+        changes = ", ".join(
+            f"{uid}: {divergence.baseline.get(uid)} -> {divergence.actions.get(uid)}"
+            for uid in divergence.uids()
+        )
+        lines.append(f"  episode {divergence.episode} step {divergence.step}: {changes}")
+    if len(comparison["divergences"]) > limit:
+        lines.append(f"  ... {len(comparison['divergences']) - limit} more")
+
+    lines.append(f"{'latency':<16} {'mean_us':>10} {'p50_us':>10} {'p95_us':>10} {'max_us':>10}")
+    for name in ("baseline_latency", "latency", "latency_delta"):
+        summary = comparison[name]
+        lines.append(
+            f"{name:<16} {summary['mean_us']:>10.1f} {summary['p50_us']:>10.1f} "
+            f"{summary['p95_us']:>10.1f} {summary['max_us']:>10.1f}"
+        )
+    for turn in comparison["slowest"]:
+        lines.append(f"  episode {turn['episode']} step {turn['step']}: {turn['delta_us']:+.1f} us")
+    return "\n".join(lines)
@@ -0,0 +1,305 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.routing import STAY
+from src.simulator import SHIP_MOVES
+from src.utils import Observation
+
+FORMAT_VERSION = 1
+# boards are stored in centi-halite: a keyframe as int32, the other turns as int16 deltas to
+# the turn before
+HALITE_SCALE = 100
+KEYFRAME_INTERVAL = 50
+EPISODES_PER_SHARD = 100
+DELTA_LIMIT = np.iinfo(np.int16).max
+
+# ship action codes: the move codes of src.routing, STAY for no action, then conversion
+SHIP_ACTIONS = {**SHIP_MOVES, "CONVERT": STAY + 1}
+SHIP_ACTION_NAMES = {code: name for name, code in SHIP_ACTIONS.items()}
+SPAWN = 1
+
+COLUMNS = {
+    # one row per turn
+    "turn_episode": np.int32,
+    "turn_step": np.int16,
+    "turn_keyframe": np.int32,
+    "player_halite": np.float32,
+    "board_deltas": np.int16,
+    "ship_start": np.int64,
+    "yard_start": np.int64,
+    # one row per keyframe
+    "keyframes": np.int32,
+    "keyframe_turns": np.int32,
+    # one row per ship or shipyard and turn
+    "ship_uid": np.int32,
+    "ship_owner": np.int8,
+    "ship_cell": np.int16,
+    "ship_cargo": np.float32,
+    "ship_action": np.int8,
+    "yard_uid": np.int32,
+    "yard_owner": np.int8,
+    "yard_cell": np.int16,
+    "yard_action": np.int8,
+}
+
+
+class ShardWriter:
+    def __init__(self, path: str, players: int, keyframe_interval: int):
+        self.path = path
+        self.players = players
+        self.keyframe_interval = keyframe_interval
+        self.columns: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+        self.uids: Dict[str, int] = {}
+        self.episodes: List[Dict] = []
+        self.turns = 0
+        self.ships = 0
+        self.yards = 0
+        self.episode_turns = 0
+        self.board: Optional[np.ndarray] = None
+
+    def uid(self, uid: str) -> int:
+        return self.uids.setdefault(uid, len(self.uids))
+
+    def add_turn(self, obs: Dict, actions: Sequence[Optional[Dict[str, str]]]) -> None:
+        columns = self.columns
+        board = np.round(np.asarray(obs["halite"]) * HALITE_SCALE).astype(np.int64)
+        delta = None if self.board is None else board - self.board
+        if (
+            delta is None
+            or self.episode_turns % self.keyframe_interval == 0
+            or np.abs(delta).max() > DELTA_LIMIT
+        ):
+            columns["keyframes"].append(board)
+            columns["keyframe_turns"].append(self.turns)
+            delta = np.zeros_like(board)
+        columns["board_deltas"].append(delta)
+        columns["turn_keyframe"].append(len(columns["keyframes"]) - 1)
+        columns["turn_episode"].append(len(self.episodes))
+        columns["turn_step"].append(obs["step"])
+        columns["ship_start"].append(self.ships)
+        columns["yard_start"].append(self.yards)
+
+        halite = []
+        for owner, (player_halite, yards, ships) in enumerate(obs["players"]):
+            halite.append(player_halite)
+            player_actions = (actions[owner] if owner < len(actions) else None) or {}
+            for uid, cell in yards.items():
+                columns["yard_uid"].append(self.uid(uid))
+                columns["yard_owner"].append(owner)
+                columns["yard_cell"].append(cell)
+                columns["yard_action"].append(SPAWN if player_actions.get(uid) == "SPAWN" else 0)
+            for uid, (cell, cargo) in ships.items():
+                columns["ship_uid"].append(self.uid(uid))
+                columns["ship_owner"].append(owner)
+                columns["ship_cell"].append(cell)
+                columns["ship_cargo"].append(cargo)
+                columns["ship_action"].append(SHIP_ACTIONS.get(player_actions.get(uid, ""), STAY))
+            self.ships += len(ships)
+            self.yards += len(yards)
+        columns["player_halite"].append(halite)
+
+        self.board = board
+        self.turns += 1
+        self.episode_turns += 1
+
+    def end_episode(self, info: Dict) -> None:
+        info["first_turn"] = self.turns - self.episode_turns
+        info["turns"] = self.episode_turns
+        self.episodes.append(info)
+        self.episode_turns = 0
+        self.board = None
+
+    def write(self, size: int) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        columns = dict(self.columns)
+        columns["ship_start"] = columns["ship_start"] + [self.ships]
+        columns["yard_start"] = columns["yard_start"] + [self.yards]
+        for name, dtype in COLUMNS.items():
+            values = np.array(columns[name], dtype=dtype)
+            if name in ("board_deltas", "keyframes"):
+                values = values.reshape(-1, size ** 2)
+            elif name == "player_halite":
+                values = values.reshape(-1, self.players)
+            np.save(os.path.join(self.path, f"{name}.npy"), values)
+        uids = sorted(self.uids, key=self.uids.get)  # type: ignore
+        np.save(os.path.join(self.path, "uids.npy"), np.array(uids, dtype=str))
+        meta = {
+            "version": FORMAT_VERSION,
+            "size": size,
+            "players": self.players,
+            "halite_scale": HALITE_SCALE,
+            "keyframe_interval": self.keyframe_interval,
+            "episodes": self.episodes,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as meta_file:
+            json.dump(meta, meta_file)
+
+
+class ReplayRecorder:
+    # Records episodes turn by turn into shards under root, one directory of .npy columns
+    # and a meta.json per episodes_per_shard episodes. A shard is written when it is full and
+    # on close.
+
+    def __init__(
+        self,
+        root: str,
+        episodes_per_shard: int = EPISODES_PER_SHARD,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+    ):
+        self.root = root
+        self.episodes_per_shard = episodes_per_shard
+        self.keyframe_interval = keyframe_interval
+        self.shard: Optional[ShardWriter] = None
+        self.size = 0
+        self.shards = len(ReplayReader.shard_paths(root)) if os.path.isdir(root) else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record_turn(self, obs: Dict, actions: Sequence[Optional[Dict[str, str]]]) -> None:
+        # obs must show every player, like the first player's observation does
+        players = len(obs["players"])
+        if self.shard is not None and self.shard.players != players:
+            if self.shard.episode_turns:
+                raise ValueError("the number of players changed within an episode")
+            # a shard holds episodes with one number of players only
+            self.flush()
+        if self.shard is None:
+            path = os.path.join(self.root, f"shard-{self.shards:05d}")
+            self.shard = ShardWriter(path, players, self.keyframe_interval)
+            self.shards += 1
+            self.size = int(round(len(obs["halite"]) ** 0.5))
+        self.shard.add_turn(obs, actions)
+
+    def end_episode(self, rewards: Sequence[Optional[float]], **info) -> None:
+        if self.shard is None:
+            raise ValueError("no turns recorded in this episode")
+        self.shard.end_episode({"rewards": list(rewards), **info})
+        if len(self.shard.episodes) >= self.episodes_per_shard:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.shard is not None and self.shard.episodes:
+            self.shard.write(self.size)
+        self.shard = None
+
+    def close(self) -> None:
+        self.flush()
+
+
+def record_kaggle_episode(recorder: ReplayRecorder, steps: List, **info) -> None:
+    # steps of a kaggle environment: steps[t][0].observation shows every player, and the
+    # actions played from it are in steps[t + 1]
+    for turn, agent_states in enumerate(steps):
+        following = steps[turn + 1] if turn + 1 < len(steps) else [None] * len(agent_states)
+        actions = [None if state is None else state.action for state in following]
+        recorder.record_turn(agent_states[0].observation, actions)
+    recorder.end_episode([state.reward for state in steps[-1]], **info)
+
+
+class Shard:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            self.meta = json.load(meta_file)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has replay format {self.meta['version']}")
+        # memory-mapped, only the pages of the turns that are read are loaded
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS
+        }
+        self.uids = np.load(os.path.join(path, "uids.npy"), mmap_mode="r")
+
+    def board(self, turn: int) -> np.ndarray:
+        keyframe = self.columns["turn_keyframe"][turn]
+        first = self.columns["keyframe_turns"][keyframe]
+        board = self.columns["keyframes"][keyframe].astype(np.int64)
+        board += self.columns["board_deltas"][first + 1 : turn + 1].sum(axis=0, dtype=np.int64)
+        return board / self.meta["halite_scale"]
+
+    def observation(self, turn: int) -> Observation:
+        columns = self.columns
+        players: List[List] = [[float(halite), {}, {}] for halite in columns["player_halite"][turn]]
+        yards = slice(columns["yard_start"][turn], columns["yard_start"][turn + 1])
+        for uid, owner, cell in zip(
+            columns["yard_uid"][yards], columns["yard_owner"][yards], columns["yard_cell"][yards]
+        ):
+            players[owner][1][str(self.uids[uid])] = int(cell)
+        ships = slice(columns["ship_start"][turn], columns["ship_start"][turn + 1])
+        for uid, owner, cell, cargo in zip(
+            columns["ship_uid"][ships],
+            columns["ship_owner"][ships],
+            columns["ship_cell"][ships],
+            columns["ship_cargo"][ships],
+        ):
+            players[owner][2][str(self.uids[uid])] = [int(cell), float(cargo)]
+        return Observation(
+            player=0,
+            step=int(columns["turn_step"][turn]),
+            halite=self.board(turn).tolist(),
+            players=players,
+        )
+
+    def actions(self, turn: int) -> List[Dict[str, str]]:
+        columns = self.columns
+        actions: List[Dict[str, str]] = [{} for _ in range(self.meta["players"])]
+        yards = slice(columns["yard_start"][turn], columns["yard_start"][turn + 1])
+        for uid, owner, action in zip(
+            columns["yard_uid"][yards], columns["yard_owner"][yards], columns["yard_action"][yards]
+        ):
+            if action == SPAWN:
+                actions[owner][str(self.uids[uid])] = "SPAWN"
+        ships = slice(columns["ship_start"][turn], columns["ship_start"][turn + 1])
+        for uid, owner, action in zip(
+            columns["ship_uid"][ships], columns["ship_owner"][ships], columns["ship_action"][ships]
+        ):
+            if action != STAY:
+                actions[owner][str(self.uids[uid])] = SHIP_ACTION_NAMES[action]
+        return actions
+
+
+class ReplayReader:
+    # Episodes of every shard under root, numbered in shard order.
+
+    def __init__(self, root: str):
+        self.shards = [Shard(path) for path in self.shard_paths(root)]
+        self.index = [
+            (shard, episode) for shard in self.shards for episode in shard.meta["episodes"]
+        ]
+
+    @staticmethod
+    def shard_paths(root: str) -> List[str]:
+        return sorted(
+            os.path.join(root, name)
+            for name in os.listdir(root)
+            if os.path.isfile(os.path.join(root, name, "meta.json"))
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    def episode(self, episode: int) -> Dict:
+        return self.index[episode][1]
+
+    def turn(self, episode: int, step: int):
+        shard, info = self.index[episode]
+        if not 0 <= step < info["turns"]:
+            raise IndexError(f"episode {episode} has {info['turns']} turns")
+        return shard, info["first_turn"] + step
+
+    def board(self, episode: int, step: int) -> np.ndarray:
+        shard, turn = self.turn(episode, step)
+        return shard.board(turn)
+
+    def observation(self, episode: int, step: int) -> Observation:
+        shard, turn = self.turn(episode, step)
+        return shard.observation(turn)
+
+    def actions(self, episode: int, step: int) -> List[Dict[str, str]]:
+        shard, turn = self.turn(episode, step)
+        return shard.actions(turn)
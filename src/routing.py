@@ -0,0 +1,53 @@
+from typing import Tuple
+
+import numpy as np
+
+from src.tables import cached_tables
+from src.utils import SIZE
+
+# move codes, in the order of the agents' Move enums
+NORTH, SOUTH, EAST, WEST, STAY = range(5)
+
+
+def build_axis_offsets(size: int) -> np.ndarray:
+    # offsets[a, b] is the shortest signed step count from a to b along one wrapping axis
+    offsets = (np.arange(size)[np.newaxis, :] - np.arange(size)[:, np.newaxis]) % size
+    offsets[offsets > size // 2] -= size
+    return offsets.astype(np.int8)
+
+
+def build_tables(size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    axis_offsets = build_axis_offsets(size)
+    rows, cols = np.divmod(np.arange(size ** 2), size)
+    row_offsets = axis_offsets[np.ix_(rows, rows)]
+    col_offsets = axis_offsets[np.ix_(cols, cols)]
+
+    distances = (np.abs(row_offsets) + np.abs(col_offsets)).astype(np.int8)
+
+    # rows are travelled first, the same order the agents always navigated in
+    first_moves = np.full(distances.shape, STAY, dtype=np.int8)
+    first_moves[col_offsets < 0] = WEST
+    first_moves[col_offsets > 0] = EAST
+    first_moves[row_offsets < 0] = NORTH
+    first_moves[row_offsets > 0] = SOUTH
+
+    neighbours = np.stack(
+        [
+            ((rows - 1) % size) * size + cols,
+            ((rows + 1) % size) * size + cols,
+            rows * size + (cols + 1) % size,
+            rows * size + (cols - 1) % size,
+            rows * size + cols,
+        ],
+        axis=1,
+    ).astype(np.intp)
+
+    return axis_offsets, distances, first_moves, neighbours
+
+
+# the tables of the board, memory mapped from the table cache once a process has built them
+AXIS_OFFSETS, DISTANCES, FIRST_MOVES, NEIGHBOURS = cached_tables("routing", build_tables, SIZE)
+
+
+def distance_map(target: int) -> np.ndarray:
+    return DISTANCES[target].reshape(SIZE, SIZE)
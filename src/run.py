@@ -1,33 +1,185 @@
+import json
+import os
+
 from kaggle_environments import evaluate, make
 
 from .agents.first_agent import first_agent
-from .utils import EXAMPLE_OBS, won_game_percentage
+from .evaluation import run_episodes
+from .profiling import format_report, profile_games
+from .regression import (
+    CHUNK_TURNS,
+    WARMUP_TURNS,
+    compare_decisions,
+    example_chunks,
+    format_comparison,
+    load_decisions,
+    replay_chunks,
+    replay_decisions,
+    save_decisions,
+)
+from .replay import ReplayReader, ReplayRecorder, record_kaggle_episode
+from .simulator import play_headless_episode
+from .stats import MatchStats, Sprt
+from .sweep import ResultCache, format_trials, parse_space, sweep
+from .tournament import agent_name, discover_agents, format_leaderboard, play_tournament
+from .utils import EXAMPLE_OBS
+
+DEFAULT_AGENTS = ["src/agents/single_ship_agent.py", "src/agents/single_ship_agent.py"]
 
 
-def run_single():
+def run_single(record=None):
     env = make("halite", debug=True)
     env.render()
-    env.run(["src/agents/single_ship_agent.py", None])
+    agents = ["src/agents/single_ship_agent.py", None]
+    env.run(agents)
+    if record:
+        with ReplayRecorder(record) as recorder:
+            record_kaggle_episode(recorder, env.steps, agents=agents)
 
 
-def run_test():
+def run_test(record=None):
     env = make("halite", debug=True)
+    agents = ["src/agents/single_ship_agent.py", None]
+    recorder = ReplayRecorder(record) if record else None
     for _ in range(10):
-        env.run(["src/agents/single_ship_agent.py", None])
+        env.run(agents)
+        if recorder:
+            record_kaggle_episode(recorder, env.steps, agents=agents)
+    if recorder:
+        recorder.close()
 
 
 def run_example_obs():
     first_agent(EXAMPLE_OBS)
 
 
-def run_evaluate():
-    print(
-        won_game_percentage(
-            evaluate(
-                "halite",
-                ["src/agents/single_ship_agent.py", "src/agents/single_ship_agent.py"],
-                num_episodes=10,
-                configuration={"agentExec": "LOCAL"},
-            )
-        ),
+def play_episode(agents, seed):  # pylint: disable=W0613
+    # the global generators are seeded by the caller
+    return evaluate("halite", agents, num_episodes=1, configuration={"agentExec": "LOCAL"})[0]
+
+
+def run_evaluate(agents=None, episodes=10, workers=1, seed=0, headless=False, sprt=None):
+    # with sprt=(elo0, elo1) the evaluation stops as soon as the first agent is shown to be
+    # elo1 or elo0 stronger than the other
+    play = play_headless_episode if headless else play_episode
+    stats = MatchStats(sprt=Sprt(*sprt) if sprt else None)
+    results = run_episodes(play, agents or DEFAULT_AGENTS, episodes, workers, seed)
+    try:
+        for result in results:
+            stats.add(result.rewards)
+            print(f"episode {result.episode} (seed {result.seed}): {result.rewards}")
+            print(f"  {stats.summary()}")
+            decision = stats.decision()
+            if decision:
+                print(f"SPRT accepts {decision} after {stats.episodes} episodes")
+                break
+    finally:
+        # cancels the episodes not started yet
+        results.close()
+
+
+def run_tournament(
+    agents=None,
+    schedule="round-robin",
+    players=2,
+    games=1,
+    rounds=1,
+    workers=1,
+    seed=0,
+    headless=False,
+):
+    def print_result(result, lineup, ratings):
+        names = ", ".join(agent_name(agent) for agent in lineup)
+        print(f"episode {result.episode} (seed {result.seed}) {names}: {result.rewards}")
+
+    play = play_headless_episode if headless else play_episode
+    ratings = play_tournament(
+        play,
+        agents or discover_agents(),
+        schedule,
+        players,
+        games,
+        rounds,
+        workers,
+        seed,
+        print_result,
+    )
+    print(format_leaderboard(ratings))
+
+
+def run_profile(agents=None, games=1, seed=0, output=None):
+    report, results = profile_games(play_episode, agents or DEFAULT_AGENTS, games, seed)
+    for result in results:
+        print(f"game {result.episode} (seed {result.seed}): {result.rewards}")
+    print(format_report(report))
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+
+
+def run_regress(agent, baseline, replays=None, workers=1, player=0, update=False):
+    # Replays the recorded turns, or EXAMPLE_OBS without replays, through the agent. Writes
+    # the decisions to baseline when it does not exist yet or update is set, compares them
+    # with it otherwise. => True if no decision diverged
+    if os.path.exists(baseline) and not update:
+        # the turns are chunked like the baseline's, so the agents are warmed up alike
+        expected, settings = load_decisions(baseline)
+    else:
+        expected = None
+        settings = {
+            "agent": agent,
+            "replays": replays,
+            "player": player,
+            "chunk_turns": CHUNK_TURNS,
+            "warmup": WARMUP_TURNS,
+        }
+    if settings["replays"]:
+        chunks = replay_chunks(
+            ReplayReader(settings["replays"]),
+            settings["player"],
+            settings["chunk_turns"],
+            settings["warmup"],
+        )
+    else:
+        chunks = example_chunks(settings["player"])
+    decisions = replay_decisions(agent, chunks, workers)
+
+    if expected is None:
+        save_decisions(baseline, decisions, **settings)
+        print(f"wrote {len(decisions)} decisions of {agent} to {baseline}")
+        return True
+    comparison = compare_decisions(expected, decisions)
+    print(format_comparison(comparison))
+    return not comparison["divergences"]
+
+
+def run_sweep(
+    agents=None,
+    space=(),
+    search="grid",
+    games=10,
+    samples=None,
+    workers=1,
+    seed=0,
+    cache=None,
+):
+    # Tunes the params of the first agent against the second, by default the first agent with
+    # its default params. Games already in the cache file are not played again.
+    agent, *opponent = agents or DEFAULT_AGENTS[:1]
+
+    def print_rung(rung, trials):
+        print(f"rung {rung}" if search == "halving" else f"{len(trials)} candidates")
+        print(format_trials(trials))
+
+    sweep(
+        agent,
+        parse_space(space),
+        search,
+        games,
+        samples,
+        print_rung,
+        opponent=opponent[0] if opponent else None,
+        workers=workers,
+        base_seed=seed,
+        cache=ResultCache(cache),
     )
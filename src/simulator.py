@@ -0,0 +1,412 @@
+import math
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.routing import EAST, NORTH, SOUTH, STAY, WEST, build_tables
+from src.tables import cached_tables
+from src.utils import Observation
+
+Agent = Callable[..., Dict[str, str]]
+Rewards = List[Optional[float]]
+
+PLAYER_STARTING_HALITE = 5000
+SHIP_MOVES = {"NORTH": NORTH, "SOUTH": SOUTH, "EAST": EAST, "WEST": WEST}
+# kaggle's configuration keys, in the order of the HaliteConfig fields
+CONFIGURATION_KEYS = [
+    "size",
+    "episodeSteps",
+    "halite",
+    "spawnCost",
+    "convertCost",
+    "moveCost",
+    "collectRate",
+    "regenRate",
+    "actTimeout",
+]
+
+
+class HaliteConfig(NamedTuple):
+    size: int = 15
+    episode_steps: int = 400
+    starting_halite: float = 24000  # on the whole board
+    spawn_cost: float = 500
+    convert_cost: float = 2000
+    move_cost: float = 0.1  # share of the cargo a move costs
+    collect_rate: float = 0.25
+    regen_rate: float = 0.02
+    act_timeout: float = 2
+
+    @classmethod
+    def from_configuration(cls, configuration: Dict) -> "HaliteConfig":
+        return cls(
+            *(
+                configuration.get(key, default)
+                for key, default in zip(CONFIGURATION_KEYS, cls())  # type: ignore
+            )
+        )
+
+    def configuration(self) -> Observation:
+        return Observation(zip(CONFIGURATION_KEYS, self))
+
+
+@lru_cache(maxsize=None)
+def neighbour_table(size: int) -> np.ndarray:
+    return cached_tables("routing", build_tables, size)[3]
+
+
+def starting_cells(size: int, players: int) -> List[int]:
+    # kaggle's layout: the centre for one player, the middle row for two, the corners of the
+    # central square for four
+    mid, quarter, three_quarters = size // 2, size // 4, 3 * size // 4
+    layouts = {
+        1: [(mid, mid)],
+        2: [(mid, quarter), (mid, math.ceil(3 * size / 4) - 1)],
+        4: [
+            (quarter, quarter),
+            (quarter, three_quarters),
+            (three_quarters, quarter),
+            (three_quarters, three_quarters),
+        ],
+    }
+    if players not in layouts:
+        raise ValueError(f"1, 2 or 4 players can play, not {players}")
+    return [row * size + col for row, col in layouts[players]]
+
+
+def initial_board(config: HaliteConfig, rng: np.random.Generator) -> np.ndarray:
+    # kaggle's generator: halite seeds spread radially over one quarter of the board, which
+    # is mirrored to the others so that every starting cell sees the same board
+    half = math.ceil(config.size / 2)
+    seeds = np.zeros((half, half))
+    for value in range(half):
+        row, col = rng.integers(half, size=2)
+        seeds[row, col] = value ** 2
+
+    quarter = seeds.copy()
+    rows, cols = np.indices((half, half))
+    for row, col in zip(*np.nonzero(seeds)):
+        value = seeds[row, col]
+        radius = round((value / half) ** 0.5)
+        near = (np.abs(rows - row) < radius) & (np.abs(cols - col) < radius)
+        distance = ((rows[near] - row) ** 2 + (cols[near] - col) ** 2) ** 0.5
+        quarter[near] += np.floor(value / np.maximum(1, distance) ** distance)
+    quarter = np.floor(quarter * config.starting_halite / quarter.sum() / 4)
+
+    board = np.zeros((config.size, config.size))
+    board[:half, :half] = quarter
+    board[:half, config.size - half :] = quarter[:, ::-1]
+    board[config.size - half :] = board[:half][::-1]
+    return board.ravel()
+
+
+class HaliteState:
+    # The whole game on arrays: the board, the players' halite, and columns of the ships and
+    # shipyards with their uids kept alongside in lists.
+
+    def __init__(self, config: HaliteConfig, players: int):
+        self.config = config
+        self.step = 0
+        self.uid_counter = 0
+        self.halite = np.zeros(config.size ** 2)
+        self.player_halite = np.full(players, float(PLAYER_STARTING_HALITE))
+        self.active = np.ones(players, dtype=bool)
+        self.ship_uids: List[str] = []
+        self.ship_owners = np.zeros(0, dtype=np.intp)
+        self.ship_cells = np.zeros(0, dtype=np.intp)
+        self.ship_cargo = np.zeros(0)
+        self.yard_uids: List[str] = []
+        self.yard_owners = np.zeros(0, dtype=np.intp)
+        self.yard_cells = np.zeros(0, dtype=np.intp)
+
+    @classmethod
+    def initial(
+        cls, config: HaliteConfig, players: int, rng: Optional[np.random.Generator] = None
+    ) -> "HaliteState":
+        state = cls(config, players)
+        state.halite = initial_board(config, rng or np.random.default_rng())
+        for player, cell in enumerate(starting_cells(config.size, players)):
+            state.add_ship(player, cell)
+        return state
+
+    @classmethod
+    def from_observation(cls, obs: Dict, config: HaliteConfig) -> "HaliteState":
+        state = cls(config, len(obs["players"]))
+        state.step = obs["step"]
+        state.halite = np.array(obs["halite"], dtype=np.float64)
+        for player, (halite, shipyards, ships) in enumerate(obs["players"]):
+            state.player_halite[player] = halite
+            for uid, cell in shipyards.items():
+                state.add_shipyard(player, cell, uid)
+            for uid, (cell, cargo) in ships.items():
+                state.add_ship(player, cell, cargo, uid)
+        return state
+
+    def create_uid(self) -> str:
+        # kaggle's scheme: the step the entity first appears in and a count within the turn
+        self.uid_counter += 1
+        return f"{self.step + 1}-{self.uid_counter}"
+
+    def add_ship(self, player: int, cell: int, cargo: float = 0, uid: Optional[str] = None):
+        self.ship_uids.append(uid or self.create_uid())
+        self.ship_owners = np.append(self.ship_owners, player)
+        self.ship_cells = np.append(self.ship_cells, cell)
+        self.ship_cargo = np.append(self.ship_cargo, float(cargo))
+
+    def add_shipyard(self, player: int, cell: int, uid: Optional[str] = None):
+        self.yard_uids.append(uid or self.create_uid())
+        self.yard_owners = np.append(self.yard_owners, player)
+        self.yard_cells = np.append(self.yard_cells, cell)
+
+    def keep_ships(self, keep: np.ndarray) -> None:
+        self.ship_uids = [uid for uid, kept in zip(self.ship_uids, keep) if kept]
+        self.ship_owners = self.ship_owners[keep]
+        self.ship_cells = self.ship_cells[keep]
+        self.ship_cargo = self.ship_cargo[keep]
+
+    def keep_shipyards(self, keep: np.ndarray) -> None:
+        self.yard_uids = [uid for uid, kept in zip(self.yard_uids, keep) if kept]
+        self.yard_owners = self.yard_owners[keep]
+        self.yard_cells = self.yard_cells[keep]
+
+    def players(self) -> List[List]:
+        # halite and cargo are whole numbers under kaggle's rules
+        players: List[List] = [[int(halite), {}, {}] for halite in self.player_halite]
+        for uid, owner, cell in zip(self.yard_uids, self.yard_owners, self.yard_cells):
+            players[owner][1][uid] = int(cell)
+        for uid, owner, cell, cargo in zip(
+            self.ship_uids, self.ship_owners, self.ship_cells, self.ship_cargo
+        ):
+            players[owner][2][uid] = [int(cell), int(cargo)]
+        return players
+
+    def observations(self) -> List[Observation]:
+        # one per player, sharing the board and the players; kaggle numbers the first
+        # observation step 1 like the second one
+        halite = self.halite.tolist()
+        players = self.players()
+        return [
+            Observation(player=player, step=max(self.step, 1), halite=halite, players=players)
+            for player in range(len(players))
+        ]
+
+    def eliminated(self) -> np.ndarray:
+        players = len(self.player_halite)
+        ships = np.bincount(self.ship_owners, minlength=players)
+        yards = np.bincount(self.yard_owners, minlength=players)
+        return (ships == 0) & ((yards == 0) | (self.player_halite < self.config.spawn_cost))
+
+    def eliminate(self, players: np.ndarray) -> None:
+        # the players lose their halite, ships and shipyards
+        self.active &= ~players
+        self.player_halite[players] = 0
+        self.keep_ships(~players[self.ship_owners])
+        self.keep_shipyards(~players[self.yard_owners])
+
+    def done(self) -> bool:
+        if self.step >= self.config.episode_steps - 1:
+            return True
+        return self.active.sum() < min(2, len(self.active))
+
+
+def advance(state: HaliteState, actions: Sequence[Optional[Dict[str, str]]]) -> None:
+    # One turn of the rules of kaggle_environments 0.2.1. Every player's actions are played in
+    # order up to the first SPAWN or CONVERT, the rest are dropped. An action the rules
+    # reject, like one for an entity the player does not own or one it cannot pay for,
+    # eliminates the player. Then ships on foreign shipyards and colliding ships are
+    # destroyed, players that cannot gather halite anymore are eliminated, ships without an
+    # action deposit or collect, and cells without a ship or shipyard regenerate.
+    config = state.config
+    state.uid_counter = 0
+
+    ship_index = {uid: index for index, uid in enumerate(state.ship_uids)}
+    yard_index = {uid: index for index, uid in enumerate(state.yard_uids)}
+    moves = np.full(len(state.ship_uids), STAY, dtype=np.intp)
+    # ships named in an action neither collect nor deposit, even when the action was dropped
+    acted = np.zeros(len(state.ship_uids), dtype=bool)
+    converted = np.zeros(len(state.ship_uids), dtype=bool)
+    invalid = np.zeros(len(state.active), dtype=bool)
+    # the spawning shipyard or the converted ship, per player in turn like kaggle's uids
+    built: List[Tuple[int, Optional[int], Optional[int]]] = []
+    for player, player_actions in enumerate(actions):
+        if not player_actions or not state.active[player]:
+            continue
+        for uid, action in player_actions.items():
+            if action == "SPAWN":
+                yard = yard_index.get(uid)
+                if yard is None or state.yard_owners[yard] != player:
+                    invalid[player] = True
+                elif state.player_halite[player] < config.spawn_cost:
+                    invalid[player] = True
+                else:
+                    state.player_halite[player] -= config.spawn_cost
+                    built.append((player, yard, None))
+                break
+            ship = ship_index.get(uid)
+            if ship is None or state.ship_owners[ship] != player:
+                invalid[player] = True
+                break
+            if action == "CONVERT":
+                cell, cargo = state.ship_cells[ship], state.ship_cargo[ship]
+                own_yard = ((state.yard_cells == cell) & (state.yard_owners == player)).any()
+                if state.player_halite[player] < config.convert_cost - cargo or own_yard:
+                    invalid[player] = True
+                else:
+                    state.player_halite[player] += cargo - config.convert_cost
+                    converted[ship] = True
+                    built.append((player, None, ship))
+                break
+            if action not in SHIP_MOVES:
+                invalid[player] = True
+                break
+            moves[ship] = SHIP_MOVES[action]
+        for uid in player_actions:
+            ship = ship_index.get(uid)
+            if ship is not None and state.ship_owners[ship] == player:
+                acted[ship] = True
+
+    for player, yard, ship in built:
+        if yard is not None:
+            state.add_ship(player, state.yard_cells[yard])
+        else:
+            cell = int(state.ship_cells[ship])
+            state.add_shipyard(player, cell)
+            state.halite[cell] = 0
+    spawned = len(state.ship_uids) - len(moves)
+    moves = np.r_[moves, np.full(spawned, STAY, dtype=np.intp)]
+    acted = np.r_[acted, np.zeros(spawned, dtype=bool)]
+    converted = np.r_[converted, np.zeros(spawned, dtype=bool)]
+    keep = ~converted & ~invalid[state.ship_owners]
+    state.keep_ships(keep)
+    moves, acted = moves[keep], acted[keep]
+    state.eliminate(invalid)
+
+    # moves
+    moving = moves != STAY
+    state.ship_cells = neighbour_table(config.size)[state.ship_cells, moves]
+    state.ship_cargo[moving] = np.floor(state.ship_cargo[moving] * (1 - config.move_cost))
+
+    # ships on foreign shipyards are destroyed, the shipyards stay
+    yard_owner_at = np.full(config.size ** 2, -1, dtype=np.intp)
+    yard_owner_at[state.yard_cells] = state.yard_owners
+    owners = yard_owner_at[state.ship_cells]
+    keep = (owners < 0) | (owners == state.ship_owners)
+    state.keep_ships(keep)
+    acted = acted[keep]
+
+    # ship collisions: the ship with the most cargo survives, less the cargo of the runner up,
+    # on a tie every ship is destroyed; the cell's halite is destroyed either way
+    order = np.lexsort((-state.ship_cargo, state.ship_cells))
+    sorted_cells = state.ship_cells[order]
+    collided = np.flatnonzero(sorted_cells[1:] == sorted_cells[:-1])
+    if len(collided):
+        keep = np.ones(len(order), dtype=bool)
+        for cell in np.unique(sorted_cells[collided]):
+            group = order[sorted_cells == cell]
+            cargo = state.ship_cargo[group]
+            keep[group] = False
+            if cargo[0] > cargo[1]:
+                keep[group[0]] = True
+                state.ship_cargo[group[0]] -= cargo[1]
+            state.halite[cell] = 0
+        state.keep_ships(keep)
+        acted = acted[keep]
+
+    state.eliminate(state.active & state.eliminated())
+
+    # ships without an action deposit on their shipyards and collect elsewhere
+    on_yard = yard_owner_at[state.ship_cells] >= 0
+    depositing = ~acted & on_yard
+    np.add.at(state.player_halite, state.ship_owners[depositing], state.ship_cargo[depositing])
+    state.ship_cargo[depositing] = 0
+    collecting = ~acted & ~on_yard
+    collecting[collecting] = state.halite[state.ship_cells[collecting]] > 0
+    cells = state.ship_cells[collecting]
+    collected = np.maximum(1, np.floor(state.halite[cells] * config.collect_rate))
+    state.ship_cargo[collecting] += collected
+    state.halite[cells] -= collected
+
+    # cells without a ship or shipyard regenerate
+    regenerating = np.ones(config.size ** 2, dtype=bool)
+    regenerating[state.ship_cells] = False
+    regenerating[state.yard_cells] = False
+    state.halite[regenerating] *= 1 + config.regen_rate
+
+    state.step += 1
+
+
+def rewards(state: HaliteState) -> Rewards:
+    # the halite of the players still in the game, eliminated players get nothing
+    return [
+        float(halite) if active else 0.0
+        for halite, active in zip(state.player_halite, state.active)
+    ]
+
+
+def play_game(
+    agents: Sequence[Optional[Agent]],
+    config: HaliteConfig = HaliteConfig(),
+    seed: Optional[int] = None,
+    state: Optional[HaliteState] = None,
+    on_turn: Optional[Callable[[Observation, List], None]] = None,
+    configuration: Optional[Dict] = None,
+) -> Rewards:
+    # Plays one game, calling every agent directly with its observation and kaggle's
+    # configuration, or configuration if given. None plays no actions. An agent that raises
+    # ends the game and gets None as reward, like an errored agent on kaggle. on_turn sees
+    # every observation with the actions played from it, the final one with no actions.
+    if state is None:
+        state = HaliteState.initial(config, len(agents), np.random.default_rng(seed))
+    if configuration is None:
+        configuration = config.configuration()
+    while True:
+        observations = state.observations()
+        actions: List[Optional[Dict[str, str]]] = []
+        for player, obs in enumerate(observations):
+            agent = agents[player]
+            if agent is None or not state.active[player]:
+                actions.append(None)
+                continue
+            try:
+                actions.append(agent(obs, configuration))
+            except Exception:  # pylint: disable=W0703
+                final = rewards(state)
+                final[player] = None
+                return final
+        if on_turn is not None:
+            on_turn(observations[0], actions)
+        advance(state, actions)
+        if state.done():
+            if on_turn is not None:
+                on_turn(state.observations()[0], [None] * len(agents))
+            return rewards(state)
+
+
+@lru_cache(maxsize=None)
+def agent_code(path: str):
+    with open(path) as source:
+        return compile(source.read(), path, "exec")
+
+
+def load_agent(path: str) -> Agent:
+    # like kaggle: execute the agent file in a fresh namespace and take its last callable, so
+    # every loaded copy of an agent has its own module state
+    namespace: Dict = {"__name__": "agent"}
+    exec(agent_code(path), namespace)  # pylint: disable=W0122
+    return [value for value in namespace.values() if callable(value)][-1]
+
+
+def agent_factory(path: str) -> Callable[[], Agent]:
+    # Makes a fresh agent per game. Agent files that define make_agent are executed once and
+    # their agents keep their state per instance, so many games can share one process; the
+    # others are executed again for every agent, like load_agent.
+    namespace: Dict = {"__name__": "agent"}
+    exec(agent_code(path), namespace)  # pylint: disable=W0122
+    if callable(namespace.get("make_agent")):
+        return namespace["make_agent"]
+    return lambda: load_agent(path)
+
+
+def play_headless_episode(agents: List[str], seed: int) -> Rewards:
+    return play_game([load_agent(path) for path in agents], seed=seed)
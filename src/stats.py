@@ -0,0 +1,125 @@
+import math
+from typing import Optional, Tuple
+
+from src.evaluation import Rewards
+from src.utils import reward_margin
+
+# two-sided 95% normal quantile
+Z_95 = 1.959964
+ACCEPT_H0 = "H0"
+ACCEPT_H1 = "H1"
+
+
+def wilson_interval(successes: float, count: int, z: float = Z_95) -> Tuple[float, float]:
+    if count == 0:
+        return 0.0, 1.0
+    rate = successes / count
+    centre = rate + z ** 2 / (2 * count)
+    spread = z * math.sqrt(rate * (1 - rate) / count + z ** 2 / (4 * count ** 2))
+    scale = 1 + z ** 2 / count
+    return max((centre - spread) / scale, 0.0), min((centre + spread) / scale, 1.0)
+
+
+def elo_score(elo: float) -> float:
+    # expected score of an agent elo points stronger than its opponent
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+class RunningMean:
+    # Welford's online mean and variance
+    __slots__ = ("count", "mean", "squares")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.squares = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.squares += delta * (value - self.mean)
+
+    def variance(self) -> float:
+        return self.squares / (self.count - 1) if self.count > 1 else 0.0
+
+    def interval(self, z: float = Z_95) -> Tuple[float, float]:
+        spread = z * math.sqrt(self.variance() / self.count) if self.count else math.inf
+        return self.mean - spread, self.mean + spread
+
+
+class Sprt:
+    # Sequential probability ratio test of the score (win 1, tie 0.5, loss 0) of an agent:
+    # H0 it is elo0 stronger than its opponents, H1 it is elo1 stronger. A tie counts as half
+    # a win and half a loss.
+
+    def __init__(
+        self, elo0: float = 0.0, elo1: float = 100.0, alpha: float = 0.05, beta: float = 0.05
+    ):
+        score0 = elo_score(elo0)
+        score1 = elo_score(elo1)
+        self.win = math.log(score1 / score0)
+        self.loss = math.log((1 - score1) / (1 - score0))
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, scores: RunningMean) -> float:
+        wins = scores.mean * scores.count
+        return wins * self.win + (scores.count - wins) * self.loss
+
+    def decision(self, scores: RunningMean) -> Optional[str]:
+        llr = self.llr(scores)
+        if llr >= self.upper:
+            return ACCEPT_H1
+        if llr <= self.lower:
+            return ACCEPT_H0
+        return None
+
+
+class MatchStats:
+    # Results of one seat's agent, updated episode by episode. The margin is the agent's
+    # reward minus the best reward of the others, errored agents count as reward 0.
+
+    def __init__(self, player: int = 0, sprt: Optional[Sprt] = None):
+        self.player = player
+        self.sprt = sprt
+        self.wins = 0
+        self.ties = 0
+        self.losses = 0
+        self.scores = RunningMean()
+        self.margins = RunningMean()
+
+    @property
+    def episodes(self) -> int:
+        return self.scores.count
+
+    def add(self, rewards: Rewards) -> None:
+        margin = reward_margin(rewards, self.player)
+        if margin > 0:
+            self.wins += 1
+        elif margin < 0:
+            self.losses += 1
+        else:
+            self.ties += 1
+        self.scores.add(1.0 if margin > 0 else 0.0 if margin < 0 else 0.5)
+        self.margins.add(margin)
+
+    def decision(self) -> Optional[str]:
+        return None if self.sprt is None else self.sprt.decision(self.scores)
+
+    def summary(self) -> str:
+        episodes = max(self.episodes, 1)
+        win_low, win_high = wilson_interval(self.wins, self.episodes)
+        score_low, score_high = wilson_interval(self.wins + self.ties / 2, self.episodes)
+        margin_low, margin_high = self.margins.interval()
+        line = (
+            f"episodes={self.episodes}, wins={self.wins / episodes:.3f} "
+            f"[{win_low:.3f}, {win_high:.3f}], ties={self.ties / episodes:.3f}, "
+            f"losses={self.losses / episodes:.3f}, score={self.scores.mean:.3f} "
+            f"[{score_low:.3f}, {score_high:.3f}], margin={self.margins.mean:.1f} "
+            f"[{margin_low:.1f}, {margin_high:.1f}]"
+        )
+        if self.sprt is not None:
+            llr = self.sprt.llr(self.scores)
+            line += f", llr={llr:.2f} [{self.sprt.lower:.2f}, {self.sprt.upper:.2f}]"
+        return line
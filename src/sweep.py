@@ -0,0 +1,316 @@
+import hashlib
+import json
+import math
+import os
+import random
+from functools import lru_cache
+from itertools import product
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.budget import unlimited_configuration
+from src.evaluation import Rewards
+from src.simulator import HaliteConfig, agent_factory, play_game
+from src.stats import MatchStats, wilson_interval
+
+GRID = "grid"
+RANDOM = "random"
+HALVING = "halving"
+# every successive halving rung keeps the best 1 / HALVING_RATE of the candidates and plays
+# HALVING_RATE times the games with them
+HALVING_RATE = 2
+RANDOM_SAMPLES = 10
+
+Params = Dict[str, Any]
+
+
+class Range(NamedTuple):
+    # uniformly sampled, integers if both ends are
+    low: Union[int, float]
+    high: Union[int, float]
+
+
+Space = Dict[str, Union[Sequence, Range]]
+
+
+class Game(NamedTuple):
+    agent: str
+    params: Tuple[Tuple[str, Any], ...]
+    opponent: str
+    opponent_params: Tuple[Tuple[str, Any], ...]
+    seed: int
+
+    @property
+    def seat(self) -> int:
+        # the candidate plays both seats, alternating by seed
+        return self.seed % 2
+
+
+class Trial(NamedTuple):
+    params: Params
+    stats: MatchStats
+
+
+def parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_space(specs: Sequence[str]) -> Space:
+    # "name=1,2,3" are choices, "name=0.5:0.9" a range
+    space: Space = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not name or not values:
+            raise ValueError(f"expected name=values, got {spec}")
+        if ":" in values:
+            low, high = values.split(":")
+            space[name] = Range(parse_value(low), parse_value(high))
+        else:
+            space[name] = [parse_value(value) for value in values.split(",")]
+    return space
+
+
+def grid_candidates(space: Space) -> List[Params]:
+    if any(isinstance(values, Range) for values in space.values()):
+        raise ValueError("a grid needs choices, not ranges")
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in product(*(space[name] for name in names))]
+
+
+def random_candidates(space: Space, samples: int = RANDOM_SAMPLES, seed: int = 0) -> List[Params]:
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(samples):
+        params = {}
+        for name in sorted(space):
+            values = space[name]
+            if not isinstance(values, Range):
+                params[name] = rng.choice(values)
+            elif isinstance(values.low, int) and isinstance(values.high, int):
+                params[name] = rng.randint(values.low, values.high)
+            else:
+                params[name] = rng.uniform(values.low, values.high)
+        candidates.append(params)
+    return candidates
+
+
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def file_digest(path: str) -> str:
+    with open(path, "rb") as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def source_digest(directory: str = SOURCE_DIRECTORY) -> str:
+    # digest of every module under directory with its path, so a renamed module counts too
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).encode())
+                digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+
+def game_key(game: Game) -> str:
+    # The code of src, the agents and everything they import from it, is part of the key:
+    # results played before any module was edited are played again. The agent files are
+    # hashed too, they need not be in src.
+    return json.dumps(
+        [
+            source_digest(),
+            file_digest(game.agent),
+            game.params,
+            file_digest(game.opponent),
+            game.opponent_params,
+            game.seed,
+        ]
+    )
+
+
+class ResultCache:
+    # Rewards of finished games, appended to a JSON lines file as they finish so an
+    # interrupted sweep keeps them. Without a path the results are only kept in memory.
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.rewards: Dict[str, Rewards] = {}
+        if path and os.path.exists(path):
+            with open(path) as cache_file:
+                for line in cache_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # the line of a game the sweep was stopped writing
+                        continue
+                    self.rewards[record["key"]] = record["rewards"]
+
+    def __contains__(self, game: Game) -> bool:
+        return game_key(game) in self.rewards
+
+    def get(self, game: Game) -> Rewards:
+        return self.rewards[game_key(game)]
+
+    def add(self, game: Game, rewards: Rewards) -> None:
+        key = game_key(game)
+        self.rewards[key] = rewards
+        if self.path:
+            record = {
+                "key": key,
+                "agent": game.agent,
+                "params": dict(game.params),
+                "seed": game.seed,
+                "rewards": rewards,
+            }
+            with open(self.path, "a") as cache_file:
+                cache_file.write(json.dumps(record) + "\n")
+
+
+def play_sweep_game(game: Game) -> Rewards:
+    # the candidate against the opponent, the rewards with the candidate's first
+    random.seed(game.seed)
+    np.random.seed(game.seed)
+    candidate = agent_factory(game.agent)(**dict(game.params))
+    opponent = agent_factory(game.opponent)(**dict(game.opponent_params))
+    agents = [candidate, opponent] if game.seat == 0 else [opponent, candidate]
+    # the agents' budget never runs out, the results are cached by seed whatever the machine
+    configuration = unlimited_configuration(HaliteConfig().configuration())
+    rewards = play_game(agents, seed=game.seed, configuration=configuration)
+    return rewards if game.seat == 0 else rewards[::-1]
+
+
+def play_games(
+    games: Sequence[Game],
+    cache: ResultCache,
+    workers: int = 1,
+    play: Callable[[Game], Rewards] = play_sweep_game,
+) -> None:
+    # plays the games the cache does not know yet; play must be picklable
+    missing = list(dict.fromkeys(game for game in games if game not in cache))
+    if workers <= 1:
+        for game in missing:
+            cache.add(game, play(game))
+        return
+
+    # imported here like in src.evaluation
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(play, game): game for game in missing}
+        try:
+            for future in as_completed(futures):
+                cache.add(futures[future], future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def evaluate_candidates(
+    agent: str,
+    candidates: Sequence[Params],
+    games: int,
+    opponent: Optional[str] = None,
+    opponent_params: Optional[Params] = None,
+    workers: int = 1,
+    base_seed: int = 0,
+    cache: Optional[ResultCache] = None,
+    play: Callable[[Game], Rewards] = play_sweep_game,
+) -> List[Trial]:
+    # Plays every candidate against the opponent, by default the agent with its default
+    # params, on the same seeds. => the trials, best score first, then best margin
+    cache = ResultCache() if cache is None else cache
+    opponent_key = tuple(sorted((opponent_params or {}).items()))
+    trials = {}
+    for params in candidates:
+        key = tuple(sorted(params.items()))
+        trials[key] = [
+            Game(agent, key, opponent or agent, opponent_key, seed)
+            for seed in range(base_seed, base_seed + games)
+        ]
+    play_games([game for played in trials.values() for game in played], cache, workers, play)
+
+    results = []
+    for key, played in trials.items():
+        stats = MatchStats()
+        for game in played:
+            stats.add(cache.get(game))
+        results.append(Trial(dict(key), stats))
+    results.sort(
+        key=lambda trial: (trial.stats.scores.mean, trial.stats.margins.mean), reverse=True
+    )
+    return results
+
+
+def successive_halving(
+    agent: str,
+    candidates: Sequence[Params],
+    games: int,
+    on_rung: Optional[Callable[[int, List[Trial]], None]] = None,
+    **evaluate,
+) -> List[Trial]:
+    # Plays all candidates games games, then the best 1 / HALVING_RATE of them HALVING_RATE
+    # times as many, and so on until one is left. The seeds of a rung extend the seeds of the
+    # rung before, so its games come from the cache. => the trials of the last rung
+    cache = evaluate.pop("cache", None)
+    cache = ResultCache() if cache is None else cache
+    rung = 0
+    while True:
+        trials = evaluate_candidates(agent, candidates, games, cache=cache, **evaluate)
+        if on_rung is not None:
+            on_rung(rung, trials)
+        if len(trials) <= 1:
+            return trials
+        candidates = [trial.params for trial in trials[: math.ceil(len(trials) / HALVING_RATE)]]
+        games *= HALVING_RATE
+        rung += 1
+
+
+def sweep(
+    agent: str,
+    space: Space,
+    search: str = GRID,
+    games: int = 10,
+    samples: Optional[int] = None,
+    on_rung: Optional[Callable[[int, List[Trial]], None]] = None,
+    **evaluate,
+) -> List[Trial]:
+    # A grid plays every combination of choices, a random search samples candidates from the
+    # space. Successive halving narrows down the grid, or random samples if samples is set.
+    seed = evaluate.get("base_seed", 0)
+    if search == GRID:
+        trials = evaluate_candidates(agent, grid_candidates(space), games, **evaluate)
+    elif search == RANDOM:
+        candidates = random_candidates(space, samples or RANDOM_SAMPLES, seed)
+        trials = evaluate_candidates(agent, candidates, games, **evaluate)
+    elif search == HALVING:
+        candidates = (
+            grid_candidates(space) if samples is None else random_candidates(space, samples, seed)
+        )
+        return successive_halving(agent, candidates, games, on_rung, **evaluate)
+    else:
+        raise ValueError(f"unknown search {search}")
+    if on_rung is not None:
+        on_rung(0, trials)
+    return trials
+
+
+def format_trials(trials: Sequence[Trial]) -> str:
+    lines = [f"{'params':<48} {'games':>6} {'score':>22} {'margin':>10}"]
+    for trial in trials:
+        stats = trial.stats
+        low, high = wilson_interval(stats.wins + stats.ties / 2, stats.episodes)
+        params = ", ".join(f"{name}={value}" for name, value in sorted(trial.params.items()))
+        lines.append(
+            f"{params:<48} {stats.episodes:>6} {stats.scores.mean:>7.3f} "
+            f"[{low:.3f}, {high:.3f}] {stats.margins.mean:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,69 @@
+import hashlib
+import inspect
+import os
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+# bump when the layout of the cache files changes
+CACHE_FORMAT = 1
+CACHE_DIRECTORY = os.environ.get(
+    "HALITE_TABLE_CACHE", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".table_cache")
+)
+
+Build = Callable[..., Sequence[np.ndarray]]
+
+
+def table_version(build: Build) -> str:
+    # digest of the source of the module defining build, so editing how the tables are built
+    # never loads the tables of the old code
+    with open(inspect.getfile(build), "rb") as source:
+        return hashlib.sha1(source.read()).hexdigest()[:12]
+
+
+def table_directory(name: str, build: Build, *args, directory: Optional[str] = None) -> str:
+    key = "-".join([name, *map(str, args), f"v{CACHE_FORMAT}", table_version(build)])
+    return os.path.join(CACHE_DIRECTORY if directory is None else directory, key)
+
+
+def load_tables(path: str) -> Optional[List[np.ndarray]]:
+    # memory maps the tables of path without reading them; None if they are not all there
+    try:
+        with open(os.path.join(path, "count")) as count:
+            names = [f"{index}.npy" for index in range(int(count.read()))]
+        return [np.load(os.path.join(path, name), mmap_mode="r").view(np.ndarray) for name in names]
+    except (OSError, ValueError):
+        return None
+
+
+def save_tables(path: str, tables: Sequence[np.ndarray]) -> None:
+    # every file is written aside and renamed, so processes building the same tables at once
+    # never read a partial file; the count is written last and marks the tables complete
+    os.makedirs(path, exist_ok=True)
+    names = [f"{index}.npy" for index in range(len(tables))]
+    for name, table in [*zip(names, tables), ("count", None)]:
+        partial = os.path.join(path, f"{name}.{os.getpid()}")
+        with open(partial, "wb") as table_file:
+            if table is None:
+                table_file.write(str(len(tables)).encode())
+            else:
+                np.save(table_file, table)
+        os.replace(partial, os.path.join(path, name))
+
+
+def cached_tables(
+    name: str, build: Build, *args, directory: Optional[str] = None
+) -> List[np.ndarray]:
+    # The tables build(*args) returns, memory mapped from the cache when an earlier process
+    # built them already. The mapped tables are read only. A cache that cannot be written only
+    # costs the build.
+    path = table_directory(name, build, *args, directory=directory)
+    tables = load_tables(path)
+    if tables is not None:
+        return tables
+    tables = list(build(*args))
+    try:
+        save_tables(path, tables)
+    except OSError:
+        pass
+    return tables
@@ -0,0 +1,164 @@
+import os
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.evaluation import EpisodeResult, PlayEpisode, Rewards, run_lineups
+
+AGENTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "agents")
+INITIAL_RATING = 1500.0
+ELO_K = 32.0
+ELO_SCALE = 400.0
+ROUND_ROBIN = "round-robin"
+SWISS = "swiss"
+
+
+def agent_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def discover_agents(directory: str = AGENTS_DIRECTORY) -> List[str]:
+    # every agent file, paths relative to the working directory like kaggle expects them
+    return sorted(
+        os.path.relpath(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if name.endswith(".py") and not name.startswith("_")
+    )
+
+
+def seatings(lineup: Sequence[str], games: int) -> List[List[str]]:
+    # every game of a match rotates the seats, so no agent keeps the same starting position
+    return [
+        [lineup[(seat + game) % len(lineup)] for seat in range(len(lineup))]
+        for game in range(games)
+    ]
+
+
+def fill_lineup(agents: Sequence[str], players: int) -> List[str]:
+    # fewer agents than seats: the agents take turns filling them
+    return [agents[seat % len(agents)] for seat in range(players)]
+
+
+def round_robin(agents: Sequence[str], players: int = 2, games: int = 1) -> List[List[str]]:
+    # every group of players agents meets in games games
+    if len(agents) < players:
+        return seatings(fill_lineup(agents, players), games)
+    return [
+        seating for lineup in combinations(agents, players) for seating in seatings(lineup, games)
+    ]
+
+
+class Ratings:
+    # Elo ratings of multi-player games: a game counts as one result between every pair of
+    # seats, ranked by reward, with K shared among the opponents of a seat. Errored agents
+    # (None reward) rank last. An agent in several seats of a game counts once per seat.
+
+    def __init__(self, k: float = ELO_K):
+        self.k = k
+        self.ratings: Dict[str, float] = {}
+        self.games: Dict[str, int] = {}
+        self.wins: Dict[str, int] = {}
+        self.ranks: Dict[str, int] = {}
+
+    def add(self, agent: str) -> None:
+        self.ratings.setdefault(agent, INITIAL_RATING)
+        self.games.setdefault(agent, 0)
+        self.wins.setdefault(agent, 0)
+        self.ranks.setdefault(agent, 0)
+
+    def rating(self, agent: str) -> float:
+        return self.ratings.get(agent, INITIAL_RATING)
+
+    def expected_score(self, agent: str, opponent: str) -> float:
+        return 1 / (1 + 10 ** ((self.rating(opponent) - self.rating(agent)) / ELO_SCALE))
+
+    def update(self, lineup: Sequence[str], rewards: Rewards) -> None:
+        scores = [float("-inf") if reward is None else reward for reward in rewards]
+        changes = [0.0] * len(lineup)
+        for seat, other in combinations(range(len(lineup)), 2):
+            if lineup[seat] == lineup[other]:
+                continue
+            score = 0.5 if scores[seat] == scores[other] else float(scores[seat] > scores[other])
+            change = score - self.expected_score(lineup[seat], lineup[other])
+            changes[seat] += change
+            changes[other] -= change
+
+        k = self.k / max(len(lineup) - 1, 1)
+        for seat, agent in enumerate(lineup):
+            self.add(agent)
+            self.ratings[agent] += k * changes[seat]
+            self.games[agent] += 1
+            rank = sum(score > scores[seat] for score in scores)
+            self.ranks[agent] += rank
+            if rank == 0 and scores.count(scores[seat]) == 1:
+                self.wins[agent] += 1
+
+    def leaderboard(self) -> List[Dict]:
+        return [
+            {
+                "agent": agent,
+                "rating": self.ratings[agent],
+                "games": self.games[agent],
+                "wins": self.wins[agent],
+                # 1 for first place
+                "mean_rank": (
+                    1 + self.ranks[agent] / self.games[agent] if self.games[agent] else 0.0
+                ),
+            }
+            for agent in sorted(self.ratings, key=self.ratings.get, reverse=True)  # type: ignore
+        ]
+
+
+def swiss_round(agents: Sequence[str], ratings: Ratings, players: int = 2, games: int = 1):
+    # agents of neighbouring ratings meet, the lowest rated sit out when the seats do not add up
+    ranked = sorted(agents, key=ratings.rating, reverse=True)
+    if len(ranked) < players:
+        return seatings(fill_lineup(ranked, players), games)
+    return [
+        seating
+        for first in range(0, len(ranked) - players + 1, players)
+        for seating in seatings(ranked[first : first + players], games)
+    ]
+
+
+def play_tournament(
+    play_episode: PlayEpisode,
+    agents: Sequence[str],
+    schedule: str = ROUND_ROBIN,
+    players: int = 2,
+    games: int = 1,
+    rounds: int = 1,
+    workers: int = 1,
+    base_seed: int = 0,
+    on_result: Optional[Callable[[EpisodeResult, List[str], Ratings], None]] = None,
+) -> Ratings:
+    # Rates the agents as the results arrive. A round robin round plays every match once, a
+    # Swiss round pairs the agents by the ratings after the round before.
+    ratings = Ratings()
+    for agent in agents:
+        ratings.add(agent)
+    episode = 0
+    for _ in range(rounds):
+        if schedule == ROUND_ROBIN:
+            lineups = round_robin(agents, players, games)
+        elif schedule == SWISS:
+            lineups = swiss_round(agents, ratings, players, games)
+        else:
+            raise ValueError(f"unknown schedule {schedule}")
+
+        for result in run_lineups(play_episode, lineups, workers, base_seed, episode):
+            lineup = lineups[result.episode - episode]
+            ratings.update(lineup, result.rewards)
+            if on_result is not None:
+                on_result(result, lineup, ratings)
+        episode += len(lineups)
+    return ratings
+
+
+def format_leaderboard(ratings: Ratings) -> str:
+    lines = [f"{'agent':<32} {'rating':>8} {'games':>6} {'wins':>6} {'mean_rank':>10}"]
+    for row in ratings.leaderboard():
+        lines.append(
+            f"{agent_name(row['agent']):<32} {row['rating']:>8.1f} {row['games']:>6} "
+            f"{row['wins']:>6} {row['mean_rank']:>10.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,162 @@
+import atexit
+import json
+from typing import IO, Any, Dict, List, Optional
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+LEVEL_NAMES = {level: name for name, level in LEVELS.items()}
+
+
+class NullSink:
+    def write(self, record: Dict[str, Any]) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+class MemorySink:
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+    def flush(self) -> None:
+        pass
+
+
+class JsonLinesSink:
+    # Serialises every record when it is written, so later changes to the traced objects do
+    # not show up, but only writes to the file once buffer_size records are pending.
+
+    def __init__(self, stream: IO[str], buffer_size: int = 256):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.buffer: List[str] = []
+
+    @classmethod
+    def open(cls, path: str, buffer_size: int = 256) -> "JsonLinesSink":
+        return cls(open(path, "a"), buffer_size)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.buffer.append(json.dumps(record, default=str))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.stream.write("\n".join(self.buffer) + "\n")
+            self.buffer.clear()
+        self.stream.flush()
+
+
+class Tracer:
+    # Trace points of one component. A point below the level of the component or on a turn
+    # that is not sampled returns after two comparisons. Field values that are callables are
+    # only called for records that are written, so expensive fields can be passed as lambdas.
+
+    __slots__ = ("component", "level", "sample_every", "sink")
+
+    def __init__(self, component: str, level: int = OFF, sample_every: int = 1, sink=None):
+        self.component = component
+        self.level = level
+        self.sample_every = sample_every
+        self.sink = sink or NullSink()
+
+    def enabled(self, level: int, step: int) -> bool:
+        return level >= self.level and not step % self.sample_every
+
+    def trace(self, level: int, step: int, event: str, **fields) -> None:
+        if level < self.level or step % self.sample_every:
+            return
+        record = {
+            "step": step,
+            "component": self.component,
+            "level": LEVEL_NAMES.get(level, level),
+            "event": event,
+        }
+        for name, value in fields.items():
+            record[name] = value() if callable(value) else value
+        self.sink.write(record)
+
+    def debug(self, step: int, event: str, **fields) -> None:
+        self.trace(DEBUG, step, event, **fields)
+
+    def info(self, step: int, event: str, **fields) -> None:
+        self.trace(INFO, step, event, **fields)
+
+    def warning(self, step: int, event: str, **fields) -> None:
+        self.trace(WARNING, step, event, **fields)
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    # "first_agent=debug,planning=info" -> {"first_agent": 10, "planning": 20}; a name
+    # without a component, like "info", sets the default level under the key "*"
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        component, _, name = item.rpartition("=")
+        if name.lower() not in LEVELS:
+            raise ValueError(f"unknown trace level {name!r}")
+        levels[component or "*"] = LEVELS[name.lower()]
+    return levels
+
+
+class Tracing:
+    # Registry of the tracers of all components. Tracers are created once and reconfigured
+    # in place, so modules can keep them in a global.
+
+    def __init__(self):
+        self.tracers: Dict[str, Tracer] = {}
+        self.levels: Dict[str, int] = {}
+        self.sample_every = 1
+        self.sink = NullSink()
+
+    def tracer(self, component: str) -> Tracer:
+        if component not in self.tracers:
+            self.tracers[component] = Tracer(component)
+            self.apply(self.tracers[component])
+        return self.tracers[component]
+
+    def apply(self, tracer: Tracer) -> None:
+        tracer.level = self.levels.get(tracer.component, self.levels.get("*", OFF))
+        tracer.sample_every = self.sample_every
+        tracer.sink = self.sink
+
+    def configure(
+        self,
+        levels: Optional[Dict[str, int]] = None,
+        sample_every: Optional[int] = None,
+        sink=None,
+    ) -> None:
+        if levels is not None:
+            self.levels = dict(levels)
+        if sample_every is not None:
+            if sample_every < 1:
+                raise ValueError("sample_every must be at least 1")
+            self.sample_every = sample_every
+        if sink is not None:
+            self.sink.flush()
+            self.sink = sink
+        for tracer in self.tracers.values():
+            self.apply(tracer)
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+
+TRACING = Tracing()
+atexit.register(TRACING.flush)
+
+
+def get_tracer(component: str) -> Tracer:
+    return TRACING.tracer(component)
+
+
+def configure(
+    levels: Optional[Dict[str, int]] = None, sample_every: Optional[int] = None, sink=None
+) -> None:
+    TRACING.configure(levels, sample_every, sink)
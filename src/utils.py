@@ -8,19 +8,38 @@ class RunCommand(Enum):
     SINGLE = "single"
     EVAL = "eval"
     EXAMPLE = "example"
+    PROFILE = "profile"
+    REGRESS = "regress"
+    TOURNAMENT = "tournament"
+    SWEEP = "sweep"
 
 
-def won_game_percentage(rewards):
+class Observation(dict):
+    # observation dict that also allows attribute access, like the ones kaggle passes to agents
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def reward_margin(reward_list, player=0) -> float:
+    # the player's reward less the best other reward, None counting as 0: a win is above 0, a
+    # tie shares the best reward
+    halite = [0.0 if reward is None else reward for reward in reward_list]
+    return halite[player] - max(reward for seat, reward in enumerate(halite) if seat != player)
+
+
+def won_game_percentage(rewards, player=0):
     wins = 0
     ties = 0
     losses = 0
 
     for reward_list in rewards:
-        reward0 = 0 if reward_list[0] is None else reward_list[0]
-        reward1 = 0 if reward_list[1] is None else reward_list[1]
-        if reward0 > reward1:
+        margin = reward_margin(reward_list, player)
+        if margin > 0:
             wins += 1
-        elif reward1 > reward0:
+        elif margin < 0:
             losses += 1
         else:
             ties += 1
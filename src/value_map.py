@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from src.projection import MOVE_DECAY_ARRAY
+from src.routing import DISTANCES
+from src.utils import SIZE
+
+# where ships explore when no cell is worth anything
+CENTRE_CELL = SIZE // 2 * SIZE + SIZE // 2
+
+
+@lru_cache(maxsize=None)
+def distance_decay() -> np.ndarray:
+    # decay[s, t]: cargo left after the moves from s to t, a cell by cell table built on first use
+    return MOVE_DECAY_ARRAY[DISTANCES]
+
+
+class ValueMap:
+    # One turn's worth of every target t seen from every cell s: values[s, t] is the halite
+    # expected around t, decayed by the moves from s to t and from t to the nearest dropoff.
+    # best[s] is the target of a ship on s, so assigning targets costs one lookup per ship.
+    __slots__ = ("values", "best")
+
+    def __init__(self, expected: np.ndarray, dropoffs: Sequence[int], fallback: int = CENTRE_CELL):
+        # the move decay is a power, so both legs of the trip multiply
+        home = MOVE_DECAY_ARRAY[DISTANCES[list(dropoffs)].min(axis=0)]
+        self.values = distance_decay() * (np.asarray(expected, dtype=np.float64).ravel() * home)
+        best = self.values.argmax(axis=1)
+        worth = self.values[np.arange(len(best)), best] > 0
+        self.best = np.where(worth, best, fallback).tolist()
+
+    def target(self, cell: int) -> int:
+        return self.best[cell]
@@ -1,5 +1,7 @@
 import numpy as np
+import pytest
 
+from src.agents import first_agent as first_agent_module
 from src.agents.first_agent import (
     SIZE,
     Move,
@@ -10,6 +12,7 @@ from src.agents.first_agent import (
     board_pos_to_position,
     find_halite_cluster,
     first_agent,
+    make_agent,
 )
 
 
@@ -77,7 +80,7 @@ def test_ship_add_task():
     task = Move.NORTH
     ship.add_task(task)
 
-    assert ship.tasks[0] == task
+    assert ship.tasks.peek() == task
 
 
 def test_ship_collect_in_local_cluster():
@@ -87,6 +90,7 @@ def test_ship_collect_in_local_cluster():
     collects_locally = ship.collect_in_local_cluster(halite_matrix, 3)
 
     assert collects_locally is True
+    assert len(ship.tasks) == 9
 
 
 def test_player_add_shipyard():
@@ -165,7 +169,7 @@ def test_navigate_to_pos():
 
     ship.navigate_to_pos(target)
 
-    assert ship.tasks == [Move.SOUTH] * 5 + [Move.WEST] * 2
+    assert ship.tasks.runs() == [(Move.SOUTH, 5), (Move.WEST, 2)]
 
 
 def test_navigate_to_pos_over_border():
@@ -173,7 +177,7 @@ def test_navigate_to_pos_over_border():
     target = Position(3, 14)
 
     ship.navigate_to_pos(target)
-    assert ship.tasks == [Move.SOUTH] * 4 + [Move.WEST] * 6
+    assert ship.tasks.runs() == [(Move.SOUTH, 4), (Move.WEST, 6)]
 
     for _ in range(10):
         ship.continue_task([])
@@ -186,3 +190,174 @@ def test_find_halite_cluster():
     cluster_center = find_halite_cluster(halite_matrix, 3)
 
     assert cluster_center == Position(2, 2)
+
+
+def test_first_agent_collects_when_out_of_time():
+    obs = {
+        "player": 0,
+        "step": 0,
+        "players": {0: [0, {"shipyard": 118}, {"ship": [116, 0]}]},
+        "halite": list(range(SIZE ** 2)),
+    }
+    first_agent_module.PLAYER = Player()
+
+    action = first_agent(obs, {"actTimeout": 0})
+
+    assert action == dict()
+    assert first_agent_module.PLAYER.ships["ship"].halite == int(0.25 * 116)
+
+
+def test_position_is_hashable():
+    positions = {Position(1, 2), Position(1, 2), Position(2, 1)}
+
+    assert len(positions) == 2
+    assert Position(1, 2) in positions
+    assert Position(1, 2).cell == 1 * SIZE + 2
+
+
+def test_get_adjacent_position_is_shared():
+    source_pos = Position(4, 5)
+
+    assert source_pos.get_adjacent_position(Move.EAST) is board_pos_to_position(4 * SIZE + 6)
+
+
+def test_player_crash_test():
+    player = Player()
+    player.add_ship("Santa Maria", Position(1, 2))
+    player.add_ship("Pinta", Position(1, 3))
+
+    assert player.crash_test() is False
+
+    player.ships["Pinta"].move(Move.WEST)
+
+    assert player.crash_test() is True
+
+
+def test_first_agent_ships_do_not_collide():
+    obs = {
+        "player": 0,
+        "step": 10,
+        "players": {0: [0, {"shipyard": 118}, {"west": [16, 0], "east": [18, 0]}]},
+        "halite": [0] * SIZE ** 2,
+    }
+    first_agent_module.PLAYER = Player()
+    first_agent_module.PLAYER.sync(obs)
+    first_agent_module.PLAYER.ships["west"].add_task(Move.EAST)
+    first_agent_module.PLAYER.ships["east"].add_task(Move.WEST)
+
+    action = first_agent(obs)
+
+    assert action == {"west": "EAST"}
+    assert first_agent_module.PLAYER.ships["east"].pos == Position(1, 3)
+    assert first_agent_module.PLAYER.crash_test() is False
+
+
+def test_player_fleet_view():
+    player = Player()
+    player.add_ship("Santa Maria", Position(1, 2))
+    player.add_ship("Pinta", Position(3, 4))
+    player.ships["Pinta"].halite = 120
+
+    fleet = player.fleet_view()
+
+    assert fleet.names == ["Santa Maria", "Pinta"]
+    assert list(fleet.cells) == [1 * SIZE + 2, 3 * SIZE + 4]
+    assert list(fleet.halite) == [0, 120]
+
+
+def test_player_sync():
+    player = Player()
+    obs = {
+        "player": 1,
+        "step": 5,
+        "players": [
+            [0, {}, {}],
+            [1200, {"Hamburg": 16}, {"Pinta": [17, 10], "Nina": [40, 0]}],
+        ],
+    }
+
+    changes = player.sync(obs)
+
+    assert player.step == 5
+    assert player.halite == 1200
+    assert changes.new_ships == {"Pinta", "Nina"}
+    assert changes.new_shipyards == {"Hamburg"}
+    assert player.shipyards["Hamburg"].pos == Position(1, 1)
+    assert player.ships["Pinta"].pos == Position(1, 2)
+    assert player.ships["Pinta"].halite == 10
+
+
+def test_player_sync_diffs_with_bookkeeping():
+    player = Player()
+    player.add_shipyard("Hamburg", Position(1, 1))
+    player.add_ship("Pinta", Position(1, 2))
+    player.add_ship("Nina", Position(2, 10))
+    player.add_ship("Santa Maria", Position(3, 3))
+    player.ships["Pinta"].navigate_to_pos(Position(4, 2))
+    player.ships["Nina"].navigate_to_pos(Position(4, 10))
+    player.ships["Nina"].continue_task([])
+    obs = {
+        "player": 0,
+        "step": 6,
+        "players": [
+            [900, {"Hamburg": 16}, {"Pinta": [2 * SIZE + 2, 0], "Nina": [3 * SIZE + 10, 5]}]
+        ],
+    }
+
+    changes = player.sync(obs)
+
+    assert changes.lost_ships == {"Santa Maria"}
+    assert changes.moved_ships == {"Pinta"}
+    assert changes.cargo_changed == {"Nina"}
+    assert changes.replan_ships == {"Pinta"}
+    assert not changes.new_shipyards and not changes.lost_shipyards
+    assert len(player.ships["Pinta"].tasks) == 3
+    assert len(player.ships["Nina"].tasks) == 1
+
+
+def test_first_agent_replans_moved_ships():
+    agent = make_agent()
+    agent.player.add_shipyard("Hamburg", Position(1, 1))
+    agent.player.add_ship("Pinta", Position(1, 2))
+    agent.player.ships["Pinta"].navigate_to_pos(Position(1, 6))
+    obs = {
+        "player": 0,
+        "step": 7,
+        "players": {0: [900, {"Hamburg": 16}, {"Pinta": [1 * SIZE + 4, 3000]}]},
+        "halite": [0] * SIZE ** 2,
+    }
+
+    # the plan east was made from another cell, the ship returns its cargo instead
+    assert agent(obs) == {"Pinta": "WEST"}
+    assert len(agent.player.ships["Pinta"].tasks) == 2
+
+
+def test_first_agent_instances_keep_their_own_player():
+    obs = {
+        "player": 0,
+        "step": 3,
+        "players": {0: [5000, {"shipyard": 118}, {"ship": [116, 0]}]},
+        "halite": [0] * SIZE ** 2,
+    }
+    first_agent_module.PLAYER = Player()
+    agent = make_agent()
+
+    agent(obs)
+
+    assert set(agent.player.ships) == {"ship"}
+    assert agent.player is not make_agent().player
+    assert not first_agent_module.PLAYER.ships
+
+
+def test_make_agent_params():
+    obs = {
+        "player": 0,
+        "step": 3,
+        "players": {0: [5000, {"shipyard": 118}, {"ship": [116, 100]}]},
+        "halite": [0] * SIZE ** 2,
+    }
+    agent = make_agent(collect_below=0, return_above=50)
+
+    assert agent(obs) == {"ship": "EAST"}
+    with pytest.raises(TypeError):
+        make_agent(unknown=1)
@@ -0,0 +1,185 @@
+import numpy as np
+import pytest
+
+from src.agents.single_ship_agent import (
+    MAX_PLANNING_HORIZON,
+    MIN_PLANNING_HORIZON,
+    Move,
+    Params,
+    SingleShipAgent,
+    Task,
+    agent,
+    fleet_step,
+    get_best_move,
+    get_best_moves_within,
+    get_dist,
+    get_grid_dist,
+    make_agent,
+    navigate_to,
+    phase_timer,
+    states,
+)
+from src.budget import TurnBudget
+from src.plans import Plan
+from src.utils import Observation
+
+
+def test_get_dist_over_border():
+    assert get_dist(0, 14) == 1
+    assert get_dist(0, 14 * 15 + 14) == 2
+
+
+def test_get_grid_dist():
+    assert get_grid_dist((1, 2), (4, 0)) == 5
+    assert get_grid_dist((0, 0), (13, 0)) == 2
+
+
+def test_navigate_to_over_border():
+    assert navigate_to(0, 13 * 15) == Move.NORTH
+    assert navigate_to(0, 13) == Move.WEST
+    assert navigate_to(0, 3 * 15 + 13) == Move.SOUTH
+    assert navigate_to(17, 17) == Move.COLLECT
+
+
+def test_get_best_move_heads_for_halite():
+    board = np.zeros((15, 15))
+    board[5, 7] = 400
+
+    moves = get_best_move((5, 5), (5, 5), 0, board, horizon=4)
+
+    assert moves == [Move.EAST, Move.EAST, Move.COLLECT, Move.COLLECT]
+
+
+def test_get_best_move_empty_board():
+    assert get_best_move((5, 5), (5, 5), 0, np.zeros((15, 15))) == [Move.NORTH]
+
+
+def test_fleet_step():
+    states = {}
+    board = np.zeros((15, 15))
+    board[2, 2] = 300
+    ships = {"new": [0, 0], "collecting": [2 * 15 + 2, 100], "far": [7 * 15 + 7, 50]}
+    states["collecting"] = [Task.COLLECT, Plan()]
+    states["far"] = [Task.COLLECT, Plan([Move.WEST])]
+
+    action = fleet_step(step=390, board=board, ships=ships, shipyard_pos=0, states=states)
+
+    assert states["new"] == [Task.EXPLORE, 1 * 15 + 1]
+    assert action["new"] == "SOUTH"
+    assert states["collecting"][0] == Task.COLLECT
+    assert "collecting" not in action
+    assert states["far"] == [Task.RETURN, None]
+    assert action["far"] == "NORTH"
+
+
+def test_fleet_step_avoids_collisions():
+    states = {}
+    board = np.zeros((15, 15))
+    # both ships explore towards cell 16, the heavier one moves first
+    ships = {"light": [15, 0], "heavy": [17, 200]}
+    states["light"] = [Task.EXPLORE, 16]
+    states["heavy"] = [Task.EXPLORE, 16]
+
+    action = fleet_step(step=10, board=board, ships=ships, shipyard_pos=0, states=states)
+
+    assert action == {"heavy": "WEST"}
+
+
+def test_get_best_moves_within_deepens_until_budget_is_spent():
+    board = np.zeros((15, 15))
+    board[5, 7] = 400
+    ticks = iter(range(100))
+
+    budget = TurnBudget(9.5, clock=lambda: next(ticks))
+    get_best_moves_within([(5, 5)], (5, 5), [0], board, budget)
+
+    assert MIN_PLANNING_HORIZON < budget.horizon < MAX_PLANNING_HORIZON
+
+
+def test_get_best_moves_within_no_time_left():
+    budget = TurnBudget(0)
+    moves = get_best_moves_within([(5, 5)], (5, 5), [0], np.full((15, 15), 400), budget)
+
+    assert budget.horizon == MIN_PLANNING_HORIZON
+    assert len(moves[0]) == MIN_PLANNING_HORIZON
+
+
+def test_agent_times_its_phases():
+    obs = Observation(
+        step=200,
+        player=0,
+        halite=[100.0] * 225,
+        players=[[1000, {"yard": 0}, {"a": [16, 0], "b": [100, 50]}], [1000, {}, {}]],
+    )
+    states.clear()
+    phase_timer.enabled = True
+    try:
+        agent(obs)
+    finally:
+        phase_timer.enabled = False
+    phases = phase_timer.report()
+    phase_timer.reset()
+
+    assert {"parse", "board", "fleet_step", "cluster_search", "planning"} <= set(phases)
+
+
+def test_agents_keep_their_own_states_and_drop_lost_ships():
+    first, second = SingleShipAgent(), SingleShipAgent()
+    obs = Observation(
+        player=0,
+        step=10,
+        halite=[0.0] * 225,
+        players=[[5000, {"yard": 0}, {"a": [16, 0], "b": [50, 0]}]],
+    )
+    first(obs)
+    assert set(first.states) == {"a", "b"}
+    assert not second.states
+
+    obs.players[0][2].pop("a")
+    first(Observation(obs, step=11))
+    assert set(first.states) == {"b"}
+
+
+def test_fleet_step_return_step_param():
+    states = {}
+    ships = {"far": [7 * 15 + 7, 50]}
+
+    fleet_step(10, np.zeros((15, 15)), ships, 0, states, params=Params(return_step=20))
+
+    assert states["far"] == [Task.RETURN, None]
+
+
+def test_make_agent_params():
+    assert make_agent().params == Params()
+    assert make_agent(cluster_size=5).params == Params(cluster_size=5)
+    with pytest.raises(TypeError):
+        make_agent(unknown=1)
+
+
+def test_agent_plans_around_opponents():
+    halite = [0.0] * 225
+    halite[1] = 300
+    halite[15] = 280
+    obs = Observation(
+        player=0,
+        step=10,
+        halite=halite,
+        players=[[5000, {"yard": 0}, {"a": [0, 0]}], [5000, {}, {"b": [1, 0]}]],
+    )
+    first = SingleShipAgent()
+    first.states["a"] = [Task.COLLECT, Plan()]
+
+    assert first(obs) == {"a": "SOUTH"}
+
+
+def test_fleet_step_targets_clusters_from_the_ship():
+    states = {}
+    board = np.zeros((15, 15))
+    board[2, 2] = 300
+    board[10, 10] = 250
+
+    fleet_step(10, board, {"near": [0, 0], "far": [10 * 15 + 12, 0]}, 0, states)
+
+    # the closest centres of 3 x 3 clusters holding the halite
+    assert states["near"] == [Task.EXPLORE, 1 * 15 + 1]
+    assert states["far"] == [Task.EXPLORE, 10 * 15 + 11]
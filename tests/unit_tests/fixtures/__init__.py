@@ -0,0 +1,27 @@
+import glob
+import json
+import os
+
+FIXTURE_DIRECTORY = os.path.dirname(__file__)
+
+
+def kaggle_games():
+    # the games recorded by record_kaggle_games
+    return sorted(glob.glob(os.path.join(FIXTURE_DIRECTORY, "kaggle_*.json")))
+
+
+def load_game(path):
+    with open(path) as fixture:
+        return json.load(fixture)
+
+
+def expected_rewards(step):
+    # kaggle reports None for the players its rules eliminated, its interpreter gives them 0
+    return [
+        0 if status == "INVALID" else reward
+        for reward, status in zip(step["rewards"], step["statuses"])
+    ]
+
+
+def expected_active(step):
+    return [status in ("ACTIVE", "DONE") for status in step["statuses"]]
@@ -0,0 +1,73 @@
+import json
+import os
+import random
+import sys
+
+import numpy as np
+
+from tests.unit_tests.fixtures import FIXTURE_DIRECTORY
+
+# Records games of the agents played by kaggle_environments==0.2.1, the version of the Pipfile,
+# for the conformance tests of the simulators. Run with the kaggle version installed:
+#   python -m tests.unit_tests.fixtures.record_kaggle_games
+EPISODE_STEPS = 100
+SINGLE_SHIP_AGENT = "src/agents/single_ship_agent.py"
+FIRST_AGENT = "src/agents/first_agent.py"
+# kaggle's own agent, it collides, converts and spawns a lot
+RANDOM_AGENT = "random"
+# seed and agents of every recorded game
+GAMES = [
+    (0, [SINGLE_SHIP_AGENT, FIRST_AGENT]),
+    (3, [SINGLE_SHIP_AGENT, FIRST_AGENT, FIRST_AGENT, FIRST_AGENT]),
+    (4, [RANDOM_AGENT, RANDOM_AGENT]),
+    (5, [RANDOM_AGENT, RANDOM_AGENT, RANDOM_AGENT, RANDOM_AGENT]),
+]
+
+
+def fixture_path(seed: int, players: int) -> str:
+    return os.path.join(FIXTURE_DIRECTORY, f"kaggle_{players}p_seed{seed}.json")
+
+
+def record_game(seed, agents):
+    # imported here, the tests only read the recorded games
+    import kaggle_environments
+
+    random.seed(seed)
+    np.random.seed(seed)
+    env = kaggle_environments.make("halite", configuration={"episodeSteps": EPISODE_STEPS})
+    env.run(list(agents))
+    steps = []
+    for agent_states in env.steps:
+        obs = agent_states[0].observation
+        steps.append(
+            {
+                "observation": {
+                    "step": obs.step,
+                    # within the tests' tolerance, at half the size
+                    "halite": [round(halite, 7) for halite in obs.halite],
+                    "players": obs.players,
+                },
+                "actions": [agent.action for agent in agent_states],
+                "statuses": [agent.status for agent in agent_states],
+                "rewards": [agent.reward for agent in agent_states],
+            }
+        )
+    return {
+        "version": kaggle_environments.version,
+        "seed": seed,
+        "agents": list(agents),
+        "configuration": dict(env.configuration),
+        "steps": steps,
+    }
+
+
+def main():
+    for seed, agents in GAMES:
+        game = record_game(seed, agents)
+        with open(fixture_path(seed, len(agents)), "w") as fixture:
+            json.dump(game, fixture)
+        print(f"recorded seed {seed} with {len(agents)} players", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
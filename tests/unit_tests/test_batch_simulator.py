@@ -0,0 +1,171 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.batch_simulator import (
+    CONVERT,
+    BatchActions,
+    BatchState,
+    add_game_actions,
+    advance_batch,
+    group_ranks,
+    per_game_agent,
+    play_batch,
+)
+from src.routing import EAST, NORTH, STAY
+from src.simulator import HaliteConfig, HaliteState, play_game
+from src.utils import SIZE
+from tests.unit_tests.fixtures import expected_active, expected_rewards, kaggle_games, load_game
+
+CONFIG = HaliteConfig(episode_steps=60)
+PATROL = ["NORTH", "NORTH", "EAST", None, None, "SOUTH", "WEST", None]
+
+
+def patrol_agent(obs, config):
+    # deterministic and independent of uids: convert first, then spawn and patrol
+    halite, shipyards, ships = obs.players[obs.player]
+    if not shipyards:
+        return {uid: "CONVERT" for uid in ships}
+    actions = {}
+    if len(ships) < 3 and halite >= 500:
+        actions.update({uid: "SPAWN" for uid in shipyards})
+    for index, uid in enumerate(sorted(ships, key=lambda uid: ships[uid][0])):
+        move = PATROL[(obs.step + index) % len(PATROL)]
+        if move:
+            actions[uid] = move
+    return actions
+
+
+def test_group_ranks():
+    assert group_ranks(np.array([3, 1, 3, 3, 1])).tolist() == [0, 0, 1, 2, 1]
+
+
+def test_batch_games_match_single_games():
+    rewards = play_batch([per_game_agent(lambda: patrol_agent)] * 2, games=3, config=CONFIG, seed=7)
+
+    rng = np.random.default_rng(7)
+    for game in range(3):
+        state = HaliteState.initial(CONFIG, 2, rng)
+        expected = play_game([patrol_agent, patrol_agent], CONFIG, state=state)
+        assert rewards[game].tolist() == expected
+
+
+def test_batched_actions():
+    state = BatchState.initial(CONFIG, games=2, players=2, seed=0)
+    ships = np.full(4, STAY)
+    ships[state.ship_games == 0] = CONVERT
+    first = ships.copy()
+    first[(state.ship_games == 1) & (state.ship_owners == 0)] = NORTH
+    second = np.full(4, EAST)
+
+    advance_batch(
+        state,
+        [
+            BatchActions(first, np.zeros(0, dtype=bool)),
+            BatchActions(second, np.zeros(0, dtype=bool)),
+        ],
+    )
+
+    assert state.yard_games.tolist() == [0]
+    assert state.yard_owners.tolist() == [0]
+    assert state.player_halite.tolist() == [[3000, 5000], [5000, 5000]]
+    assert state.ship_cells.tolist() == [7 * SIZE + 12, 6 * SIZE + 3, 7 * SIZE + 12]
+
+
+def test_finished_games_keep_their_rewards():
+    state = BatchState.initial(CONFIG, games=2, players=2, seed=0)
+    state.ship_cells[0] = state.ship_cells[1] - 1
+    state.ship_cargo[1] = 100
+    ships = np.full(4, STAY)
+    ships[0] = EAST
+
+    advance_batch(state, [BatchActions(ships, np.zeros(0, dtype=bool)), None])
+
+    assert state.running.tolist() == [False, True]
+    assert state.rewards[0].tolist() == [0, 5000]
+    assert play_batch([None, None], games=2, config=CONFIG).tolist() == [[5000, 5000]] * 2
+
+
+def test_finished_games_are_left_as_they_ended():
+    state = BatchState.initial(CONFIG, games=2, players=2, seed=0)
+    state.running[0] = False
+    boards = state.halite.copy()
+
+    advance_batch(state, [state.idle_actions(), state.idle_actions()])
+
+    assert np.array_equal(state.halite[0], boards[0])
+    assert not np.array_equal(state.halite[1], boards[1])
+
+
+def test_game_actions_follow_kaggle():
+    state = BatchState.initial(CONFIG, games=2, players=2, seed=0)
+    first, second = state.idle_actions(), state.idle_actions()
+    ids = [str(uid) for uid in state.ship_ids]
+    # the move after the conversion is dropped, the other player's ship is not its own
+    add_game_actions(state, first, 0, 0, {ids[0]: "CONVERT", ids[1]: "NORTH"})
+    add_game_actions(state, second, 1, 1, {ids[2]: "NORTH"})
+
+    assert first.ships.tolist() == [CONVERT, STAY, STAY, STAY]
+    assert first.invalid.tolist() == [False, False]
+    assert second.invalid.tolist() == [False, True]
+
+    advance_batch(state, [first, second])
+
+    assert state.active.tolist() == [[True, True], [True, False]]
+    assert state.running.tolist() == [True, False]
+    assert state.rewards[1].tolist() == [5000, 0]
+
+
+def replay_actions(state, before, kaggle_actions):
+    # kaggle's actions with kaggle's uids mapped to the batch ids of the same entities
+    actions = []
+    for player, kaggle_player_actions in enumerate(kaggle_actions):
+        _, kaggle_yards, kaggle_ships = before["players"][player]
+        obs = state.observation(0, player)
+        _, yards, ships = obs.players[player]
+        uids = {("yard", cell): uid for uid, cell in yards.items()}
+        uids.update({("ship", cell): uid for uid, (cell, _) in ships.items()})
+        mapping = {uid: uids[("yard", cell)] for uid, cell in kaggle_yards.items()}
+        mapping.update({uid: uids[("ship", cell)] for uid, (cell, _) in kaggle_ships.items()})
+        player_actions = state.idle_actions()
+        add_game_actions(
+            state,
+            player_actions,
+            0,
+            player,
+            {
+                mapping.get(uid, uid): action
+                for uid, action in (kaggle_player_actions or {}).items()
+            },
+        )
+        actions.append(player_actions)
+    return actions
+
+
+def without_uids(players):
+    return [
+        [halite, sorted(yards.values()), sorted(ships.values())] for halite, yards, ships in players
+    ]
+
+
+@pytest.mark.parametrize("path", kaggle_games(), ids=os.path.basename)
+def test_conforms_to_kaggle_environments(path):
+    game = load_game(path)
+    config = HaliteConfig.from_configuration(game["configuration"])
+    steps = game["steps"]
+    state = BatchState.from_observations([steps[0]["observation"]], config)
+    # kaggle's first observation says step 1 like the second one
+    state.step = 0
+    for before, step in zip(steps, steps[1:]):
+        advance_batch(state, replay_actions(state, before["observation"], step["actions"]))
+
+        obs = state.observation(0, 0)
+        expected = step["observation"]
+        assert obs.step == expected["step"]
+        assert obs.halite == pytest.approx(expected["halite"], abs=1e-6)
+        assert without_uids(obs.players) == without_uids(expected["players"])
+        assert state.active[0].tolist() == expected_active(step)
+
+    assert not state.running[0]
+    assert state.rewards[0].tolist() == expected_rewards(steps[-1])
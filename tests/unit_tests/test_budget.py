@@ -0,0 +1,82 @@
+import pytest
+
+from src.budget import (
+    DEFAULT_ACT_TIMEOUT,
+    BudgetLog,
+    BudgetLogs,
+    TurnBudget,
+    TurnUsage,
+    unlimited_configuration,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_turn_budget_from_configuration():
+    assert TurnBudget.from_configuration({"actTimeout": 2}, fraction=0.5).seconds == 1
+    assert TurnBudget.from_configuration(None, fraction=1).seconds == DEFAULT_ACT_TIMEOUT
+
+
+def test_turn_budget_runs_out():
+    clock = FakeClock()
+    budget = TurnBudget(1.0, clock)
+
+    clock.now = 0.4
+    assert budget.allows(0.5)
+    assert not budget.expired()
+
+    clock.now = 1.2
+    assert not budget.allows(0)
+    assert budget.expired()
+    assert budget.usage(3) == TurnUsage(3, 1.0, 1.2, 0)
+
+
+def test_unlimited_budget_never_runs_out():
+    clock = FakeClock()
+    configuration = unlimited_configuration({"actTimeout": 2})
+    budget = TurnBudget.from_configuration(configuration, clock=clock)
+
+    clock.now = 5.0
+    assert configuration.actTimeout == 2
+    assert budget.allows(10.0)
+    assert not budget.expired()
+    assert not TurnBudget.from_configuration({"actTimeout": 2}, clock=clock).unlimited
+
+
+def test_budget_log_summary():
+    log = BudgetLog(maxlen=2)
+    log.record(TurnUsage(0, 1.0, 0.9, 2))
+    log.record(TurnUsage(1, 1.0, 0.2, 4))
+    log.record(TurnUsage(2, 1.0, 0.4, 6))
+
+    summary = log.summary()
+
+    assert summary["turns"] == 2
+    assert summary["mean_used_fraction"] == pytest.approx(0.3)
+    assert summary["max_used_fraction"] == 0.4
+    assert summary["mean_horizon"] == 5
+
+
+def test_budget_logs_report_the_agents_that_played():
+    logs = BudgetLogs()
+    log = logs.log("first_agent")
+    assert logs.log("first_agent") is log
+    logs.log("second_agent")
+    log.record(TurnUsage(0, 1.0, 0.5, 3))
+
+    assert logs.report() == {
+        "first_agent": {
+            "turns": 1,
+            "mean_used_fraction": 0.5,
+            "max_used_fraction": 0.5,
+            "mean_horizon": 3,
+        }
+    }
+    logs.reset()
+    assert logs.report() == {}
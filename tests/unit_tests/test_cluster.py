@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.cluster import ClusterSearch
+from src.routing import distance_map
+
+
+def wrapped_window_sum(halite_matrix, center, cluster_size):
+    rows, cols = halite_matrix.shape
+    half = cluster_size // 2
+    row_ind = [(center[0] - half + offset) % rows for offset in range(cluster_size)]
+    col_ind = [(center[1] - half + offset) % cols for offset in range(cluster_size)]
+    return halite_matrix[np.ix_(row_ind, col_ind)].sum()
+
+
+@pytest.mark.parametrize("cluster_size", [1, 2, 3, 5, 15])
+def test_cluster_scores_wrap_around(cluster_size):
+    halite_matrix = np.random.RandomState(0).rand(15, 15) * 500
+    scores = ClusterSearch(halite_matrix).scores(cluster_size)
+
+    for center in [(0, 0), (7, 7), (14, 0), (3, 14)]:
+        assert scores[center] == pytest.approx(
+            wrapped_window_sum(halite_matrix, center, cluster_size)
+        )
+
+
+def test_cluster_scores_too_large():
+    with pytest.raises(ValueError):
+        ClusterSearch(np.zeros((4, 4))).scores(5)
+
+
+def test_top_centres_over_border():
+    halite_matrix = np.zeros((15, 15))
+    halite_matrix[0, 0] = 100
+    halite_matrix[14, 14] = 100
+    halite_matrix[7, 7] = 150
+
+    search = ClusterSearch(halite_matrix)
+    best_centres = search.top_centres(3, k=5)
+
+    assert set(best_centres[:4]) == {(0, 0), (0, 14), (14, 0), (14, 14)}
+    assert search.scores(3)[best_centres[0]] == 200
+    assert search.scores(3)[best_centres[4]] == 150
+
+
+def test_top_centres_weights():
+    halite_matrix = np.zeros((15, 15))
+    halite_matrix[2, 2] = 100
+    halite_matrix[10, 10] = 120
+    weights = 0.9 ** distance_map(2 * 15 + 3)
+
+    assert ClusterSearch(halite_matrix).top_centres(1, weights=weights) == [(2, 2)]
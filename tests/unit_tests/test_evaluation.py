@@ -0,0 +1,22 @@
+import random
+
+from src.evaluation import run_episodes
+
+
+def play_random_episode(agents, seed):
+    return [random.random() for _ in agents] + [seed]
+
+
+def test_run_episodes_serial():
+    results = list(run_episodes(play_random_episode, ["a", "b"], episodes=3, base_seed=10))
+
+    assert [result.episode for result in results] == [0, 1, 2]
+    assert [result.seed for result in results] == [10, 11, 12]
+    assert [result.rewards[-1] for result in results] == [10, 11, 12]
+
+
+def test_run_episodes_parallel_is_reproducible():
+    serial = list(run_episodes(play_random_episode, ["a", "b"], episodes=6))
+    parallel = list(run_episodes(play_random_episode, ["a", "b"], episodes=6, workers=2))
+
+    assert sorted(parallel) == serial
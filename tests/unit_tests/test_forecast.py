@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.forecast import MAX_CELL_HALITE, Forecast, planned_collections
+from src.planning import plan_moves
+from src.projection import REGENERATION
+from src.routing import EAST, SOUTH, STAY
+
+
+def test_forecast_regenerates_like_the_planners():
+    board = np.random.default_rng(0).uniform(0, 400, (15, 15))
+    forecast = Forecast(board, 5)
+
+    assert forecast.halite.shape == (6, 225)
+    for turn in range(6):
+        assert (forecast.halite[turn] == board.ravel() * REGENERATION[turn]).all()
+
+
+def test_forecast_caps_regeneration():
+    board = np.zeros(225)
+    board[:2] = [495, 600]
+    forecast = Forecast(board, 3)
+
+    assert forecast.halite[1:, 0].tolist() == [MAX_CELL_HALITE] * 3
+    assert forecast.halite[:, 1].tolist() == [600] * 4
+
+
+def test_forecast_collections():
+    board = np.full(225, 100.0)
+    forecast = Forecast(board, 4, collections=[(7, 1), (7, 2), (8, 4)])
+
+    assert forecast.halite[1, 7] == pytest.approx(102)
+    assert forecast.halite[2, 7] == pytest.approx(102 * 0.75)
+    assert forecast.halite[3, 7] == pytest.approx(102 * 0.75 * 0.75)
+    assert forecast.halite[4, 7] == pytest.approx(102 * 0.75 * 0.75 * 1.02)
+    # a collection on the last turn changes nothing forecast
+    assert forecast.halite[4, 8] == pytest.approx(100 * 1.02 ** 4)
+
+
+def test_forecast_opponents_deplete_their_cells():
+    forecast = Forecast(np.full(225, 100.0), 3, opponent_cells=[5])
+
+    assert forecast.halite[0, 5] == 100
+    assert forecast.halite[3, 5] < 100 < forecast.halite[3, 6]
+
+
+def test_planned_collections():
+    assert planned_collections(0, [STAY, EAST, STAY, SOUTH, STAY]) == [(0, 0), (1, 2), (16, 4)]
+
+
+def test_plan_moves_avoids_forecast_opponents():
+    board = np.zeros((15, 15))
+    board[0, 1] = 300
+    board[1, 0] = 280
+    forecast = Forecast(board, 3, opponent_cells=[1])
+
+    assert plan_moves(0, 0, 0, board, 4, 25)[0][0] == EAST
+    assert plan_moves(0, 0, 0, board, 4, 25, forecast=forecast)[0][0] == SOUTH
+    with pytest.raises(ValueError):
+        plan_moves(0, 0, 0, board, 6, 25, forecast=forecast)
@@ -0,0 +1,61 @@
+from src.occupancy import Occupancy, resolve_moves
+from src.routing import EAST, NORTH, SOUTH, STAY, WEST
+from src.utils import SIZE
+
+
+def test_reserve_and_release():
+    occupancy = Occupancy()
+
+    assert occupancy.reserve(17)
+    assert not occupancy.reserve(17)
+    assert not occupancy.free(17)
+    occupancy.release(17)
+    assert occupancy.free(17)
+    assert occupancy.grid().shape == (SIZE ** 2,)
+
+
+def test_place_reports_shared_cells():
+    occupancy = Occupancy()
+
+    assert occupancy.place([3, 4])
+    assert occupancy.occupied(3)
+    assert not occupancy.place([5, 3])
+    assert occupancy.grid(reserved=False).nonzero()[0].tolist() == [3, 4, 5]
+
+    occupancy.reset()
+    assert not occupancy.grid(reserved=False).any()
+
+
+def test_claim_falls_back_to_staying_then_other_moves():
+    occupancy = Occupancy()
+    occupancy.reserve(1)
+
+    assert occupancy.claim(0, EAST) == STAY
+    occupancy.reserve(SIZE)
+    assert occupancy.claim(SIZE, NORTH) == SOUTH
+    assert occupancy.grid().nonzero()[0].tolist() == [0, 1, SIZE, 2 * SIZE]
+
+
+def test_claim_keeps_the_move_when_every_cell_is_taken():
+    occupancy = Occupancy()
+    for cell in (1, SIZE - 1, SIZE, SIZE * (SIZE - 1), 0):
+        occupancy.reserve(cell)
+
+    assert occupancy.claim(0, WEST) == WEST
+
+
+def test_resolve_moves_by_priority():
+    # both ships head for cell 1, the one with more cargo gets it
+    assert resolve_moves([0, 2], [EAST, WEST], [100, 300]) == [STAY, WEST]
+    assert resolve_moves([0, 2], [EAST, WEST]) == [EAST, STAY]
+    # ships passing each other do not collide
+    assert resolve_moves([0, 1], [EAST, WEST]) == [EAST, WEST]
+    # a ship staying on the cell another one moves to moves away
+    assert resolve_moves([0, 1], [EAST, STAY]) == [EAST, NORTH]
+
+
+def test_resolve_moves_avoids_reserved_cells():
+    occupancy = Occupancy()
+    occupancy.reserve(1)
+
+    assert resolve_moves([0], [EAST], occupancy=occupancy) == [STAY]
@@ -0,0 +1,87 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from src.agents.single_ship_agent import MOVES, Move, projected_halite
+from src.planning import collection_bonus, plan_moves
+from src.projection import DISCOUNT, collect_gain, discount_table
+
+
+def exhaustive_best(pos, dropoff_pos, halite, board, horizon):
+    best_value = 0
+    best_moves = []
+    for moves in product(MOVES, repeat=horizon):
+        value = projected_halite(pos, list(moves), dropoff_pos, board, halite)
+        if value > best_value:
+            best_value = value
+            best_moves = list(moves)
+    return best_moves, best_value
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_moves_matches_exhaustive_search(seed):
+    rng = np.random.RandomState(seed)
+    board = np.floor(rng.rand(15, 15) * 500)
+    pos, dropoff_pos, halite = (3, 4), (7, 7), int(rng.randint(0, 800))
+
+    for horizon in [2, 3]:
+        move_codes, value = plan_moves(
+            3 * 15 + 4, 7 * 15 + 7, halite, board, horizon, beam_width=5 ** horizon
+        )
+        best_moves, best_value = exhaustive_best(pos, dropoff_pos, halite, board, horizon)
+
+        assert value == best_value
+        assert [MOVES[code] for code in move_codes] == best_moves
+
+
+def test_collection_bonus():
+    board = np.zeros(225)
+    board[0] = 400
+    board[3] = 100
+
+    bonus = collection_bonus(board, 4)
+
+    assert bonus.shape == (4, 225)
+    assert bonus[0, 3] == collect_gain(100, 0, 1)
+    assert bonus[2, 3] == collect_gain(100, 0, 3)
+    # three moves from cell 3 reach the richer cell, one turn is left to collect there
+    assert bonus[3, 3] == max(collect_gain(100, 0, 4), collect_gain(400, 0, 1))
+    assert bonus[3, 2] == collect_gain(400, 0, 2)
+    assert bonus[3, 100] == 0
+
+
+def test_plan_moves_collects_twice_from_depleted_cell():
+    board = np.zeros((15, 15))
+    board[0, 0] = 400
+
+    move_codes, value = plan_moves(0, 0, 0, board, horizon=2, beam_width=25)
+
+    assert [MOVES[code] for code in move_codes] == [Move.COLLECT, Move.COLLECT]
+    assert value == int((100 + int(0.25 * 300 * 1.02)) / 1.05 ** 2)
+
+
+def test_plan_moves_deep_horizon_with_beam():
+    board = np.zeros((15, 15))
+    board[0, 3] = 400
+
+    move_codes, value = plan_moves(0, 0, 0, board, horizon=5, beam_width=10)
+
+    assert value > 0
+    assert len(move_codes) == 5
+
+
+def test_plan_moves_empty_board():
+    assert plan_moves(0, 0, 0, np.zeros((15, 15)), horizon=3, beam_width=25) == ([], 0)
+
+
+def test_plan_moves_discount():
+    board = np.zeros((15, 15))
+    board[0, 3] = 400
+    moves, value = plan_moves(0, 0, 0, board, horizon=6, beam_width=25)
+
+    assert plan_moves(0, 0, 0, board, horizon=6, beam_width=25, discount=DISCOUNT) == (
+        moves,
+        value,
+    )
+    assert plan_moves(0, 0, 0, board, 6, 25, discount_table(1.0))[1] > value
@@ -0,0 +1,65 @@
+import pytest
+
+from src.plans import Plan
+
+
+def test_plan_merges_runs():
+    plan = Plan(["NORTH", "NORTH"])
+    plan.add("NORTH", 2)
+    plan.add("EAST", 3)
+    plan.add("WEST", 0)
+
+    assert plan.runs() == [("NORTH", 4), ("EAST", 3)]
+    assert len(plan) == 7
+
+
+def test_plan_pop():
+    plan = Plan()
+    plan.add("NORTH", 2)
+    plan.add("EAST")
+
+    assert [plan.pop() for _ in range(3)] == ["NORTH", "NORTH", "EAST"]
+    assert not plan
+    with pytest.raises(IndexError):
+        plan.pop()
+
+
+def test_plan_generates_lazily():
+    drawn = []
+
+    def draw():
+        drawn.append(len(drawn))
+        return drawn[-1]
+
+    plan = Plan()
+    plan.add_generated(draw, 1000)
+
+    assert len(plan) == 1000
+    assert drawn == []
+    assert plan.peek() == 0
+    assert plan.pop() == 0
+    assert plan.pop() == 1
+    assert len(plan) == 998
+    assert plan.runs() == [("draw", 998)]
+
+
+def test_plan_cancel_and_replan():
+    plan = Plan(["SOUTH"] * 5)
+    plan.cancel()
+
+    assert not plan
+    assert plan.runs() == []
+
+    plan.add("WEST", 2)
+    assert plan.pop() == "WEST"
+    assert len(plan) == 1
+
+
+def test_plan_upcoming():
+    plan = Plan(["NORTH", "NORTH", "EAST"])
+    plan.add_generated(lambda: "WEST", 2)
+    plan.add("SOUTH")
+
+    assert plan.upcoming(2) == ["NORTH", "NORTH"]
+    assert plan.upcoming(10) == ["NORTH", "NORTH", "EAST"]
+    assert len(plan) == 6
@@ -0,0 +1,96 @@
+from src.budget import TurnUsage, get_budget_log
+from src.profiling import (
+    NULL_PHASE,
+    Histogram,
+    PhaseTimer,
+    PhaseTimers,
+    format_report,
+    function_name,
+    profile_games,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for seconds in [0.5e-6, 3e-6, 3e-6, 100e-6]:
+        histogram.add(seconds)
+
+    assert histogram.count == 4
+    assert histogram.percentile(50) == 4
+    assert histogram.percentile(100) == 128
+    assert histogram.max == 100e-6
+
+
+def test_phase_timer_sums_phases_per_turn():
+    clock = FakeClock()
+    timer = PhaseTimer(enabled=True, clock=clock)
+
+    for duration in [1e-3, 2e-3]:
+        with timer.phase("planning"):
+            clock.now += duration
+    with timer.phase("board"):
+        clock.now += 1e-3
+    timer.end_turn()
+    with timer.phase("planning"):
+        clock.now += 1e-3
+    timer.end_turn()
+
+    report = timer.report()
+    assert timer.turns == 2
+    assert report["planning"]["turns"] == 2
+    assert report["planning"]["calls"] == 3
+    assert abs(report["planning"]["total_s"] - 4e-3) < 1e-9
+    assert abs(report["planning"]["max_us"] - 3000) < 1e-3
+    assert report["board"]["turns"] == 1
+
+
+def test_disabled_phase_timer_records_nothing():
+    timer = PhaseTimer()
+    assert timer.phase("planning") is NULL_PHASE
+    with timer.phase("planning"):
+        pass
+    timer.end_turn()
+    assert timer.turns == 0
+    assert timer.report() == {}
+
+
+def test_phase_timers_enable_existing_and_new_timers():
+    timers = PhaseTimers()
+    first = timers.timer("first_agent")
+    assert timers.timer("first_agent") is first
+    timers.enable()
+    assert first.enabled
+    assert timers.timer("second_agent").enabled
+
+
+def test_function_name():
+    assert function_name(("src/simulator.py", 12, "advance")) == "src/simulator.py:12(advance)"
+    assert function_name(("~", 0, "<built-in method builtins.max>")) == (
+        "<built-in method builtins.max>"
+    )
+
+
+def play_episode(agents, seed):
+    get_budget_log("profiled_agent").record(TurnUsage(seed, 1.0, 0.25, 2))
+    return [sum(range(10000)), seed]
+
+
+def test_profile_games():
+    report, results = profile_games(play_episode, ["a", "b"], games=2, base_seed=5)
+
+    assert [result.rewards[1] for result in results] == [5, 6]
+    assert report["games"] == 2
+    assert any("play_episode" in row["function"] for row in report["functions"])
+    cumulative = [row["cumulative_s"] for row in report["functions"]]
+    assert cumulative == sorted(cumulative, reverse=True)
+    assert "play_episode" in format_report(report)
+    assert report["budgets"]["profiled_agent"]["turns"] == 2
+    assert "profiled_agent" in format_report(report)
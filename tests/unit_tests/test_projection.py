@@ -0,0 +1,34 @@
+import pytest
+
+from src.projection import (
+    DISCOUNT,
+    MAX_EXPONENT,
+    MOVE_DECAY,
+    REGENERATION,
+    REMAINING,
+    collect_gain,
+    collected_share,
+)
+
+
+def test_power_tables():
+    for exponent in range(MAX_EXPONENT + 1):
+        assert MOVE_DECAY[exponent] == 0.9 ** exponent
+        assert REGENERATION[exponent] == 1.02 ** exponent
+        assert DISCOUNT[exponent] == 1.05 ** exponent
+        assert REMAINING[exponent] == 0.75 ** exponent
+
+
+@pytest.mark.parametrize("turns", [0, 1, 4, MAX_EXPONENT, MAX_EXPONENT + 5])
+def test_collected_share_is_the_geometric_sum(turns):
+    expected = sum(0.25 * 0.75 ** turn for turn in range(1, turns + 1))
+    assert collected_share(turns) == pytest.approx(expected, abs=1e-12)
+
+
+def test_collect_gain():
+    for cell_halite in (0.0, 17.5, 263.0, 499.9):
+        for distance in range(0, 15, 3):
+            for turns in range(1, 7):
+                arrival = int(1.02 ** distance * cell_halite)
+                expected = int(sum([0.25 * arrival * 0.75 ** turn for turn in range(1, turns + 1)]))
+                assert collect_gain(cell_halite, distance, turns) == expected
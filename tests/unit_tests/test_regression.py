@@ -0,0 +1,93 @@
+import pytest
+
+from src.regression import (
+    Decision,
+    compare_decisions,
+    example_chunks,
+    load_decisions,
+    replay_chunks,
+    replay_decisions,
+    save_decisions,
+)
+from src.replay import ReplayReader, ReplayRecorder
+from src.simulator import HaliteConfig, load_agent, play_game
+
+CONFIG = HaliteConfig(episode_steps=30)
+AGENT = "src/agents/first_agent.py"
+
+
+def record_games(root, seeds):
+    with ReplayRecorder(root) as recorder:
+        for seed in seeds:
+            agents = [load_agent(AGENT), load_agent("src/agents/single_ship_agent.py")]
+            rewards = play_game(agents, CONFIG, seed=seed, on_turn=recorder.record_turn)
+            recorder.end_episode(rewards, seed=seed)
+    return ReplayReader(root)
+
+
+def test_replay_chunks(tmp_path):
+    reader = record_games(str(tmp_path), [0, 1])
+    chunks = replay_chunks(reader, player=1, chunk_turns=12, warmup=5)
+
+    assert [(chunk.episode, chunk.first_timed) for chunk in chunks] == [
+        (0, 0),
+        (0, 5),
+        (0, 5),
+        (1, 0),
+        (1, 5),
+        (1, 5),
+    ]
+    assert [obs.step for obs in chunks[1].observations] == list(range(7, 24))
+    assert [obs.step for obs in chunks[2].observations] == list(range(19, 30))
+    assert all(obs.player == 1 for chunk in chunks for obs in chunk.observations)
+
+
+def test_decisions_do_not_depend_on_the_workers(tmp_path):
+    chunks = replay_chunks(record_games(str(tmp_path), [0]), chunk_turns=10, warmup=3)
+
+    decisions = replay_decisions(AGENT, chunks)
+    in_parallel = replay_decisions(AGENT, chunks, workers=2)
+
+    assert [decision.step for decision in decisions] == list(range(CONFIG.episode_steps))
+    assert [decision.actions for decision in in_parallel] == [
+        decision.actions for decision in decisions
+    ]
+    assert not compare_decisions(decisions, in_parallel)["divergences"]
+
+
+def test_example_observation():
+    decisions = replay_decisions(AGENT, example_chunks())
+
+    assert [(decision.episode, decision.step) for decision in decisions] == [(0, 1)]
+    assert decisions[0].latency > 0
+
+
+def test_compare_decisions():
+    baseline = [
+        Decision(0, 0, {"1-1": "NORTH"}, 0.001),
+        Decision(0, 1, {"1-1": "NORTH", "2-1": "SPAWN"}, 0.002),
+        Decision(1, 0, {}, 0.001),
+    ]
+    decisions = [
+        Decision(0, 0, {"1-1": "NORTH"}, 0.002),
+        Decision(0, 1, {"1-1": "EAST", "2-1": "SPAWN"}, 0.002),
+    ]
+
+    comparison = compare_decisions(baseline, decisions)
+
+    assert comparison["turns"] == 2
+    assert comparison["missing"] == [(1, 0)]
+    assert [(divergence.step, divergence.uids()) for divergence in comparison["divergences"]] == [
+        (1, ["1-1"])
+    ]
+    assert comparison["latency_delta"]["max_us"] == pytest.approx(1000)
+    assert comparison["slowest"][0]["step"] == 0
+
+
+def test_save_and_load_decisions(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    decisions = [Decision(0, 3, {"1-1": "CONVERT"}, 0.5)]
+
+    save_decisions(path, decisions, agent=AGENT, warmup=4)
+
+    assert load_decisions(path) == (decisions, {"agent": AGENT, "warmup": 4})
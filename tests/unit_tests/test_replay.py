@@ -0,0 +1,117 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.replay import HALITE_SCALE, ReplayReader, ReplayRecorder, record_kaggle_episode
+from src.simulator import HaliteConfig, play_game
+from src.utils import EXAMPLE_OBS
+
+CONFIG = HaliteConfig(episode_steps=30)
+
+
+def wanderer(obs, config):
+    halite, shipyards, ships = obs.players[obs.player]
+    if not shipyards:
+        return {uid: "CONVERT" for uid in ships}
+    # kaggle drops the actions after a spawn, so the ships move first
+    actions = {uid: ["NORTH", "EAST", "SOUTH", "WEST"][obs.step % 4] for uid in ships}
+    actions.update({uid: "SPAWN" for uid in shipyards if halite >= 500 and len(ships) < 2})
+    return actions
+
+
+def assert_same_players(players, expected_players):
+    # cargo and halite are stored as float32
+    for (halite, yards, ships), (expected_halite, expected_yards, expected_ships) in zip(
+        players, expected_players
+    ):
+        assert halite == pytest.approx(expected_halite, abs=1e-3)
+        assert yards == expected_yards
+        assert {uid: cell for uid, (cell, _) in ships.items()} == {
+            uid: cell for uid, (cell, _) in expected_ships.items()
+        }
+        assert {uid: cargo for uid, (_, cargo) in ships.items()} == pytest.approx(
+            {uid: cargo for uid, (_, cargo) in expected_ships.items()}, abs=1e-3
+        )
+
+
+def record_games(root, seeds, **recorder_options):
+    turns = []
+    with ReplayRecorder(root, **recorder_options) as recorder:
+        for seed in seeds:
+            game_turns = []
+
+            def on_turn(obs, actions):
+                game_turns.append((obs, [actions or {} for actions in actions]))
+                recorder.record_turn(obs, actions)
+
+            rewards = play_game([wanderer, None], CONFIG, seed=seed, on_turn=on_turn)
+            recorder.end_episode(rewards, seed=seed)
+            turns.append(game_turns)
+    return turns
+
+
+def test_replay_round_trip(tmp_path):
+    turns = record_games(str(tmp_path), [0, 1, 2], episodes_per_shard=2, keyframe_interval=7)
+    reader = ReplayReader(str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["shard-00000", "shard-00001"]
+    assert len(reader) == 3
+    for episode, game_turns in enumerate(turns):
+        assert reader.episode(episode)["seed"] == episode
+        assert reader.episode(episode)["turns"] == len(game_turns) == CONFIG.episode_steps
+        for step, (obs, actions) in enumerate(game_turns):
+            replayed = reader.observation(episode, step)
+            assert replayed.step == obs.step
+            assert replayed.halite == pytest.approx(obs.halite, abs=0.5 / HALITE_SCALE + 1e-9)
+            assert_same_players(replayed.players, obs.players)
+            assert reader.actions(episode, step) == actions
+
+    with pytest.raises(IndexError):
+        reader.board(0, CONFIG.episode_steps)
+
+
+def test_large_board_changes_start_a_keyframe(tmp_path):
+    obs = dict(EXAMPLE_OBS)
+    rich = dict(obs, step=2, halite=[halite + 1000 for halite in obs["halite"]])
+    with ReplayRecorder(str(tmp_path)) as recorder:
+        recorder.record_turn(obs, [])
+        recorder.record_turn(rich, [])
+        recorder.end_episode([1, 2])
+    reader = ReplayReader(str(tmp_path))
+
+    assert len(reader.shards[0].columns["keyframes"]) == 2
+    assert reader.board(0, 1) == pytest.approx(np.array(rich["halite"]))
+
+
+def test_recorder_starts_a_shard_for_another_player_count(tmp_path):
+    two_players = dict(EXAMPLE_OBS)
+    one_player = dict(EXAMPLE_OBS, players=EXAMPLE_OBS["players"][:1])
+    with ReplayRecorder(str(tmp_path)) as recorder:
+        recorder.record_turn(two_players, [])
+        recorder.end_episode([1, 2])
+        recorder.record_turn(one_player, [])
+        with pytest.raises(ValueError):
+            recorder.record_turn(two_players, [])
+        recorder.end_episode([1])
+
+    assert [len(shard.meta["episodes"]) for shard in ReplayReader(str(tmp_path)).shards] == [1, 1]
+
+
+def test_record_kaggle_episode(tmp_path):
+    obs = dict(EXAMPLE_OBS)
+    steps = [
+        [SimpleNamespace(observation=obs, action=None, reward=0), SimpleNamespace(action=None)],
+        [
+            SimpleNamespace(observation=dict(obs, step=2), action={"1-1": "SPAWN"}, reward=3000),
+            SimpleNamespace(action={"1-2": "NORTH"}, reward=5000),
+        ],
+    ]
+    with ReplayRecorder(str(tmp_path)) as recorder:
+        record_kaggle_episode(recorder, steps, agents=["a", "b"])
+    reader = ReplayReader(str(tmp_path))
+
+    assert reader.episode(0)["rewards"] == [3000, 5000]
+    assert reader.actions(0, 0) == [{"1-1": "SPAWN"}, {"1-2": "NORTH"}]
+    assert reader.actions(0, 1) == [{}, {}]
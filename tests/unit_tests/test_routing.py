@@ -0,0 +1,51 @@
+from src.routing import (
+    DISTANCES,
+    EAST,
+    FIRST_MOVES,
+    NEIGHBOURS,
+    NORTH,
+    SOUTH,
+    STAY,
+    WEST,
+    build_axis_offsets,
+    distance_map,
+)
+from src.utils import SIZE
+
+
+def test_axis_offsets_wrap():
+    offsets = build_axis_offsets(15)
+
+    assert offsets[0, 3] == 3
+    assert offsets[0, 14] == -1
+    assert offsets[14, 3] == 4
+    assert offsets[5, 5] == 0
+
+
+def test_distances_are_wrap_aware():
+    assert DISTANCES[0, SIZE ** 2 - 1] == 2
+    assert DISTANCES[0, 7 * SIZE + 7] == 14
+    assert (DISTANCES == DISTANCES.T).all()
+
+
+def test_first_moves_travel_rows_first():
+    assert FIRST_MOVES[0, 2 * SIZE + 2] == SOUTH
+    assert FIRST_MOVES[0, 14 * SIZE + 2] == NORTH
+    assert FIRST_MOVES[0, 2] == EAST
+    assert FIRST_MOVES[0, 14] == WEST
+    assert FIRST_MOVES[0, 0] == STAY
+
+
+def test_distance_map():
+    distances = distance_map(14)
+
+    assert distances.shape == (SIZE, SIZE)
+    assert distances[0, 14] == 0
+    assert distances[14, 0] == 2
+    assert distances[7, 7] == 14
+
+
+def test_neighbours():
+    assert list(NEIGHBOURS[0]) == [14 * SIZE, SIZE, 1, 14, 0]
+    assert NEIGHBOURS[0, NORTH] == 14 * SIZE
+    assert NEIGHBOURS[2 * SIZE + 3, STAY] == 2 * SIZE + 3
@@ -0,0 +1,249 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from src.simulator import (
+    HaliteConfig,
+    HaliteState,
+    advance,
+    agent_factory,
+    load_agent,
+    play_game,
+    play_headless_episode,
+    rewards,
+    starting_cells,
+)
+from src.utils import EXAMPLE_OBS, SIZE
+from tests.unit_tests.fixtures import expected_active, expected_rewards, kaggle_games, load_game
+
+CONFIG = HaliteConfig()
+
+
+def empty_state(players=2):
+    state = HaliteState(CONFIG, players)
+    state.halite = np.full(SIZE ** 2, 100.0)
+    return state
+
+
+def test_initial_state_is_symmetric():
+    state = HaliteState.initial(CONFIG, 4, np.random.default_rng(0))
+    board = state.halite.reshape(SIZE, SIZE)
+
+    assert np.array_equal(board, board[::-1])
+    assert np.array_equal(board, board[:, ::-1])
+    assert state.halite.sum() <= CONFIG.starting_halite
+    assert state.ship_cells.tolist() == starting_cells(SIZE, 4)
+    assert state.ship_uids == ["1-1", "1-2", "1-3", "1-4"]
+
+
+def test_starting_cells_follow_kaggle():
+    assert starting_cells(SIZE, 1) == [7 * SIZE + 7]
+    assert starting_cells(SIZE, 2) == [7 * SIZE + 3, 7 * SIZE + 11]
+    assert starting_cells(SIZE, 4) == [3 * SIZE + 3, 3 * SIZE + 11, 11 * SIZE + 3, 11 * SIZE + 11]
+    with pytest.raises(ValueError):
+        starting_cells(SIZE, 3)
+
+
+def test_observations_round_trip():
+    state = HaliteState.from_observation(EXAMPLE_OBS, CONFIG)
+    obs = state.observations()[1]
+
+    assert obs.player == 1
+    assert obs.step == EXAMPLE_OBS["step"]
+    assert obs.halite == EXAMPLE_OBS["halite"]
+    assert obs.players == EXAMPLE_OBS["players"]
+
+
+def test_convert_and_spawn():
+    state = empty_state()
+    state.add_ship(0, 20, cargo=300, uid="ship")
+    state.add_shipyard(1, 40, uid="yard")
+
+    advance(state, [{"ship": "CONVERT"}, {"yard": "SPAWN"}])
+
+    assert state.player_halite.tolist() == [5000 + 300 - 2000, 5000 - 500]
+    assert state.yard_uids == ["yard", "1-1"]
+    assert state.yard_cells.tolist() == [40, 20]
+    assert state.ship_uids == ["1-2"]
+    assert state.ship_cells.tolist() == [40]
+    assert state.halite[20] == 0
+
+
+def test_actions_after_a_spawn_or_conversion_are_dropped():
+    state = empty_state()
+    state.add_ship(0, 20, uid="converted")
+    state.add_ship(0, 50, uid="dropped")
+
+    advance(state, [{"converted": "CONVERT", "dropped": "NORTH"}, {}])
+
+    assert state.ship_uids == ["dropped"]
+    assert state.ship_cells.tolist() == [50]
+    assert state.ship_cargo.tolist() == [0]
+
+
+def test_invalid_actions_eliminate_the_player():
+    state = empty_state()
+    state.add_ship(0, 20, uid="ship")
+    state.add_ship(1, 50, uid="other")
+    state.add_shipyard(1, 40, uid="yard")
+
+    advance(state, [{}, {"ship": "CONVERT"}])
+
+    assert state.ship_uids == ["ship"]
+    assert not state.yard_uids
+    assert state.active.tolist() == [True, False]
+    assert state.player_halite.tolist() == [5000, 0]
+
+
+def test_moves_cost_cargo_and_staying_ships_collect():
+    state = empty_state()
+    state.add_ship(0, 20, cargo=100, uid="mover")
+    state.add_ship(0, 50, cargo=100, uid="collector")
+
+    advance(state, [{"mover": "NORTH"}, {}])
+
+    assert state.ship_cells.tolist() == [5, 50]
+    assert state.ship_cargo.tolist() == [90, 125]
+    assert state.halite[50] == 75
+    assert state.halite[5] == 100
+    assert state.halite[20] == 102
+
+
+def test_heaviest_ship_wins_collision():
+    state = empty_state()
+    state.add_ship(0, 20, cargo=50, uid="light")
+    state.add_ship(1, 5, cargo=200, uid="heavy")
+
+    advance(state, [{}, {"heavy": "SOUTH"}])
+
+    assert state.ship_uids == ["heavy"]
+    assert state.ship_cargo.tolist() == [180 - 50]
+    assert state.halite[20] == 0
+
+
+def test_tied_collision_destroys_all_ships():
+    state = empty_state()
+    state.add_ship(0, 4, cargo=100, uid="west")
+    state.add_ship(1, 6, cargo=100, uid="east")
+
+    advance(state, [{"west": "EAST"}, {"east": "WEST"}])
+
+    assert not state.ship_uids
+    assert state.halite[5] == 0
+    assert state.active.tolist() == [False, False]
+
+
+def test_enemy_shipyards_destroy_ships_and_staying_ships_deposit():
+    state = empty_state()
+    state.add_shipyard(0, 5, uid="own")
+    state.add_shipyard(1, 35, uid="enemy")
+    state.add_ship(0, 20, cargo=100, uid="depositor")
+    state.add_ship(0, 50, cargo=100, uid="raider")
+
+    advance(state, [{"depositor": "NORTH", "raider": "NORTH"}, {}])
+
+    assert state.ship_uids == ["depositor"]
+    assert state.ship_cargo.tolist() == [90]
+    assert state.yard_uids == ["own", "enemy"]
+    assert state.player_halite[0] == 5000
+
+    advance(state, [{}, {}])
+
+    assert state.ship_cargo.tolist() == [0]
+    assert state.player_halite[0] == 5090
+
+
+def test_regeneration_skips_ships_and_shipyards():
+    state = empty_state()
+    state.halite[7] = 600
+    state.add_ship(0, 20, uid="ship")
+    state.add_shipyard(1, 40, uid="yard")
+
+    advance(state, [{}, {}])
+
+    assert state.halite[0] == 102
+    assert state.halite[7] == 612
+    assert state.halite[20] == 75
+    assert state.halite[40] == 100
+
+
+def test_play_game_until_the_last_step():
+    config = HaliteConfig(episode_steps=10)
+    assert play_game([None, None], config, seed=0) == [5000, 5000]
+
+
+def test_play_game_eliminates_players():
+    def raider(obs, config):
+        return {uid: "WEST" for uid in obs.players[obs.player][2]}
+
+    config = HaliteConfig(episode_steps=10)
+    state = HaliteState.initial(config, 2, np.random.default_rng(0))
+    state.ship_cells[1] = state.ship_cells[0] + 1
+    state.ship_cargo[0] = 1000
+
+    assert play_game([None, raider], config, state=state) == [5000, 0]
+
+
+def test_play_game_passes_the_configuration():
+    seen = []
+
+    def recorder(obs, config):
+        seen.append(config)
+
+    play_game([recorder], HaliteConfig(episode_steps=3), seed=0, configuration={"actTimeout": 9})
+
+    assert seen == [{"actTimeout": 9}] * 2
+
+
+def test_play_game_errored_agent():
+    def broken(obs, config):
+        raise RuntimeError
+
+    assert play_game([None, broken], HaliteConfig(episode_steps=10), seed=0) == [5000, None]
+
+
+def test_headless_episode_with_the_agents():
+    random.seed(0)
+    np.random.seed(0)
+    agent = load_agent("src/agents/single_ship_agent.py")
+    assert agent.__name__ == "agent"
+    assert load_agent("src/agents/single_ship_agent.py") is not agent
+
+    rewards = play_headless_episode(["src/agents/single_ship_agent.py"] * 2, seed=0)
+    assert all(reward > 0 for reward in rewards)
+
+
+def test_agent_factory_makes_an_agent_per_game():
+    assert load_agent("src/agents/first_agent.py").__name__ == "first_agent"
+
+    make_agent = agent_factory("src/agents/single_ship_agent.py")
+    first, second = make_agent(), make_agent()
+    assert first is not second
+    assert first.states is not second.states
+
+
+def assert_matches_kaggle(state, step):
+    obs = state.observations()[0]
+    expected = step["observation"]
+    assert obs.step == expected["step"]
+    assert obs.halite == pytest.approx(expected["halite"], abs=1e-6)
+    assert obs.players == expected["players"]
+    assert state.active.tolist() == expected_active(step)
+
+
+@pytest.mark.parametrize("path", kaggle_games(), ids=os.path.basename)
+def test_conforms_to_kaggle_environments(path):
+    game = load_game(path)
+    config = HaliteConfig.from_configuration(game["configuration"])
+    steps = game["steps"]
+    state = HaliteState.from_observation(steps[0]["observation"], config)
+    # kaggle's first observation says step 1 like the second one
+    state.step = 0
+    for step in steps[1:]:
+        advance(state, step["actions"])
+        assert_matches_kaggle(state, step)
+
+    assert state.done()
+    assert rewards(state) == expected_rewards(steps[-1])
@@ -0,0 +1,58 @@
+import statistics
+
+import pytest
+
+from src.stats import ACCEPT_H0, ACCEPT_H1, MatchStats, RunningMean, Sprt, wilson_interval
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(8, 10)
+    assert low == pytest.approx(0.4902, abs=1e-4)
+    assert high == pytest.approx(0.9433, abs=1e-4)
+    assert wilson_interval(0, 5)[0] == 0.0
+    assert wilson_interval(5, 5)[1] == 1.0
+
+
+def test_running_mean():
+    values = [3.0, 1.5, -2.0, 8.0, 0.5]
+    running = RunningMean()
+    for value in values:
+        running.add(value)
+
+    assert running.mean == pytest.approx(statistics.mean(values))
+    assert running.variance() == pytest.approx(statistics.variance(values))
+    low, high = running.interval()
+    assert low < running.mean < high
+
+
+def test_match_stats():
+    stats = MatchStats()
+    for rewards in ([3000, 1000], [1000, 1000], [None, 500], [4000, 1000, 4500, 0]):
+        stats.add(rewards)
+
+    assert (stats.wins, stats.ties, stats.losses) == (1, 1, 2)
+    assert stats.scores.mean == pytest.approx(1.5 / 4)
+    assert stats.margins.mean == pytest.approx((2000 + 0 - 500 - 500) / 4)
+    assert stats.decision() is None
+    assert "episodes=4" in stats.summary()
+
+
+def test_sprt_stops_once_an_agent_is_clearly_better_or_not():
+    better = MatchStats(sprt=Sprt(0, 100))
+    while better.decision() is None:
+        better.add([1, 0])
+    assert better.decision() == ACCEPT_H1
+    assert better.episodes == 12
+
+    worse = MatchStats(sprt=Sprt(0, 100))
+    while worse.decision() is None:
+        worse.add([0, 1])
+    assert worse.decision() == ACCEPT_H0
+    assert worse.episodes < 12
+
+    # ties weigh as much for H0 as for H1 and decide nothing
+    even = MatchStats(sprt=Sprt(-50, 50))
+    for _ in range(100):
+        even.add([1, 1])
+    assert even.decision() is None
@@ -0,0 +1,128 @@
+import pytest
+
+from src.sweep import (
+    HALVING,
+    RANDOM,
+    Game,
+    Range,
+    ResultCache,
+    evaluate_candidates,
+    grid_candidates,
+    parse_space,
+    play_sweep_game,
+    random_candidates,
+    source_digest,
+    successive_halving,
+    sweep,
+)
+
+AGENT = "src/agents/first_agent.py"
+
+
+def play_by_size(game):
+    # bigger clusters win, by more on odd seeds
+    return [dict(game.params)["cluster_size"] * (1 + game.seed % 2), 4]
+
+
+def test_parse_space():
+    assert parse_space(["cluster_size=3,5", "move_prob=0.5:0.9", "name=a"]) == {
+        "cluster_size": [3, 5],
+        "move_prob": Range(0.5, 0.9),
+        "name": ["a"],
+    }
+    with pytest.raises(ValueError):
+        parse_space(["cluster_size"])
+
+
+def test_grid_candidates():
+    assert grid_candidates({"b": [1, 2], "a": [0.5]}) == [{"a": 0.5, "b": 1}, {"a": 0.5, "b": 2}]
+    with pytest.raises(ValueError):
+        grid_candidates({"a": Range(0, 1)})
+
+
+def test_random_candidates():
+    space = {"size": Range(3, 7), "prob": Range(0.5, 0.9), "name": ["a", "b"]}
+    candidates = random_candidates(space, 20, seed=1)
+
+    assert candidates == random_candidates(space, 20, seed=1)
+    assert len(candidates) == 20
+    for params in candidates:
+        assert params["size"] in range(3, 8)
+        assert 0.5 <= params["prob"] <= 0.9
+        assert params["name"] in ("a", "b")
+
+
+def test_evaluate_candidates_ranks_by_score():
+    trials = evaluate_candidates(
+        AGENT, [{"cluster_size": size} for size in (3, 5, 1)], 4, play=play_by_size
+    )
+
+    assert [trial.params for trial in trials] == [
+        {"cluster_size": 5},
+        {"cluster_size": 3},
+        {"cluster_size": 1},
+    ]
+    assert trials[0].stats.scores.mean == 1.0
+    assert trials[1].stats.wins == 2 and trials[1].stats.losses == 2
+    assert trials[2].stats.scores.mean == 0.0
+
+
+def test_result_cache_skips_played_games(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    played = []
+
+    def play(game):
+        played.append(game.seed)
+        return play_by_size(game)
+
+    evaluate_candidates(AGENT, [{"cluster_size": 5}], 3, cache=ResultCache(path), play=play)
+    with open(path, "a") as cache_file:
+        cache_file.write('{"key": "interrupted')
+    evaluate_candidates(AGENT, [{"cluster_size": 5}], 5, cache=ResultCache(path), play=play)
+
+    assert played == [0, 1, 2, 3, 4]
+
+
+def test_source_digest_covers_every_module(tmp_path):
+    def digest(name, files):
+        directory = tmp_path / name
+        for path, text in files.items():
+            (directory / path).parent.mkdir(parents=True, exist_ok=True)
+            (directory / path).write_text(text)
+        return source_digest(str(directory))
+
+    base = digest("base", {"agent.py": "a", "lib/moves.py": "b"})
+    assert digest("same", {"agent.py": "a", "lib/moves.py": "b", "notes.txt": "c"}) == base
+    assert digest("edited", {"agent.py": "a", "lib/moves.py": "c"}) != base
+    assert digest("renamed", {"agent.py": "a", "lib/routes.py": "b"}) != base
+
+
+def test_successive_halving():
+    rungs = []
+    candidates = [{"cluster_size": size} for size in range(1, 6)]
+
+    trials = successive_halving(
+        AGENT, candidates, 2, lambda rung, trials: rungs.append(len(trials)), play=play_by_size
+    )
+
+    assert rungs == [5, 3, 2, 1]
+    assert trials[0].params == {"cluster_size": 5}
+    assert trials[0].stats.episodes == 16
+
+
+def test_sweep():
+    space = {"cluster_size": [1, 5, 3]}
+    assert sweep(AGENT, space, games=2, play=play_by_size)[0].params == {"cluster_size": 5}
+    assert sweep(AGENT, space, HALVING, 2, play=play_by_size)[0].stats.episodes == 8
+    assert len(sweep(AGENT, space, RANDOM, 2, samples=4, play=play_by_size)) <= 3
+    with pytest.raises(ValueError):
+        sweep(AGENT, space, "exhaustive")
+
+
+def test_play_sweep_game_swaps_seats():
+    game = Game(AGENT, (("move_prob", 0.5),), AGENT, (), 1)
+
+    rewards = play_sweep_game(game)
+
+    assert len(rewards) == 2
+    assert rewards == play_sweep_game(game)
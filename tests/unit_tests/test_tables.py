@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+
+import src.routing
+from src.routing import build_tables
+from src.tables import cached_tables, table_directory
+
+
+def counting_build(calls):
+    def build(size):
+        calls.append(size)
+        return build_tables(size)
+
+    return build
+
+
+def test_cached_tables_are_built_once(tmp_path):
+    calls = []
+    build = counting_build(calls)
+
+    built = cached_tables("routing", build, 5, directory=str(tmp_path))
+    loaded = cached_tables("routing", build, 5, directory=str(tmp_path))
+
+    assert calls == [5]
+    for before, after in zip(built, loaded):
+        assert type(after) is np.ndarray
+        assert after.dtype == before.dtype
+        assert (after == before).all()
+        assert not after.flags.writeable
+
+
+def test_cached_tables_are_keyed_by_arguments(tmp_path):
+    calls = []
+    build = counting_build(calls)
+
+    cached_tables("routing", build, 5, directory=str(tmp_path))
+    tables = cached_tables("routing", build, 7, directory=str(tmp_path))
+
+    assert calls == [5, 7]
+    assert tables[1].shape == (49, 49)
+    assert table_directory("routing", build, 5) != table_directory("routing", build, 7)
+
+
+def test_incomplete_cache_is_rebuilt(tmp_path):
+    calls = []
+    build = counting_build(calls)
+    cached_tables("routing", build, 5, directory=str(tmp_path))
+    os.remove(os.path.join(table_directory("routing", build, 5, directory=str(tmp_path)), "count"))
+
+    cached_tables("routing", build, 5, directory=str(tmp_path))
+
+    assert calls == [5, 5]
+
+
+def test_unwritable_cache_still_builds(tmp_path):
+    blocked = tmp_path / "file"
+    blocked.write_text("")
+
+    tables = cached_tables("routing", build_tables, 5, directory=str(blocked))
+
+    assert tables[1].shape == (25, 25)
+
+
+def test_routing_tables_match_their_build():
+    tables = build_tables(src.routing.SIZE)
+    loaded = [
+        src.routing.AXIS_OFFSETS,
+        src.routing.DISTANCES,
+        src.routing.FIRST_MOVES,
+        src.routing.NEIGHBOURS,
+    ]
+
+    for table, built in zip(loaded, tables):
+        assert table.dtype == built.dtype
+        np.testing.assert_array_equal(table, built)
@@ -0,0 +1,75 @@
+import pytest
+
+from src.tournament import Ratings, discover_agents, play_tournament, round_robin, swiss_round
+
+
+def play_by_strength(agents, seed):
+    # the longer the name, the stronger the agent
+    return [len(agent) for agent in agents]
+
+
+def test_discover_agents():
+    assert discover_agents() == ["src/agents/first_agent.py", "src/agents/single_ship_agent.py"]
+
+
+def test_round_robin():
+    assert round_robin(["a", "b", "c"]) == [["a", "b"], ["a", "c"], ["b", "c"]]
+    assert round_robin(["a", "b"], games=2) == [["a", "b"], ["b", "a"]]
+    assert round_robin(["a", "b", "c", "d", "e"], players=4) == [
+        ["a", "b", "c", "d"],
+        ["a", "b", "c", "e"],
+        ["a", "b", "d", "e"],
+        ["a", "c", "d", "e"],
+        ["b", "c", "d", "e"],
+    ]
+    assert round_robin(["a", "b"], players=4) == [["a", "b", "a", "b"]]
+
+
+def test_swiss_round_pairs_neighbouring_ratings():
+    ratings = Ratings()
+    ratings.update(["a", "b", "c", "d"], [4, 3, 2, 1])
+
+    assert swiss_round(["d", "c", "b", "a", "e"], ratings) == [["a", "b"], ["e", "c"]]
+
+
+def test_ratings():
+    ratings = Ratings()
+    ratings.update(["a", "b"], [10, 5])
+
+    assert ratings.rating("a") == pytest.approx(1516)
+    assert ratings.rating("b") == pytest.approx(1484)
+
+    ratings.update(["a", "b", "c", "c"], [None, 5, 5, 1])
+    board = {row["agent"]: row for row in ratings.leaderboard()}
+    # c beat a twice
+    assert [row["agent"] for row in ratings.leaderboard()] == ["c", "a", "b"]
+    assert board["a"]["games"] == 2
+    assert board["a"]["wins"] == 1
+    assert board["a"]["mean_rank"] == pytest.approx(1 + 3 / 2)
+    assert board["b"]["wins"] == 0
+    assert board["c"]["games"] == 2
+    assert sum(ratings.ratings.values()) == pytest.approx(3 * 1500)
+
+
+@pytest.mark.parametrize("schedule", ["round-robin", "swiss"])
+def test_play_tournament(schedule):
+    results = []
+    ratings = play_tournament(
+        play_by_strength,
+        ["a", "bb", "ccc", "dddd"],
+        schedule,
+        rounds=2,
+        workers=2,
+        on_result=lambda result, lineup, ratings: results.append((result.episode, lineup)),
+    )
+
+    games = 12 if schedule == "round-robin" else 4
+    assert sorted(episode for episode, _ in results) == list(range(games))
+    leaderboard = [row["agent"] for row in ratings.leaderboard()]
+    if schedule == "round-robin":
+        assert leaderboard == ["dddd", "ccc", "bb", "a"]
+    else:
+        # the winners of the first round met in the second
+        assert [leaderboard[0], leaderboard[-1]] == ["dddd", "a"]
+    with pytest.raises(ValueError):
+        play_tournament(play_by_strength, ["a", "b"], "knockout")
@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+
+from src.tracing import DEBUG, INFO, OFF, JsonLinesSink, MemorySink, Tracer, Tracing, parse_levels
+
+
+def test_tracer_filters_by_level_and_sample():
+    sink = MemorySink()
+    tracer = Tracer("agent", level=INFO, sample_every=2, sink=sink)
+
+    tracer.debug(2, "ship", name="a")
+    tracer.info(3, "turn")
+    tracer.info(4, "turn", halite=100)
+
+    assert sink.records == [
+        {"step": 4, "component": "agent", "level": "info", "event": "turn", "halite": 100}
+    ]
+    assert tracer.enabled(INFO, 4)
+    assert not tracer.enabled(DEBUG, 4)
+    assert not tracer.enabled(INFO, 5)
+
+
+def test_tracer_formats_lazily():
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "value"
+
+    sink = MemorySink()
+    tracer = Tracer("agent", level=INFO, sink=sink)
+    tracer.debug(0, "ship", field=expensive)
+    assert not calls
+
+    tracer.info(0, "ship", field=expensive)
+    assert calls == [1]
+    assert sink.records[0]["field"] == "value"
+
+
+def test_json_lines_sink_buffers_writes():
+    stream = io.StringIO()
+    sink = JsonLinesSink(stream, buffer_size=2)
+    actions = {"a": "NORTH"}
+
+    sink.write({"event": "actions", "actions": actions})
+    actions["b"] = "SOUTH"
+    assert stream.getvalue() == ""
+
+    sink.write({"event": "turn", "cell": object()})
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {"event": "actions", "actions": {"a": "NORTH"}}
+
+    sink.write({"event": "turn"})
+    sink.flush()
+    assert len(stream.getvalue().splitlines()) == 3
+
+
+def test_tracing_reconfigures_existing_tracers():
+    tracing = Tracing()
+    tracer = tracing.tracer("first_agent")
+    assert tracer.level == OFF
+    assert tracing.tracer("first_agent") is tracer
+
+    sink = MemorySink()
+    tracing.configure({"*": INFO, "first_agent": DEBUG}, sample_every=3, sink=sink)
+    assert (tracer.level, tracer.sample_every, tracer.sink) == (DEBUG, 3, sink)
+    assert tracing.tracer("planning").level == INFO
+
+    with pytest.raises(ValueError):
+        tracing.configure(sample_every=0)
+
+
+def test_parse_levels():
+    assert parse_levels("info, first_agent=DEBUG") == {"*": INFO, "first_agent": DEBUG}
+    assert parse_levels("") == {}
+    with pytest.raises(ValueError):
+        parse_levels("first_agent=loud")
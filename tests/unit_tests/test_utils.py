@@ -0,0 +1,26 @@
+import pytest
+
+from src.utils import EXAMPLE_OBS, Observation, reward_margin, won_game_percentage
+
+
+def test_observation_attribute_access():
+    obs = Observation(EXAMPLE_OBS)
+
+    assert obs.player == obs["player"] == 0
+    assert obs.players[obs.player][1] == {"1-1": 108}
+    with pytest.raises(AttributeError):
+        obs.configuration  # pylint: disable=W0104
+
+
+def test_reward_margin():
+    assert reward_margin([3, 1]) == 2
+    assert reward_margin([None, 4, 1], player=2) == -3
+    assert reward_margin([5, 5, 0]) == 0
+
+
+def test_won_game_percentage():
+    assert won_game_percentage([[3, 1], [1, 3], [None, 0]]) == (
+        "wins=0.3333333333333333, ties=0.3333333333333333, losses=0.3333333333333333"
+    )
+    assert won_game_percentage([[3, 1, 4, 0], [5, 1, 4, 0]]) == "wins=0.5, ties=0.0, losses=0.5"
+    assert won_game_percentage([[3, 1, 4, 0]], player=2) == "wins=1.0, ties=0.0, losses=0.0"
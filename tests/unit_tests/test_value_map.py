@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from src.cluster import ClusterSearch
+from src.projection import MOVE_DECAY, MOVE_DECAY_ARRAY
+from src.routing import DISTANCES
+from src.value_map import CENTRE_CELL, ValueMap
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_value_map_from_the_dropoff_matches_the_cluster_search(seed):
+    board = np.random.default_rng(seed).uniform(0, 500, (15, 15))
+    scores = ClusterSearch(board).scores(3)
+
+    value_map = ValueMap(scores, [112])
+
+    # from the dropoff both legs of the trip are the same
+    weights = MOVE_DECAY_ARRAY[2 * DISTANCES[112]]
+    assert value_map.target(112) == np.argmax(scores.ravel() * weights)
+
+
+def test_value_map_values():
+    expected = np.random.default_rng(0).uniform(0, 500, 225)
+    values = ValueMap(expected, [0, 200]).values
+
+    ship, target = 30, 77
+    home = min(DISTANCES[target, 0], DISTANCES[target, 200])
+    assert values.shape == (225, 225)
+    assert values[ship, target] == pytest.approx(
+        expected[target] * MOVE_DECAY[DISTANCES[ship, target] + home]
+    )
+
+
+def test_value_map_targets_depend_on_the_ship():
+    expected = np.zeros(225)
+    expected[2 * 15 + 2] = 100
+    expected[7 * 15 + 7] = 100
+    value_map = ValueMap(expected, [0, 7 * 15 + 8])
+
+    assert value_map.target(0) == 2 * 15 + 2
+    assert value_map.target(8 * 15 + 8) == 7 * 15 + 7
+
+
+def test_value_map_empty_board():
+    assert ValueMap(np.zeros(225), [0]).best == [CENTRE_CELL] * 225
+    assert ValueMap(np.zeros(225), [0], fallback=5).target(17) == 5